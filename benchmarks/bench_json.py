@@ -0,0 +1,124 @@
+"""
+JSON 编解码基准测试
+
+对 OKX 形状的负载（300 根 K 线、400 档深度、analyze 输出）比较各序列化后端：
+解码 bytes、解码为 KlineSeries、缩进 / 紧凑编码。
+
+负载按 OKX 接口的真实结构离线生成（字段、字符串数值、精度与线上一致），
+不访问网络，结果可重复。
+
+用法：
+    python benchmarks/bench_json.py [--repeat 200]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exdatahub.core.models import KlineSeries, OrderBook  # noqa: E402
+from exdatahub.utils.serialization import BACKENDS, create_serializer  # noqa: E402
+
+
+def okx_candles(count=300, seed=1):
+    rng = random.Random(seed)
+    price = 98000.0
+    ts = 1731000000000
+    rows = []
+    for i in range(count):
+        open_ = price
+        price += rng.uniform(-60, 60)
+        high = max(open_, price) + rng.random() * 25
+        low = min(open_, price) - rng.random() * 25
+        vol = rng.uniform(50, 5000)
+        rows.append([str(ts - i * 60000), f"{open_:.1f}", f"{high:.1f}", f"{low:.1f}", f"{price:.1f}",
+                     f"{vol:.2f}", f"{vol / 100:.4f}", f"{vol * price / 100:.4f}", "0" if i == 0 else "1"])
+    return {"code": "0", "msg": "", "data": rows}
+
+
+def okx_books(depth=400, seed=2):
+    rng = random.Random(seed)
+    mid = 98000.0
+    asks = [[f"{mid + 0.1 * (i + 1):.1f}", f"{rng.uniform(0.01, 50):.2f}", "0", str(rng.randint(1, 30))]
+            for i in range(depth)]
+    bids = [[f"{mid - 0.1 * i:.1f}", f"{rng.uniform(0.01, 50):.2f}", "0", str(rng.randint(1, 30))]
+            for i in range(depth)]
+    return {"code": "0", "msg": "", "data": [{"asks": asks, "bids": bids, "ts": "1731000000000"}]}
+
+
+def analyze_output():
+    from exdatahub.services.analysis import AnalysisService
+
+    rows = list(reversed(okx_candles()["data"]))
+    indicators = AnalysisService.calculate_indicators(rows, backend="numpy")
+    frame = {"data": rows[-5:], "indicators": indicators,
+             "summary": {"trend_label": "上涨", "volatility_label": "中等", "volume_label": "放量"}}
+    return {
+        "symbol": "BTC-USDT-SWAP",
+        "timestamp": rows[-1][0],
+        "klines": {frame_name: frame for frame_name in ("1m", "5m", "15m", "1H", "4H", "1D")},
+        "derivatives": {
+            "funding_rate": {"current": "0.0001", "next": "", "next_time": "1731002400000",
+                             "history": [{"ts": str(1731000000000 - i * 28800000), "rate": "0.0001"}
+                                         for i in range(24)]},
+            "oi": {"value": "2500000", "value_usd": "25000", "ts": "1731000000000"},
+            "price": {"mark": "98000.1", "index": "98001.2", "ts": "1731000000000"},
+        },
+    }
+
+
+def bench(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    candles = json.dumps(okx_candles()).encode()
+    books = json.dumps(okx_books()).encode()
+    output = analyze_output()
+
+    serializers = []
+    for name in BACKENDS:
+        try:
+            serializers.append(create_serializer(name))
+        except ImportError:
+            print(f"({name} not installed, skipped)")
+
+    # requests 的 response.json() 相当于：按编码解码为 str 后交给标准库 json
+    baseline = {
+        "candles": bench(lambda: json.loads(candles.decode("utf-8")), args.repeat),
+        "books": bench(lambda: json.loads(books.decode("utf-8")), args.repeat),
+        "indent": bench(lambda: json.dumps(output, indent=2, ensure_ascii=False), args.repeat),
+    }
+
+    print(f"payloads: candles {len(candles) / 1024:.0f} KiB, books {len(books) / 1024:.0f} KiB, "
+          f"analyze output {len(json.dumps(output, indent=2, ensure_ascii=False)) / 1024:.0f} KiB (indented)")
+    print(f"{'backend':<10}{'candles':>12}{'books':>12}{'->Series':>12}{'->Book':>12}{'indent':>12}{'compact':>12}")
+    print(f"{'baseline':<10}{baseline['candles']:>10.0f}us{baseline['books']:>10.0f}us"
+          f"{'':>12}{'':>12}{baseline['indent']:>10.0f}us")
+    for s in serializers:
+        row = [
+            bench(lambda: s.loads(candles), args.repeat),
+            bench(lambda: s.loads(books), args.repeat),
+            bench(lambda: KlineSeries.from_okx(s.loads(candles)), args.repeat),
+            bench(lambda: OrderBook.from_okx(s.loads(books)), args.repeat),
+            bench(lambda: s.dumps_bytes(output), args.repeat),
+            bench(lambda: s.dumps_bytes(output, compact=True), args.repeat),
+        ]
+        print(f"{s.name:<10}" + "".join(f"{value:>10.0f}us" for value in row))
+
+    print("\nbaseline = response.json() / json.dumps(indent=2) as used before the serializer layer")
+
+
+if __name__ == "__main__":
+    main()
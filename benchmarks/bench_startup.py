@@ -0,0 +1,118 @@
+"""
+CLI 启动耗时基准测试
+
+每个场景在新的解释器进程中导入对应模块（与 start.sh 每次调用的情形一致），
+报告导入耗时（取多次中位数）、是否加载了重量级依赖，以及 `python -X importtime`
+统计的累计耗时最高的模块。
+
+场景：
+    cli         python -m exdatahub.cli.main --help 所需的导入
+    fetch       fetch 命令：CLI + OKXClient
+    analyze     analyze 命令：CLI + AggregatorService（指标库在计算时才加载）
+    indicators  pandas_ta 指标栈本身（作为对照）
+
+--check 时按 BUDGET_MS 检查导入耗时（取多次中的最小值），超出预算时以非零状态退出，
+可在 CI 或发布前手动运行；预算留有约 2 倍余量，只用于发现明显的回退（如在模块顶层导入 pandas）。
+
+用法：
+    python benchmarks/bench_startup.py [--repeat 5] [--top 10] [--check]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "cli": "import exdatahub.cli.main",
+    "fetch": "import exdatahub.cli.main, exdatahub.exchanges.okx_client",
+    "analyze": "import exdatahub.cli.main, exdatahub.services.aggregator",
+    "indicators": "import pandas_ta",
+}
+
+# 导入耗时预算（毫秒）
+BUDGET_MS = {
+    "cli": 120,
+    "fetch": 400,
+}
+
+HEAVY_MODULES = ("numpy", "pandas", "pandas_ta", "asyncio", "yaml", "websockets", "pyarrow")
+
+_PROBE = """
+import sys, time
+t = time.perf_counter()
+{statement}
+elapsed = (time.perf_counter() - t) * 1000
+print(elapsed)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def measure(statement: str):
+    """在新进程中执行导入语句，返回 (耗时 ms, 已加载的重量级模块)"""
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+                         capture_output=True, text=True, check=True, env=_env(), cwd=ROOT).stdout.splitlines()
+    return float(out[0]), [m for m in out[1].split(",") if m]
+
+
+def import_profile(statement: str, top: int = 10):
+    """python -X importtime 中累计耗时最高的 top 个模块 [(模块, 累计 us)]"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True,
+                            text=True, check=True, env=_env(), cwd=ROOT).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name == " site":
+            # 解释器自身启动（site 及 .pth 钩子）的导入不计入
+            rows = []
+            continue
+        rows.append((name.strip(), int(cumulative)))
+    return sorted(rows, key=lambda row: -row[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--check", action="store_true", help="exit non-zero if a scenario exceeds BUDGET_MS")
+    args = parser.parse_args()
+
+    over_budget = []
+
+    print(f"Python {sys.version.split()[0]}, {args.repeat} runs per scenario (median)\n")
+    for name, statement in SCENARIOS.items():
+        try:
+            runs = [measure(statement) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError:
+            print(f"{name:<11} unavailable\n")
+            continue
+        median = statistics.median(ms for ms, _ in runs)
+        heavy = ", ".join(runs[-1][1]) or "-"
+        print(f"{name:<11} {median:8.1f} ms   heavy modules: {heavy}")
+        for module, us in import_profile(statement, args.top):
+            print(f"{'':<13}{us / 1000:8.1f} ms  {module}")
+        print()
+        best = min(ms for ms, _ in runs)
+        if args.check and name in BUDGET_MS and best >= BUDGET_MS[name]:
+            over_budget.append(f"{name} imports took {best:.0f} ms (budget {BUDGET_MS[name]} ms)")
+
+    for message in over_budget:
+        print(message, file=sys.stderr)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
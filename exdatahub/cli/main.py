@@ -1,38 +1,43 @@
 import click
-import json
 import sys
-from exdatahub.config.settings import settings
+from exdatahub.utils.serialization import dumps
+
+# Commands import what they need inside the function body, so e.g. `fetch`
+# never loads numpy / pandas / pandas_ta and `--help` loads almost nothing.
+# tests/test_startup.py enforces this.
 
 @click.group()
 def cli():
     """ExDataHub CLI - Multi-Exchange Data Gateway"""
     pass
 
-@click.command()
+@cli.command()
 @click.argument('exchange')
 @click.argument('data_type')
 @click.argument('symbol')
 @click.option('--interval', default='1m', help='Kline interval (e.g., 1m, 1h, 1d)')
 @click.option('--limit', default=100, help='Number of data points to fetch')
-def fetch(exchange, data_type, symbol, interval, limit):
+@click.option('--compact', is_flag=True, help='Compact (non-indented) JSON output')
+def fetch(exchange, data_type, symbol, interval, limit, compact):
     """Fetch market data from an exchange.
     
-    EXCHANGE: Exchange name (e.g., okx)
+    EXCHANGE: Exchange name (okx, binance, bybit)
     DATA_TYPE: Data type (ticker, kline, orderbook)
     SYMBOL: Trading pair (e.g., BTC-USDT)
     """
     try:
-        client = None
+        from exdatahub.config.settings import settings
+        from exdatahub.exchanges import client_classes
+        client_cls, _ = client_classes(exchange)
         if exchange.lower() == 'okx':
-            from exdatahub.exchanges.okx_client import OKXClient
-            client = OKXClient(
+            client = client_cls(
                 api_key=settings.OKX_API_KEY,
                 secret_key=settings.OKX_SECRET_KEY,
                 passphrase=settings.OKX_PASSPHRASE,
                 proxy=settings.HTTP_PROXY
             )
         else:
-            raise ValueError(f"Exchange '{exchange}' not supported.")
+            client = client_cls(proxy=settings.HTTP_PROXY)
 
         data = {}
         if data_type == 'ticker':
@@ -45,32 +50,67 @@ def fetch(exchange, data_type, symbol, interval, limit):
             raise ValueError(f"Data type '{data_type}' not supported.")
         
         # Output JSON
-        click.echo(json.dumps(data, indent=2))
+        click.echo(dumps(data, compact=compact))
         
     except Exception as e:
-        click.echo(json.dumps({"error": str(e)}), err=True)
+        click.echo(dumps({"error": str(e)}, compact=True), err=True)
         sys.exit(1)
 
+def _read_symbols(symbols, symbols_file):
+    """合并 --symbols 与 --symbols-file（每行一个，# 开头为注释）"""
+    result = []
+    if symbols:
+        result.extend(s.strip() for s in symbols.split(',') if s.strip())
+    if symbols_file:
+        with open(symbols_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    result.append(line)
+    # 去重但保持顺序
+    return list(dict.fromkeys(result))
+
+async def _analyze_batch(aggregator, symbols, frame_list, concurrency, mode, output_dir, compact):
+    """批量分析：每完成一个交易对立即输出"""
+    from exdatahub.utils.output import OutputHandler
+
+    async for symbol, result in aggregator.analyze_many_async(symbols, frame_list, concurrency=concurrency):
+        if mode == 'file':
+            filename = OutputHandler.generate_filename(prefix=symbol)
+            filepath = OutputHandler.save_to_file(result, output_dir, filename, compact=compact)
+            click.echo(f"✅ {symbol} saved to: {filepath}")
+        else:
+            # console 模式：每行一个 JSON（NDJSON），便于管道流式处理
+            click.echo(dumps(result, compact=True))
+
 @cli.command()
 @click.argument('exchange', required=False)
 @click.argument('symbol', required=False)
 @click.option('--config', '-c', type=click.Path(exists=True), help='配置文件路径 (YAML)')
 @click.option('--frames', default=None, help='K线周期 (逗号分隔)')
 @click.option('--output-mode', type=click.Choice(['console', 'file']), help='输出模式')
-def analyze(exchange, symbol, config, frames, output_mode):
+@click.option('--symbols', default=None, help='批量分析的交易对 (逗号分隔)')
+@click.option('--symbols-file', type=click.Path(exists=True), help='交易对列表文件 (每行一个)')
+@click.option('--concurrency', type=int, default=None, help='批量模式下同时分析的交易对数量')
+@click.option('--compact/--pretty', default=None, help='紧凑 JSON 输出（不缩进）/ 缩进输出')
+def analyze(exchange, symbol, config, frames, output_mode, symbols, symbols_file, concurrency, compact):
     """分析市场数据并计算技术指标
     
     示例:
         使用配置文件: analyze --config config/my_strategy.yaml
         直接指定参数: analyze okx BTC-USDT-SWAP
+        批量分析: analyze okx --symbols BTC-USDT-SWAP,ETH-USDT-SWAP
     """
     try:
         from exdatahub.services.aggregator import AggregatorService
         from exdatahub.config.config_loader import ConfigLoader
         from exdatahub.utils.output import OutputHandler
+        from exdatahub.utils.serialization import set_backend
         
         # 加载配置
         cfg = ConfigLoader(config) if config else None
+        if cfg:
+            set_backend(cfg.json_backend)
         
         # 从配置或参数获取交易所和交易对
         exchange_name = exchange or (cfg.exchange if cfg else 'okx')
@@ -79,6 +119,8 @@ def analyze(exchange, symbol, config, frames, output_mode):
         # 获取输出模式
         mode = output_mode or (cfg.output_mode if cfg else 'console')
         output_dir = cfg.output_directory if cfg else 'output'
+        if compact is None:
+            compact = cfg.output_compact if cfg else False
         
         # 创建聚合器
         aggregator = AggregatorService(exchange_name, config=cfg)
@@ -88,15 +130,306 @@ def analyze(exchange, symbol, config, frames, output_mode):
         if frames:
             frame_list = [f.strip() for f in frames.split(',')]
         
+        batch_symbols = _read_symbols(symbols, symbols_file)
+        if batch_symbols:
+            # 批量模式：共享一个客户端和连接池，逐个输出结果
+            import asyncio
+            try:
+                asyncio.run(_analyze_batch(aggregator, batch_symbols, frame_list, concurrency, mode, output_dir,
+                                           compact))
+            finally:
+                aggregator.close()
+            return
+        
         # 获取数据
         result = aggregator.analyze_market(trading_symbol, frame_list)
         
         # 输出
-        OutputHandler.output(result, mode=mode, directory=output_dir)
+        OutputHandler.output(result, mode=mode, directory=output_dir, compact=compact)
         
     except Exception as e:
         error_data = {"error": str(e)}
-        click.echo(json.dumps(error_data), err=True)
+        click.echo(dumps(error_data, compact=True), err=True)
+        sys.exit(1)
+
+def _create_watch(exchange, symbol, cfg, frames, symbols, symbols_file, on_snapshot=None):
+    """按命令行参数与配置创建 (AggregatorService, WatchService)"""
+    from exdatahub.services.aggregator import AggregatorService
+    from exdatahub.services.daemon import WatchService
+
+    exchange_name = exchange or (cfg.exchange if cfg else 'okx')
+    watch_symbols = _read_symbols(symbols, symbols_file) or [symbol or (cfg.symbol if cfg else 'BTC-USDT-SWAP')]
+    frame_list = [f.strip() for f in frames.split(',')] if frames else None
+
+    aggregator = AggregatorService(exchange_name, config=cfg)
+    aggregator.enable_scanner(len(watch_symbols))
+    service = WatchService(
+        aggregator, watch_symbols, frame_list,
+        price_interval=cfg.watch_price_interval if cfg else 5,
+        funding_interval=cfg.watch_funding_interval if cfg else 60,
+        settle_delay=cfg.watch_settle_delay if cfg else 2,
+        on_snapshot=on_snapshot,
+    )
+    return aggregator, service
+
+def _run_until_stopped(service, *closeables):
+    """前台运行直到 Ctrl-C / SIGTERM，然后依次关闭"""
+    import signal
+    signal.signal(signal.SIGTERM, lambda *_: service.stop())
+    try:
+        service.start().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        for closeable in closeables:
+            closeable()
+
+@cli.command()
+@click.argument('exchange', required=False)
+@click.argument('symbol', required=False)
+@click.option('--config', '-c', type=click.Path(exists=True), help='配置文件路径 (YAML)')
+@click.option('--frames', default=None, help='K线周期 (逗号分隔)')
+@click.option('--output-mode', type=click.Choice(['console', 'file']), help='输出模式')
+@click.option('--symbols', default=None, help='同时监控的交易对 (逗号分隔)')
+@click.option('--symbols-file', type=click.Path(exists=True), help='交易对列表文件 (每行一个)')
+def watch(exchange, symbol, config, frames, output_mode, symbols, symbols_file):
+    """常驻运行，按各周期节奏刷新并发布最新快照（Ctrl-C 退出）
+
+    console 模式每次更新输出一行 JSON（NDJSON）；file 模式覆盖写入 <输出目录>/<交易对>.json
+
+    示例:
+        watch okx BTC-USDT-SWAP --config config/default.yaml
+        watch okx --symbols BTC-USDT-SWAP,ETH-USDT-SWAP --output-mode file
+    """
+    try:
+        from exdatahub.config.config_loader import ConfigLoader
+        from exdatahub.utils.output import OutputHandler
+        from exdatahub.utils.serialization import set_backend
+
+        cfg = ConfigLoader(config) if config else None
+        if cfg:
+            set_backend(cfg.json_backend)
+        mode = output_mode or (cfg.output_mode if cfg else 'console')
+        output_dir = cfg.output_directory if cfg else 'output'
+
+        def publish(name, snapshot):
+            if mode == 'file':
+                OutputHandler.save_to_file(snapshot, output_dir, f"{name}.json",
+                                           compact=cfg.output_compact if cfg else False)
+            else:
+                click.echo(dumps(snapshot, compact=True))
+
+        aggregator, service = _create_watch(exchange, symbol, cfg, frames, symbols, symbols_file, publish)
+        _run_until_stopped(service, aggregator.close)
+
+    except Exception as e:
+        click.echo(dumps({"error": str(e)}, compact=True), err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.argument('exchange', required=False)
+@click.argument('symbol', required=False)
+@click.option('--config', '-c', type=click.Path(exists=True), help='配置文件路径 (YAML)')
+@click.option('--frames', default=None, help='K线周期 (逗号分隔)')
+@click.option('--symbols', default=None, help='同时监控的交易对 (逗号分隔)')
+@click.option('--symbols-file', type=click.Path(exists=True), help='交易对列表文件 (每行一个)')
+@click.option('--host', default=None, help='监听地址（默认 127.0.0.1）')
+@click.option('--port', type=int, default=None, help='监听端口（默认 8080）')
+def serve(exchange, symbol, config, frames, symbols, symbols_file, host, port):
+    """常驻刷新快照，并通过本地 HTTP / JSON 接口提供（Ctrl-C 退出）
+
+    接口: /snapshot/{symbol}, /klines/{symbol}, /indicators/{symbol}, /derivatives/{symbol},
+    /symbols, /health；支持 ETag / If-None-Match
+
+    示例:
+        serve okx --symbols BTC-USDT-SWAP,ETH-USDT-SWAP --port 8080
+        curl http://127.0.0.1:8080/indicators/BTC-USDT-SWAP?frame=1H
+    """
+    try:
+        from exdatahub.config.config_loader import ConfigLoader
+        from exdatahub.services.api import SnapshotAPI
+        from exdatahub.utils.serialization import set_backend
+
+        cfg = ConfigLoader(config) if config else None
+        if cfg:
+            set_backend(cfg.json_backend)
+        aggregator, service = _create_watch(exchange, symbol, cfg, frames, symbols, symbols_file)
+        api = SnapshotAPI(service, host=host or (cfg.api_host if cfg else '127.0.0.1'),
+                          port=port if port is not None else (cfg.api_port if cfg else 8080)).start()
+        click.echo(f"✅ Serving {', '.join(service.symbols)} on {api.url}", err=True)
+        _run_until_stopped(service, api.stop, aggregator.close)
+
+    except Exception as e:
+        click.echo(dumps({"error": str(e)}, compact=True), err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.argument('exchange')
+@click.argument('symbol')
+@click.option('--config', '-c', type=click.Path(exists=True), help='配置文件路径 (YAML)')
+@click.option('--frames', default='1m', help='K线周期 (逗号分隔)')
+@click.option('--limit', type=int, default=1440, help='每个周期导出的 K 线数量')
+@click.option('--funding/--no-funding', default=True, help='导出资金费率历史')
+@click.option('--oi/--no-oi', default=True, help='导出持仓量历史')
+@click.option('--oi-period', default='5m', help='持仓量历史周期 (5m, 1H, 1D)')
+@click.option('--format', 'fmt', type=click.Choice(['parquet', 'feather', 'csv']), default=None,
+              help='导出格式')
+@click.option('--output-dir', default=None, help='数据根目录')
+@click.option('--append/--overwrite', default=True, help='与已有分区合并去重 / 覆盖已有分区')
+def dump(exchange, symbol, config, frames, limit, funding, oi, oi_period, fmt, output_dir, append):
+    """导出历史数据为按日期分区的 Parquet / Feather / CSV
+
+    示例:
+        dump okx BTC-USDT-SWAP --frames 1m,1H --format parquet
+        dump okx BTC-USDT --frames 1D --no-funding --no-oi --format csv
+    """
+    try:
+        from exdatahub.config.config_loader import ConfigLoader
+        from exdatahub.services.export import ExportService
+
+        cfg = ConfigLoader(config) if config else None
+        if exchange.lower() != 'okx':
+            raise ValueError(f"Exchange '{exchange}' not supported.")
+        from exdatahub.config.settings import settings
+        from exdatahub.exchanges.okx_client import OKXClient
+        client = OKXClient(
+            api_key=settings.OKX_API_KEY,
+            secret_key=settings.OKX_SECRET_KEY,
+            passphrase=settings.OKX_PASSPHRASE,
+            proxy=settings.HTTP_PROXY
+        )
+
+        exporter = ExportService(
+            root=output_dir or (cfg.export_directory if cfg else 'data'),
+            fmt=fmt or (cfg.export_format if cfg else 'parquet'),
+            exchange=exchange.lower(),
+        )
+        for frame in (f.strip() for f in frames.split(',') if f.strip()):
+            rows = exporter.dump_klines(client, symbol, frame, limit=limit, append=append)
+            click.echo(f"✅ klines {frame}: {rows} rows -> {exporter.dataset_dir('klines', symbol, frame)}")
+        if funding and symbol.endswith('-SWAP'):
+            rows = exporter.dump_funding_history(client, symbol, append=append)
+            click.echo(f"✅ funding: {rows} rows -> {exporter.dataset_dir('funding', symbol)}")
+        if oi and symbol.endswith('-SWAP'):
+            rows = exporter.dump_oi_history(client, symbol, period=oi_period, append=append)
+            click.echo(f"✅ open_interest {oi_period}: {rows} rows -> "
+                       f"{exporter.dataset_dir('open_interest', symbol, oi_period)}")
+
+    except Exception as e:
+        click.echo(dumps({"error": str(e)}, compact=True), err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.argument('exchange')
+@click.argument('symbol')
+@click.option('--bar', default='1m', help='K线周期')
+@click.option('--start', required=True, help='开始时间 (2024-01-01、2024-01-01T08:00 或毫秒时间戳，UTC)')
+@click.option('--end', default=None, help='结束时间（不含），默认当前时间')
+@click.option('--workers', type=int, default=4, help='并行拉取的窗口数')
+@click.option('--format', 'fmt', type=click.Choice(['parquet', 'feather', 'csv']), default='parquet',
+              help='存储格式')
+@click.option('--output-dir', default='data', help='数据根目录')
+@click.option('--restart', is_flag=True, help='忽略断点，从头回补')
+@click.option('--candle-dir', default=None, help='回补完成后导入内存映射 K 线存储的目录 (如 data/candles)')
+def backfill(exchange, symbol, bar, start, end, workers, fmt, output_dir, restart, candle_dir):
+    """回补历史 K 线（并行翻页，支持断点续传）
+
+    示例:
+        backfill okx BTC-USDT-SWAP --bar 1m --start 2024-01-01 --end 2024-04-01 --workers 8
+    """
+    try:
+        import time
+        from exdatahub.services.backfill import BackfillService
+        from exdatahub.services.export import ExportService
+        from exdatahub.utils.time_utils import parse_time_ms
+
+        if exchange.lower() != 'okx':
+            raise ValueError(f"Exchange '{exchange}' not supported.")
+        from exdatahub.config.settings import settings
+        from exdatahub.exchanges.okx_client import OKXClient
+        client = OKXClient(
+            api_key=settings.OKX_API_KEY,
+            secret_key=settings.OKX_SECRET_KEY,
+            passphrase=settings.OKX_PASSPHRASE,
+            proxy=settings.HTTP_PROXY
+        )
+
+        def progress(rows, done, total):
+            click.echo(f"  {rows} rows, {done}/{total} windows done", err=True)
+
+        exporter = ExportService(root=output_dir, fmt=fmt, exchange=exchange.lower())
+        service = BackfillService(client, exporter, workers=workers, on_progress=progress)
+        started = time.time()
+        rows = service.run(symbol, bar, parse_time_ms(start), parse_time_ms(end) if end else None,
+                           restart=restart)
+        click.echo(f"✅ {symbol} {bar}: {rows} rows in {time.time() - started:.1f}s -> "
+                   f"{exporter.dataset_dir('klines', symbol, bar)}")
+
+        if candle_dir:
+            from exdatahub.core.candle_store import CandleStore
+            from exdatahub.core.models import KlineSeries
+            store = CandleStore(candle_dir, exchange.lower())
+            columns = exporter.read('klines', symbol, bar=bar)
+            added = store.append(symbol, bar, KlineSeries(**columns, inst_id=symbol, bar=bar))
+            click.echo(f"✅ {added} bars appended -> {store.path(symbol, bar)}")
+
+    except Exception as e:
+        click.echo(dumps({"error": str(e)}, compact=True), err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.argument('symbol')
+@click.option('--exchanges', default='okx,binance,bybit', help='对比的交易所 (逗号分隔)')
+@click.option('--config', '-c', type=click.Path(exists=True), help='配置文件路径 (YAML)')
+@click.option('--compact', is_flag=True, help='紧凑 JSON 输出（不缩进）')
+def compare(symbol, exchanges, config, compact):
+    """对比同一合约在多个交易所的价格、基差、资金费率与持仓量
+
+    示例:
+        compare BTC-USDT-SWAP --exchanges okx,binance,bybit
+    """
+    try:
+        from exdatahub.config.config_loader import ConfigLoader
+        from exdatahub.services.market import MarketService
+
+        cfg = ConfigLoader(config) if config else None
+        market = MarketService([e.strip() for e in exchanges.split(',') if e.strip()], config=cfg)
+        try:
+            snapshot = market.snapshot(symbol)
+        finally:
+            market.close()
+        click.echo(dumps(snapshot, compact=compact))
+
+    except Exception as e:
+        click.echo(dumps({"error": str(e)}, compact=True), err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.option('--inst-type', type=click.Choice(['SWAP', 'FUTURES']), default='SWAP', help='合约类型')
+@click.option('--sort', 'sort_by', type=click.Choice(['funding_rate', 'basis_pct', 'oi_usd', 'vol_ccy_24h']),
+              default='funding_rate', help='排序字段（从大到小）')
+@click.option('--top', type=int, default=20, help='输出前 N 个合约（0 表示全部）')
+@click.option('--compact', is_flag=True, help='紧凑 JSON 输出（不缩进）')
+def scan(inst_type, sort_by, top, compact):
+    """扫描 OKX 全部合约的资金费率、基差与持仓量（几次全市场请求）
+
+    示例:
+        scan --sort funding_rate --top 10
+    """
+    try:
+        from exdatahub.config.settings import settings
+        from exdatahub.exchanges.okx_client import OKXClient
+        from exdatahub.services.scanner import DerivativesScanner
+
+        scanner = DerivativesScanner(OKXClient(proxy=settings.HTTP_PROXY), inst_type=inst_type)
+        scanner.scan()
+        records = [r for r in scanner.records() if r[sort_by] is not None]
+        records.sort(key=lambda r: r[sort_by], reverse=True)
+        click.echo(dumps(records[:top] if top else records, compact=compact))
+
+    except Exception as e:
+        click.echo(dumps({"error": str(e)}, compact=True), err=True)
         sys.exit(1)
 
 if __name__ == '__main__':
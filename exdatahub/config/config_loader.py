@@ -46,6 +46,76 @@ class ConfigLoader:
     def symbol(self) -> str:
         return self.get('symbol', 'BTC-USDT-SWAP')
     
+    @property
+    def http_pool_size(self) -> int:
+        return self.get('http.pool_size', 20)
+    
+    @property
+    def http_timeout(self) -> float:
+        return self.get('http.timeout', 10)
+    
+    @property
+    def http_max_in_flight(self) -> Optional[int]:
+        return self.get('http.max_in_flight')
+    
+    @property
+    def http_rate_limit(self) -> bool:
+        return self.get('http.rate_limit', True)
+    
+    @property
+    def http_retry(self) -> Dict[str, Any]:
+        """重试参数（RetryPolicy 的关键字参数）"""
+        return self.get('http.retry', {})
+    
+    @property
+    def cache_enabled(self) -> bool:
+        return self.get('cache.enabled', False)
+    
+    @property
+    def cache_max_entries(self) -> int:
+        return self.get('cache.max_entries', 2048)
+    
+    @property
+    def cache_disk_dir(self) -> Optional[str]:
+        return self.get('cache.disk_dir')
+    
+    @property
+    def websocket_enabled(self) -> bool:
+        return self.get('websocket.enabled', False)
+    
+    @property
+    def websocket_ping_interval(self) -> float:
+        return self.get('websocket.ping_interval', 20)
+    
+    @property
+    def websocket_max_age(self) -> Optional[float]:
+        """WebSocket 快照最长有效期（秒），None 表示只要连接未断开就有效"""
+        return self.get('websocket.max_age')
+    
+    @property
+    def symbols(self) -> list:
+        """批量分析的交易对列表（未配置时退回单个 symbol）"""
+        return self.get('symbols', [self.symbol])
+    
+    @property
+    def batch_concurrency(self) -> int:
+        return self.get('batch.concurrency', 8)
+
+    @property
+    def scanner_enabled(self) -> bool:
+        """批量分析 / 常驻模式是否用全市场扫描提供衍生品数据（目前仅 OKX）"""
+        return self.get('scanner.enabled', True)
+
+    @property
+    def scanner_min_symbols(self) -> int:
+        """交易对数量达到多少时启用全市场扫描"""
+        return self.get('scanner.min_symbols', 5)
+
+    @property
+    def scanner_max_age(self) -> float:
+        """全市场扫描表的最长有效期（秒）"""
+        return self.get('scanner.max_age', 1.0)
+    
     @property
     def kline_frames(self) -> list:
         """
@@ -91,6 +161,10 @@ class ConfigLoader:
     def kline_limit(self) -> int:
         return self.get('klines.limit', 300)
     
+    @property
+    def indicator_backend(self) -> str:
+        return self.get('indicators.backend', 'pandas')
+    
     @property
     def output_mode(self) -> str:
         return self.get('output.mode', 'console')
@@ -99,6 +173,62 @@ class ConfigLoader:
     def output_directory(self) -> str:
         return self.get('output.directory', 'output')
     
+    @property
+    def output_compact(self) -> bool:
+        return self.get('output.compact', False)
+    
+    @property
+    def json_backend(self) -> str:
+        """JSON 序列化后端：auto / orjson / msgspec / json"""
+        return self.get('output.json_backend', 'auto')
+    
+    @property
+    def watch_price_interval(self) -> float:
+        """watch 模式下标记价 / 指数价 / 盘口的刷新间隔（秒）"""
+        return self.get('watch.price_interval', 5)
+    
+    @property
+    def watch_funding_interval(self) -> float:
+        return self.get('watch.funding_interval', 60)
+    
+    @property
+    def watch_settle_delay(self) -> float:
+        """K 线周期收盘后等待多少秒再刷新"""
+        return self.get('watch.settle_delay', 2)
+    
+    @property
+    def api_host(self) -> str:
+        """serve 命令的监听地址"""
+        return self.get('api.host', '127.0.0.1')
+    
+    @property
+    def api_port(self) -> int:
+        return self.get('api.port', 8080)
+    
+    @property
+    def candle_store_directory(self):
+        """已收盘 K 线的内存映射存储目录，None 表示不落盘"""
+        return self.get('candle_store.directory')
+    
+    @property
+    def instruments_path(self) -> Optional[str]:
+        """合约元数据注册表的持久化文件（目前仅 OKX），None 表示不启用"""
+        return self.get('instruments.path')
+
+    @property
+    def instruments_refresh_interval(self) -> float:
+        """合约元数据的刷新间隔（秒）"""
+        return self.get('instruments.refresh_interval', 3600)
+
+    @property
+    def export_directory(self) -> str:
+        return self.get('export.directory', 'data')
+    
+    @property
+    def export_format(self) -> str:
+        """dump 命令的导出格式：parquet / feather / csv"""
+        return self.get('export.format', 'parquet')
+    
     @property
     def enable_funding_history(self) -> bool:
         return self.get('derivatives.enable_funding_history', False)
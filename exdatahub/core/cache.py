@@ -0,0 +1,201 @@
+"""
+Response caching.
+
+``TTLCache`` is an in-process LRU cache whose entries expire individually;
+``DiskCache`` optionally persists entries as JSON files so repeated CLI runs
+can reuse data (e.g. funding history) across processes. ``ResponseCache``
+layers the two and counts hits and misses. ``bar_cache_ttl`` is the caching
+policy the exchange clients share for bar-aligned data.
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Tuple, Union
+
+from exdatahub.utils.metrics import metrics
+from exdatahub.utils.time_utils import seconds_until_bar_close
+
+_MISSING = object()
+
+# Minimum lifetime for bar-aligned cache entries, so a request landing right
+# on a bar boundary doesn't get an entry that expires immediately.
+MIN_CACHE_TTL = 1.0
+
+
+def bar_cache_ttl(bar: str, open_bar: bool = False) -> Optional[float]:
+    """
+    How long a response of bar-aligned data may be cached, or None if it must not be.
+
+    Closed bars (and funding / OI history points) only change when the next
+    bar closes, so they are cached until then. A kline page holding the
+    still-open bar is not cached: its newest candle keeps updating within the
+    bar, and serving it from cache would freeze the current price.
+    """
+    if open_bar:
+        return None
+    return max(MIN_CACHE_TTL, seconds_until_bar_close(bar))
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """JSON file cache: one file per key, holding the value and its expiry."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: Hashable) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get_entry(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """Return (expires, value) for a live entry, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires = entry.get("expires", 0)
+        if expires <= time.time():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return expires, entry.get("value")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"expires": time.time() + ttl, "value": value}, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            # Disk cache is best effort; never fail the request over it
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+
+class ResponseCache:
+    """
+    Memory (+ optional disk) response cache with hit/miss counters.
+
+    What is cached is decided per endpoint by the clients' *_cache_ttl
+    functions: funding / OI history until the next bar close, and kline pages
+    only when every candle in them is closed (history-candles pages, backfill
+    pages). The latest-candles page that analyze requests always includes the
+    still-open bar, so it is never served from here, not even for 1D / 4H;
+    the closed part of that page is reused by KlineStore (in process, only
+    fetching candles after the last confirmed one) and CandleStore (on disk)
+    instead.
+
+    Args:
+        max_entries: LRU capacity of the in-memory layer
+        disk_dir: Directory for the on-disk layer (None = memory only)
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_dir: Optional[str] = None):
+        self.memory = TTLCache(max_entries)
+        self.disk = DiskCache(disk_dir) if disk_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _record(self, hit: bool, label: str):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.incr("cache.hits" if hit else "cache.misses", endpoint=label)
+
+    def get_or_fetch(self, key: Hashable, ttl: Union[float, Callable[[Any], Optional[float]]],
+                     fetch: Callable[[], Any], label: str = "") -> Any:
+        """
+        Return the cached value for `key`, or call `fetch` and cache its result for `ttl` seconds.
+
+        `ttl` may be a callable taking the fetched value, for responses whose
+        lifetime depends on their content; returning None skips caching.
+        """
+        value = self.memory.get(key, _MISSING)
+        if value is _MISSING and self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                # Promote to memory for the entry's remaining lifetime
+                expires, value = entry
+                self.memory.set(key, value, expires - time.time())
+        if value is not _MISSING:
+            self._record(True, label)
+            return value
+
+        self._record(False, label)
+        value = fetch()
+        if callable(ttl):
+            ttl = ttl(value)
+            if ttl is None:
+                return value
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        self.memory.clear()
+
+    @property
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.memory),
+        }
@@ -0,0 +1,207 @@
+"""
+Append-only, memory-mapped candle store.
+
+Each (exchange, symbol, bar) series is a directory with one fixed-width
+binary file per column::
+
+    <root>/okx/BTC-USDT-SWAP/1m/ts.i8        int64 bar open time (ms)
+    <root>/okx/BTC-USDT-SWAP/1m/close.f8     float64
+    ...
+
+Readers ``np.memmap`` the column files and hand out zero-copy slices as a
+``KlineSeries``, so a window over years of 1m data costs only the pages that
+are actually touched. ``ts`` is sorted, so time lookups are a binary search.
+
+Only closed bars are stored. Appends only accept bars newer than the last
+stored bar, and one that repeats the last bar's ``ts`` overwrites that row.
+A writer appends the value columns first and ``ts`` last, and readers size
+the series from the shortest column. Readers in other processes therefore
+never see a row whose values are missing.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from exdatahub.core.models import KlineSeries
+
+try:  # POSIX advisory lock so that only one process writes a series at a time
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Column name -> dtype; ts is written last on append
+COLUMNS: Dict[str, np.dtype] = {
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "vol": np.dtype("<f8"),
+    "vol_ccy": np.dtype("<f8"),
+    "vol_ccy_quote": np.dtype("<f8"),
+    "ts": np.dtype("<i8"),
+}
+
+_SUFFIX = {"f": "f8", "i": "i8"}
+
+
+def _file_name(name: str) -> str:
+    return f"{name}.{_SUFFIX[COLUMNS[name].kind]}"
+
+
+class CandleStore:
+    """
+    Memory-mapped columnar OHLCV store.
+
+    Args:
+        root: Base directory
+        exchange: Exchange name (first path component under root)
+    """
+
+    def __init__(self, root: str = "data/candles", exchange: str = "okx"):
+        self.root = Path(root)
+        self.exchange = exchange
+        self._lock = threading.Lock()
+        self._write_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        # (symbol, bar) -> (length, {column: memmap}); remapped when the series grows
+        self._maps: Dict[Tuple[str, str], Tuple[int, Dict[str, np.ndarray]]] = {}
+
+    def path(self, symbol: str, bar: str) -> Path:
+        return self.root / self.exchange / symbol / bar
+
+    # ---------- reading ----------
+
+    def length(self, symbol: str, bar: str) -> int:
+        """Number of complete rows (the shortest column decides)."""
+        directory = self.path(symbol, bar)
+        sizes = []
+        for name, dtype in COLUMNS.items():
+            try:
+                sizes.append(os.path.getsize(directory / _file_name(name)) // dtype.itemsize)
+            except FileNotFoundError:
+                return 0
+        return min(sizes)
+
+    def _columns(self, symbol: str, bar: str) -> Tuple[int, Dict[str, np.ndarray]]:
+        n = self.length(symbol, bar)
+        key = (symbol, bar)
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None and cached[0] == n:
+                return cached
+            directory = self.path(symbol, bar)
+            if n == 0:
+                columns = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+            else:
+                columns = {name: np.memmap(directory / _file_name(name), dtype=dtype, mode="r", shape=(n,))
+                           for name, dtype in COLUMNS.items()}
+            self._maps[key] = (n, columns)
+            return n, columns
+
+    def last_ts(self, symbol: str, bar: str) -> Optional[int]:
+        n, columns = self._columns(symbol, bar)
+        return int(columns["ts"][n - 1]) if n else None
+
+    def view(self, symbol: str, bar: str, start: Optional[int] = None, end: Optional[int] = None,
+             limit: Optional[int] = None) -> KlineSeries:
+        """
+        Zero-copy window of a series.
+
+        Args:
+            start: First bar open time to include (ms), default the first bar
+            end: Bar open time to stop before (ms, exclusive), default after the last bar
+            limit: Keep only the last ``limit`` bars of the window
+
+        Returns:
+            KlineSeries whose columns are read-only views into the mapped files
+        """
+        n, columns = self._columns(symbol, bar)
+        ts = columns["ts"]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = n if end is None else int(np.searchsorted(ts, end, side="left"))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return KlineSeries(
+            ts[lo:hi], columns["open"][lo:hi], columns["high"][lo:hi], columns["low"][lo:hi],
+            columns["close"][lo:hi], columns["vol"][lo:hi],
+            vol_ccy=columns["vol_ccy"][lo:hi], vol_ccy_quote=columns["vol_ccy_quote"][lo:hi],
+            inst_id=symbol, bar=bar,
+        )
+
+    def tail(self, symbol: str, bar: str, n: int) -> KlineSeries:
+        return self.view(symbol, bar, limit=n)
+
+    # ---------- writing ----------
+
+    def _write_lock(self, symbol: str, bar: str) -> threading.Lock:
+        with self._lock:
+            return self._write_locks.setdefault((symbol, bar), threading.Lock())
+
+    def append(self, symbol: str, bar: str,
+               klines: Union[KlineSeries, Sequence[Sequence[str]]]) -> int:
+        """
+        Append closed bars.
+
+        Args:
+            klines: KlineSeries or OKX kline rows (either order). Unconfirmed
+                rows are dropped, as are rows at or before the last stored bar
+                (except that bar itself, which is overwritten)
+
+        Returns:
+            Number of rows added (an overwrite of the last bar counts as 0)
+        """
+        series = klines if isinstance(klines, KlineSeries) else KlineSeries.from_okx(list(klines))
+        mask = series.confirmed
+        ts = series.ts[mask]
+        if not len(ts):
+            return 0
+        # Sort and dedupe the incoming batch (last occurrence wins)
+        _, first_in_reversed = np.unique(ts[::-1], return_index=True)
+        order = np.flatnonzero(mask)[len(ts) - 1 - first_in_reversed]
+        new = {name: np.ascontiguousarray(getattr(series, name)[order], dtype=dtype)
+               for name, dtype in COLUMNS.items()}
+
+        directory = self.path(symbol, bar)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._write_lock(symbol, bar), open(directory / ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            n = self.length(symbol, bar)
+            self._truncate(directory, n)
+            last = self.last_ts(symbol, bar)
+            if last is not None:
+                same = new["ts"] == last
+                if same.any():
+                    self._overwrite_last(directory, n, {name: values[same] for name, values in new.items()})
+                keep = new["ts"] > last
+                new = {name: values[keep] for name, values in new.items()}
+            added = len(new["ts"])
+            if added:
+                for name in COLUMNS:  # ts last
+                    with open(directory / _file_name(name), "ab") as f:
+                        f.write(new[name].tobytes())
+        return added
+
+    @staticmethod
+    def _truncate(directory: Path, n: int):
+        """Drop partial rows left by an interrupted append."""
+        for name, dtype in COLUMNS.items():
+            path = directory / _file_name(name)
+            if path.exists() and os.path.getsize(path) > n * dtype.itemsize:
+                os.truncate(path, n * dtype.itemsize)
+
+    @staticmethod
+    def _overwrite_last(directory: Path, n: int, row: Dict[str, np.ndarray]):
+        for name, dtype in COLUMNS.items():
+            if name == "ts":
+                continue
+            with open(directory / _file_name(name), "r+b") as f:
+                f.seek((n - 1) * dtype.itemsize)
+                f.write(row[name][-1:].tobytes())
+
+    def symbols(self) -> List[Tuple[str, str]]:
+        """All stored (symbol, bar) series."""
+        return sorted((p.parent.parent.name, p.parent.name)
+                      for p in self.root.glob(f"{self.exchange}/*/*/ts.i8"))
@@ -1,6 +1,16 @@
+from typing import Optional
+
 class APIError(Exception):
     """Exception raised for API errors."""
-    pass
+
+    def __init__(self, message: str = "", code: Optional[str] = None,
+                 retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.code = code
+        # Whether the same request may succeed if sent again (transient failure)
+        self.retryable = retryable
+        # Server-provided delay (Retry-After) in seconds, if any
+        self.retry_after = retry_after
 
 class NetworkError(Exception):
     """Exception raised for network-related errors."""
@@ -9,3 +19,14 @@ class NetworkError(Exception):
 class ConfigurationError(Exception):
     """Exception raised for configuration errors."""
     pass
+
+class RateLimitError(APIError):
+    """Exception raised when an exchange rejects a request for exceeding its rate limit."""
+
+    def __init__(self, message: str = "", code: Optional[str] = None,
+                 retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message, code=code, retryable=retryable, retry_after=retry_after)
+
+class OrderBookError(Exception):
+    """Exception raised when a local order book falls out of sync with the exchange."""
+    pass
@@ -0,0 +1,263 @@
+"""
+Shared HTTP transport for exchange clients.
+
+Every exchange host gets a single pooled, keep-alive ``requests.Session`` so
+repeated ticker / kline / funding calls reuse established TCP+TLS connections
+instead of paying a new handshake per request.
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable, FrozenSet
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from exdatahub.core.exceptions import APIError, RateLimitError
+from exdatahub.core.rate_limit import RateLimiter
+from exdatahub.utils.logger import get_logger
+from exdatahub.utils.metrics import metrics
+from exdatahub.utils.serialization import loads
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT = 10
+
+Timeout = Union[float, Tuple[float, float]]
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry settings for transient failures.
+
+    Delays grow exponentially (``backoff_base * 2 ** (attempt - 1)``, capped at
+    ``backoff_max``) and are randomly shortened by up to ``jitter`` (a
+    fraction) so concurrent callers don't retry in lockstep. A server-sent
+    ``Retry-After`` is always honoured as a lower bound.
+    """
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    jitter: float = 0.5
+    methods: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        backoff *= 1 - self.jitter * random.random()
+        if retry_after is not None:
+            backoff = max(backoff, retry_after)
+        return backoff
+
+
+DEFAULT_RETRY = RetryPolicy()
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _client_error(method: str, path: str, response: requests.Response) -> APIError:
+    """
+    Build the error for a 4xx response, keeping the exchange's own error code
+    and message when the body carries them (e.g. Binance's
+    ``{"code": -1121, "msg": "Invalid symbol."}``).
+    """
+    try:
+        body = loads(response.content)
+    except ValueError:
+        body = None
+    if isinstance(body, dict) and "msg" in body:
+        return APIError(f"HTTP {response.status_code} for {method} {path}: {body['msg']} (code: {body.get('code')})",
+                        code=str(body.get("code", response.status_code)))
+    return APIError(f"Network Error: {response.status_code} Client Error for url: {response.url}",
+                    code=str(response.status_code))
+
+
+class HTTPTransport:
+    """Pooled keep-alive HTTP transport bound to one exchange host."""
+
+    def __init__(self, base_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: Timeout = DEFAULT_TIMEOUT, proxy: Optional[str] = None,
+                 max_in_flight: Optional[int] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry: Optional[RetryPolicy] = DEFAULT_RETRY):
+        self.base_url = base_url.rstrip("/")
+        self.host = urlsplit(self.base_url).netloc
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.proxy = proxy
+        # Global cap on concurrent requests to this host, shared by every
+        # thread and async task using the transport.
+        self.max_in_flight = max_in_flight or pool_size
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        # Host-wide limiter: exchanges rate limit per IP, so every client of
+        # this host must draw from the same buckets.
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+
+        self.session = requests.Session()
+        # One host per transport, so a single connection pool of `pool_size`
+        # sockets is enough; retries are handled above the adapter.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        if proxy:
+            self.session.proxies.update({"http": proxy, "https": proxy})
+
+    def request(self, method: str, path: str, params: Dict[str, Any] = None,
+                headers: Dict[str, str] = None, timeout: Optional[Timeout] = None,
+                validate: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Send a request and return the decoded JSON body.
+
+        Retryable failures (connection errors, timeouts, 429/5xx, or an
+        ``APIError`` with ``retryable=True`` raised by ``validate``) are
+        retried per the transport's ``RetryPolicy`` for idempotent methods.
+
+        Args:
+            method: HTTP method
+            path: Request path relative to ``base_url``
+            params: Query string parameters
+            headers: Extra headers merged over the session defaults
+            timeout: Per-request timeout, falls back to the transport default
+            validate: Callback checking the decoded body (e.g. exchange error
+                codes); raise ``APIError`` to reject it
+        """
+        retry = self.retry
+        max_attempts = retry.max_attempts if retry and method.upper() in retry.methods else 1
+        attempt = 1
+        while True:
+            try:
+                data = self._send(method, path, params, headers, timeout)
+                if validate is not None:
+                    validate(data)
+                return data
+            except APIError as e:
+                if not e.retryable or attempt >= max_attempts:
+                    raise
+                delay = retry.delay(attempt, e.retry_after)
+                metrics.incr("http.retries", host=self.host, path=path, reason=e.code or type(e).__name__)
+                logger.warning("Retrying %s %s in %.2fs (attempt %d/%d): %s",
+                               method, path, delay, attempt + 1, max_attempts, e)
+                time.sleep(delay)
+                attempt += 1
+
+    def _send(self, method: str, path: str, params: Optional[Dict[str, Any]],
+              headers: Optional[Dict[str, str]], timeout: Optional[Timeout]) -> Dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        if self.rate_limiter is not None:
+            # Queue for a token before taking an in-flight slot
+            self.rate_limiter.acquire(path, self.rate_limiter.cost(path, params))
+        try:
+            with self._in_flight:
+                response = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+                if response.status_code in (418, 429):
+                    # 418: Binance's auto-ban after ignoring 429s, also with Retry-After
+                    raise RateLimitError(f"Rate limit exceeded: {method} {path}",
+                                         code=str(response.status_code),
+                                         retry_after=_parse_retry_after(response.headers.get("Retry-After")))
+                if response.status_code >= 500:
+                    raise APIError(f"Network Error: {response.status_code} Server Error for url: {response.url}",
+                                   code=str(response.status_code), retryable=True,
+                                   retry_after=_parse_retry_after(response.headers.get("Retry-After")))
+                if response.status_code >= 400:
+                    raise _client_error(method, path, response)
+                try:
+                    # Decode the raw body with the fastest available JSON backend
+                    return loads(response.content)
+                except ValueError as e:
+                    raise APIError(f"Invalid JSON response from {method} {path}: {e}")
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            raise APIError(f"Network Error: {str(e)}", retryable=True)
+        except requests.exceptions.RequestException as e:
+            raise APIError(f"Network Error: {str(e)}")
+
+    def close(self):
+        self.session.close()
+
+
+_transports: Dict[Tuple[str, Optional[str]], HTTPTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def _conflicts(transport: HTTPTransport, pool_size: int, max_in_flight: Optional[int], rate_limited: bool,
+               retry: Optional[RetryPolicy]) -> List[str]:
+    """Settings a later caller asked for that differ from the existing transport's."""
+    conflicts = []
+    if pool_size != transport.pool_size:
+        conflicts.append(f"pool_size={pool_size}")
+    if (max_in_flight or pool_size) != transport.max_in_flight:
+        conflicts.append(f"max_in_flight={max_in_flight}")
+    if rate_limited != (transport.rate_limiter is not None):
+        conflicts.append(f"rate_limit={rate_limited}")
+    if retry != transport.retry:
+        conflicts.append(f"retry={retry}")
+    return conflicts
+
+
+def get_transport(base_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                  timeout: Timeout = DEFAULT_TIMEOUT, proxy: Optional[str] = None,
+                  max_in_flight: Optional[int] = None,
+                  rate_limiter: Optional[Callable[[], RateLimiter]] = None,
+                  retry: Optional[RetryPolicy] = DEFAULT_RETRY) -> HTTPTransport:
+    """
+    Return the shared transport for ``base_url``'s host, creating it on first use.
+
+    Pool size, in-flight cap, rate limiter, retry policy and default timeout are
+    fixed by the first caller for a given host; later callers should pass their
+    own timeout per request. A later caller asking for a different pool size,
+    in-flight cap, rate limiting or retry policy gets the existing transport
+    and a warning.
+
+    Args:
+        rate_limiter: Factory for the host-wide rate limiter, called only when
+            the transport is created (None = no client-side rate limiting)
+    """
+    parts = urlsplit(base_url)
+    key = (f"{parts.scheme}://{parts.netloc}", proxy)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = HTTPTransport(base_url, pool_size=pool_size, timeout=timeout, proxy=proxy,
+                                      max_in_flight=max_in_flight,
+                                      rate_limiter=rate_limiter() if rate_limiter is not None else None,
+                                      retry=retry)
+            _transports[key] = transport
+            return transport
+    conflicts = _conflicts(transport, pool_size, max_in_flight, rate_limiter is not None, retry)
+    if conflicts:
+        logger.warning("Shared transport for %s already exists; ignoring %s", transport.host, ", ".join(conflicts))
+    return transport
+
+
+def close_transports():
+    """Close every shared transport (mainly for tests and shutdown)."""
+    with _transports_lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
@@ -0,0 +1,333 @@
+"""
+Typed market-data models.
+
+Scalars (``Ticker``, ``FundingRate``, ``MarkPrice``, ``IndexTicker``,
+``OpenInterest``, ``Kline``) are frozen ``__slots__`` dataclasses with numeric
+fields already parsed. Series (``KlineSeries``) and depth (``OrderBook``) are
+column-oriented and backed by NumPy arrays: a 300-bar kline series is nine
+contiguous arrays instead of 300 lists of nine ``str`` objects, several times
+smaller and directly usable by the vectorized indicator kernels.
+
+Every model has a ``from_okx`` parser taking either an OKX response envelope
+(``{"code": "0", "data": [...]}``) or the data item(s) themselves.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from exdatahub.core.exceptions import APIError
+
+# OKX kline fields: [ts, open, high, low, close, vol, volCcy, volCcyQuote, confirm]
+KLINE_COLUMNS = ("ts", "open", "high", "low", "close", "vol", "vol_ccy", "vol_ccy_quote")
+
+
+def okx_data(payload: Union[Dict[str, Any], Sequence[Any]]) -> List[Any]:
+    """
+    Return the ``data`` list of an OKX response, or ``payload`` itself if it
+    is already a data item or list.
+
+    Raises:
+        APIError: The response carries a non-zero OKX error code
+    """
+    if isinstance(payload, dict) and "data" in payload:
+        code = payload.get("code")
+        if code not in (None, "0"):
+            raise APIError(f"OKX API Error: {payload.get('msg', '')}", code=code)
+        return payload["data"] or []
+    if isinstance(payload, dict):
+        return [payload]
+    return list(payload)
+
+
+def _first(payload: Union[Dict[str, Any], Sequence[Any]]) -> Dict[str, Any]:
+    data = okx_data(payload)
+    if not data:
+        raise ValueError("OKX payload contains no data")
+    return data[0]
+
+
+def _float(value: Any) -> Optional[float]:
+    # OKX sends "" for fields that don't apply (e.g. nextFundingRate)
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+@dataclass(frozen=True, slots=True)
+class Kline:
+    """A single candlestick (``ts`` is the bar open time in ms)."""
+    ts: int
+    open: float
+    high: float
+    low: float
+    close: float
+    vol: float
+    vol_ccy: Optional[float] = None
+    vol_ccy_quote: Optional[float] = None
+    confirmed: bool = True
+
+    @classmethod
+    def from_okx(cls, row: Sequence[str]) -> "Kline":
+        return cls(
+            ts=int(row[0]),
+            open=float(row[1]),
+            high=float(row[2]),
+            low=float(row[3]),
+            close=float(row[4]),
+            vol=float(row[5]),
+            vol_ccy=_float(row[6]) if len(row) > 6 else None,
+            vol_ccy_quote=_float(row[7]) if len(row) > 7 else None,
+            confirmed=row[8] != "0" if len(row) > 8 else True,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Ticker:
+    inst_id: str
+    last: Optional[float]
+    last_size: Optional[float]
+    bid: Optional[float]
+    bid_size: Optional[float]
+    ask: Optional[float]
+    ask_size: Optional[float]
+    open_24h: Optional[float]
+    high_24h: Optional[float]
+    low_24h: Optional[float]
+    vol_24h: Optional[float]
+    vol_ccy_24h: Optional[float]
+    ts: Optional[int]
+
+    @classmethod
+    def from_okx(cls, payload: Union[Dict[str, Any], Sequence[Any]]) -> "Ticker":
+        item = _first(payload)
+        return cls(
+            inst_id=item.get("instId", ""),
+            last=_float(item.get("last")),
+            last_size=_float(item.get("lastSz")),
+            bid=_float(item.get("bidPx")),
+            bid_size=_float(item.get("bidSz")),
+            ask=_float(item.get("askPx")),
+            ask_size=_float(item.get("askSz")),
+            open_24h=_float(item.get("open24h")),
+            high_24h=_float(item.get("high24h")),
+            low_24h=_float(item.get("low24h")),
+            vol_24h=_float(item.get("vol24h")),
+            vol_ccy_24h=_float(item.get("volCcy24h")),
+            ts=_int(item.get("ts")),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FundingRate:
+    inst_id: str
+    rate: Optional[float]
+    next_rate: Optional[float]
+    funding_time: Optional[int]
+    next_funding_time: Optional[int]
+
+    @classmethod
+    def from_okx(cls, payload: Union[Dict[str, Any], Sequence[Any]]) -> "FundingRate":
+        item = _first(payload)
+        return cls(
+            inst_id=item.get("instId", ""),
+            rate=_float(item.get("fundingRate")),
+            next_rate=_float(item.get("nextFundingRate")),
+            funding_time=_int(item.get("fundingTime")),
+            next_funding_time=_int(item.get("nextFundingTime")),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MarkPrice:
+    inst_id: str
+    price: Optional[float]
+    ts: Optional[int]
+
+    @classmethod
+    def from_okx(cls, payload: Union[Dict[str, Any], Sequence[Any]]) -> "MarkPrice":
+        item = _first(payload)
+        return cls(inst_id=item.get("instId", ""), price=_float(item.get("markPx")), ts=_int(item.get("ts")))
+
+
+@dataclass(frozen=True, slots=True)
+class IndexTicker:
+    inst_id: str
+    price: Optional[float]
+    ts: Optional[int]
+
+    @classmethod
+    def from_okx(cls, payload: Union[Dict[str, Any], Sequence[Any]]) -> "IndexTicker":
+        item = _first(payload)
+        return cls(inst_id=item.get("instId", ""), price=_float(item.get("idxPx")), ts=_int(item.get("ts")))
+
+
+@dataclass(frozen=True, slots=True)
+class OpenInterest:
+    inst_id: str
+    oi: Optional[float]
+    oi_ccy: Optional[float]
+    ts: Optional[int]
+
+    @classmethod
+    def from_okx(cls, payload: Union[Dict[str, Any], Sequence[Any]]) -> "OpenInterest":
+        item = _first(payload)
+        return cls(
+            inst_id=item.get("instId", ""),
+            oi=_float(item.get("oi")),
+            oi_ccy=_float(item.get("oiCcy")),
+            ts=_int(item.get("ts")),
+        )
+
+
+class KlineSeries:
+    """
+    Column-oriented kline series, oldest bar first.
+
+    Attributes:
+        ts: int64 bar open times (ms)
+        open, high, low, close, vol, vol_ccy, vol_ccy_quote: float64 columns
+        confirmed: bool column (False for a bar that is still open)
+    """
+
+    __slots__ = ("inst_id", "bar", "ts", "open", "high", "low", "close", "vol",
+                 "vol_ccy", "vol_ccy_quote", "confirmed")
+
+    def __init__(self, ts: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, vol: np.ndarray, vol_ccy: Optional[np.ndarray] = None,
+                 vol_ccy_quote: Optional[np.ndarray] = None, confirmed: Optional[np.ndarray] = None,
+                 inst_id: str = "", bar: str = ""):
+        n = len(ts)
+        self.inst_id = inst_id
+        self.bar = bar
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.vol = np.asarray(vol, dtype=np.float64)
+        self.vol_ccy = np.full(n, np.nan) if vol_ccy is None else np.asarray(vol_ccy, dtype=np.float64)
+        self.vol_ccy_quote = (np.full(n, np.nan) if vol_ccy_quote is None
+                              else np.asarray(vol_ccy_quote, dtype=np.float64))
+        self.confirmed = np.ones(n, dtype=bool) if confirmed is None else np.asarray(confirmed, dtype=bool)
+
+    @classmethod
+    def from_okx(cls, payload: Union[Dict[str, Any], Sequence[Sequence[str]]],
+                 inst_id: str = "", bar: str = "") -> "KlineSeries":
+        """
+        Parse OKX kline rows (response or list, newest-first or oldest-first).
+
+        The numeric columns are converted in one ``np.array`` call over the
+        rows, with no per-field Python objects kept around.
+        """
+        rows = okx_data(payload)
+        if not rows:
+            empty = np.empty(0)
+            return cls(np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty,
+                       inst_id=inst_id, bar=bar)
+        width = min(len(rows[0]), 8)
+        # Millisecond timestamps are exact in float64 (< 2**53)
+        values = np.array([row[:width] for row in rows], dtype=np.float64)
+        confirmed = np.array([len(row) <= 8 or row[8] != "0" for row in rows], dtype=bool)
+        if len(rows) > 1 and values[0, 0] > values[-1, 0]:
+            # OKX REST returns newest first
+            values = values[::-1]
+            confirmed = confirmed[::-1]
+        # One row per column, each contiguous
+        columns = np.ascontiguousarray(values.T)
+        return cls(
+            columns[0].astype(np.int64), columns[1], columns[2], columns[3], columns[4], columns[5],
+            vol_ccy=columns[6] if width > 6 else None,
+            vol_ccy_quote=columns[7] if width > 7 else None,
+            confirmed=confirmed, inst_id=inst_id, bar=bar,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __getitem__(self, index: int) -> Kline:
+        return Kline(
+            ts=int(self.ts[index]),
+            open=float(self.open[index]),
+            high=float(self.high[index]),
+            low=float(self.low[index]),
+            close=float(self.close[index]),
+            vol=float(self.vol[index]),
+            vol_ccy=_nan_to_none(self.vol_ccy[index]),
+            vol_ccy_quote=_nan_to_none(self.vol_ccy_quote[index]),
+            confirmed=bool(self.confirmed[index]),
+        )
+
+    def last(self) -> Optional[Kline]:
+        return self[-1] if len(self) else None
+
+    def tail(self, n: int) -> "KlineSeries":
+        """The last ``n`` bars (views, no copy)."""
+        start = max(len(self) - n, 0)
+        return KlineSeries(self.ts[start:], self.open[start:], self.high[start:], self.low[start:],
+                           self.close[start:], self.vol[start:], self.vol_ccy[start:],
+                           self.vol_ccy_quote[start:], self.confirmed[start:],
+                           inst_id=self.inst_id, bar=self.bar)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in KLINE_COLUMNS) + self.confirmed.nbytes
+
+
+def _nan_to_none(value: float) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class OrderBook:
+    """
+    Immutable depth snapshot: bids (best first, descending) and asks (best
+    first, ascending) as float64 price / size columns.
+
+    For a book maintained from incremental updates see
+    ``exdatahub.core.orderbook.L2Book``.
+    """
+
+    __slots__ = ("inst_id", "ts", "bid_prices", "bid_sizes", "ask_prices", "ask_sizes")
+
+    def __init__(self, bid_prices: np.ndarray, bid_sizes: np.ndarray, ask_prices: np.ndarray,
+                 ask_sizes: np.ndarray, inst_id: str = "", ts: Optional[int] = None):
+        self.inst_id = inst_id
+        self.ts = ts
+        self.bid_prices = np.asarray(bid_prices, dtype=np.float64)
+        self.bid_sizes = np.asarray(bid_sizes, dtype=np.float64)
+        self.ask_prices = np.asarray(ask_prices, dtype=np.float64)
+        self.ask_sizes = np.asarray(ask_sizes, dtype=np.float64)
+
+    @classmethod
+    def from_okx(cls, payload: Union[Dict[str, Any], Sequence[Any]], inst_id: str = "") -> "OrderBook":
+        """Parse a ``/market/books`` response or a ``books`` / ``books5`` data item."""
+        item = _first(payload)
+        bids = _levels(item.get("bids"))
+        asks = _levels(item.get("asks"))
+        return cls(bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1],
+                   inst_id=item.get("instId", inst_id), ts=_int(item.get("ts")))
+
+    def best_bid(self) -> Optional[float]:
+        return float(self.bid_prices[0]) if len(self.bid_prices) else None
+
+    def best_ask(self) -> Optional[float]:
+        return float(self.ask_prices[0]) if len(self.ask_prices) else None
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+
+def _levels(levels: Optional[Sequence[Sequence[str]]]) -> np.ndarray:
+    if not levels:
+        return np.empty((0, 2))
+    return np.array([level[:2] for level in levels], dtype=np.float64)
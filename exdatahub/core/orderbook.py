@@ -0,0 +1,272 @@
+"""
+Local L2 order book.
+
+``L2Book`` keeps both sides of a book as sorted price levels in compact
+``array('d')`` columns, applies OKX ``books`` / ``books5`` snapshots and
+incremental updates in place, and validates every update against OKX's
+CRC32 checksum and sequence IDs. Best bid/ask, depth-to-price and
+VWAP-to-size are answered from memory, so the spread never needs a REST
+round trip.
+
+Prices and sizes are also kept as the exchange's original strings, since
+the checksum is computed over them verbatim (``"0.10"`` and ``"0.1"``
+hash differently).
+"""
+import threading
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from exdatahub.core.exceptions import OrderBookError
+
+# Levels per side included in OKX's checksum
+CHECKSUM_DEPTH = 25
+
+Level = Tuple[float, float]
+
+
+class BookSide:
+    """
+    One side of the book, best level first.
+
+    Levels are stored in ascending key order, where the key is the price for
+    asks and the negated price for bids, so both sides search with bisect.
+    """
+
+    __slots__ = ("descending", "_keys", "_sizes", "_raw")
+
+    def __init__(self, descending: bool = False):
+        self.descending = descending
+        self._keys = array("d")
+        self._sizes = array("d")
+        # (price, size) strings as sent by the exchange, parallel to _keys
+        self._raw: List[Tuple[str, str]] = []
+
+    def _key(self, price: float) -> float:
+        return -price if self.descending else price
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self):
+        del self._keys[:]
+        del self._sizes[:]
+        self._raw.clear()
+
+    def set(self, price: str, size: str):
+        """Insert, replace or (size 0) remove the level at ``price``."""
+        key = self._key(float(price))
+        amount = float(size)
+        i = bisect_left(self._keys, key)
+        exists = i < len(self._keys) and self._keys[i] == key
+        if amount == 0:
+            if exists:
+                del self._keys[i]
+                del self._sizes[i]
+                del self._raw[i]
+        elif exists:
+            self._sizes[i] = amount
+            self._raw[i] = (price, size)
+        else:
+            self._keys.insert(i, key)
+            self._sizes.insert(i, amount)
+            self._raw.insert(i, (price, size))
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        return self._price(0), self._sizes[0]
+
+    def _price(self, i: int) -> float:
+        key = self._keys[i]
+        return -key if self.descending else key
+
+    def levels(self, n: Optional[int] = None) -> List[Level]:
+        """Top ``n`` levels (all if None) as (price, size)."""
+        count = len(self._keys) if n is None else min(n, len(self._keys))
+        return [(self._price(i), self._sizes[i]) for i in range(count)]
+
+    def raw(self, n: int) -> List[Tuple[str, str]]:
+        return self._raw[:n]
+
+    def depth_to(self, price: float) -> float:
+        """Total size on levels at or better than ``price``."""
+        end = bisect_right(self._keys, self._key(price))
+        return sum(self._sizes[:end])
+
+    def vwap(self, size: float) -> Optional[float]:
+        """
+        Average fill price for taking ``size`` from this side, or None if the
+        book is not deep enough.
+        """
+        if size <= 0:
+            return None
+        remaining = size
+        notional = 0.0
+        for i in range(len(self._keys)):
+            take = min(remaining, self._sizes[i])
+            notional += take * self._price(i)
+            remaining -= take
+            if remaining <= 0:
+                return notional / size
+        return None
+
+
+def okx_checksum(bids: Sequence[Tuple[str, str]], asks: Sequence[Tuple[str, str]]) -> int:
+    """
+    OKX order book checksum: CRC32 (as a signed 32-bit int) of the top 25
+    bid and ask levels interleaved as ``bid:ask:bid:ask...`` with each level
+    written ``price:size``. If one side is shorter, the other side's
+    remaining levels follow on their own.
+    """
+    parts = []
+    for i in range(CHECKSUM_DEPTH):
+        if i < len(bids):
+            parts.extend(bids[i])
+        if i < len(asks):
+            parts.extend(asks[i])
+    crc = zlib.crc32(":".join(parts).encode())
+    return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+
+class L2Book:
+    """
+    Price-level order book for one instrument (thread-safe).
+
+    Args:
+        inst_id: Instrument ID
+        validate: Check checksums and sequence IDs when the exchange sends them
+    """
+
+    def __init__(self, inst_id: str = "", validate: bool = True):
+        self.inst_id = inst_id
+        self.validate = validate
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide()
+        self.ts: Optional[int] = None
+        self.seq_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_okx(cls, response: Dict[str, Any], inst_id: str = "") -> "L2Book":
+        """Build a book from a REST ``/market/books`` response (or a single data item)."""
+        item = response["data"][0] if "data" in response else response
+        book = cls(inst_id)
+        book.apply_snapshot(item)
+        return book
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def apply(self, item: Dict[str, Any], action: Optional[str] = None):
+        """
+        Apply one pushed book message.
+
+        Args:
+            item: OKX book data item (``asks``, ``bids``, ``ts``, and
+                optionally ``checksum``, ``seqId``, ``prevSeqId``)
+            action: ``"snapshot"`` or ``"update"``; ``books5`` pushes carry no
+                action and are full snapshots
+
+        Raises:
+            OrderBookError: The book no longer matches the exchange's (bad
+                checksum or a gap in sequence IDs); resubscribe for a new
+                snapshot
+        """
+        if action == "update":
+            self.apply_update(item)
+        else:
+            self.apply_snapshot(item)
+
+    def apply_snapshot(self, item: Dict[str, Any]):
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            self._apply_levels(item)
+
+    def apply_update(self, item: Dict[str, Any]):
+        with self._lock:
+            prev_seq_id = item.get("prevSeqId")
+            if (self.validate and prev_seq_id is not None and self.seq_id is not None
+                    and int(prev_seq_id) != self.seq_id):
+                raise OrderBookError(f"{self.inst_id}: sequence gap "
+                                     f"(expected prevSeqId {self.seq_id}, got {prev_seq_id})")
+            self._apply_levels(item)
+
+    def _apply_levels(self, item: Dict[str, Any]):
+        for level in item.get("bids", ()):
+            self.bids.set(level[0], level[1])
+        for level in item.get("asks", ()):
+            self.asks.set(level[0], level[1])
+        if item.get("ts") is not None:
+            self.ts = int(item["ts"])
+        if item.get("seqId") is not None:
+            self.seq_id = int(item["seqId"])
+        checksum = item.get("checksum")
+        if self.validate and checksum is not None:
+            expected = okx_checksum(self.bids.raw(CHECKSUM_DEPTH), self.asks.raw(CHECKSUM_DEPTH))
+            if expected != int(checksum):
+                raise OrderBookError(f"{self.inst_id}: checksum mismatch "
+                                     f"(exchange {checksum}, local {expected})")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def best_bid(self) -> Optional[Level]:
+        with self._lock:
+            return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        with self._lock:
+            return self.asks.best()
+
+    def mid(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def depth_to_price(self, side: str, price: float) -> float:
+        """
+        Size available between the top of ``side`` and ``price`` (inclusive).
+
+        Args:
+            side: ``"bids"`` or ``"asks"``
+            price: Worst price to include
+        """
+        with self._lock:
+            return self._side(side).depth_to(price)
+
+    def vwap(self, side: str, size: float) -> Optional[float]:
+        """
+        Average price for filling ``size`` against ``side`` (``"asks"`` to buy,
+        ``"bids"`` to sell), or None if the book is too shallow.
+        """
+        with self._lock:
+            return self._side(side).vwap(size)
+
+    def levels(self, n: Optional[int] = None) -> Dict[str, List[Level]]:
+        with self._lock:
+            return {"bids": self.bids.levels(n), "asks": self.asks.levels(n)}
+
+    def checksum(self) -> int:
+        with self._lock:
+            return okx_checksum(self.bids.raw(CHECKSUM_DEPTH), self.asks.raw(CHECKSUM_DEPTH))
+
+    def _side(self, side: str) -> BookSide:
+        if side == "bids":
+            return self.bids
+        if side == "asks":
+            return self.asks
+        raise ValueError(f"side must be 'bids' or 'asks', got {side!r}")
@@ -0,0 +1,116 @@
+"""
+Client-side rate limiting.
+
+Token buckets keyed by endpoint path. Callers that exceed a bucket queue
+(sleep until their reservation is due) instead of being rejected, which is
+far cheaper than letting the exchange answer with 429s and retrying.
+
+``RateLimiter`` counts requests per endpoint (OKX style);
+``WeightedRateLimiter`` draws each request's weight from one budget shared
+by every endpoint (Binance style).
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+
+# (requests, period in seconds)
+Limit = Tuple[float, float]
+
+# A fixed weight, or a function of the request's query parameters
+Weight = Union[float, Callable[[Mapping[str, Any]], float]]
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `capacity` units per `period` seconds."""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.period = float(period)
+        self.rate = self.capacity / self.period
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, cost: float = 1) -> float:
+        """
+        Reserve `cost` tokens and return how long the caller must wait.
+
+        Tokens may go negative: each reservation queues behind earlier ones,
+        so concurrent callers are served in arrival order at the bucket rate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= cost
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, cost: float = 1) -> float:
+        """Block until `cost` tokens are available; returns the time waited."""
+        wait = self.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Per-endpoint token buckets.
+
+    Args:
+        limits: {path: (requests, period_seconds)}
+        default: Limit for paths not listed in `limits` (None = unlimited).
+            All unlisted paths share this single bucket.
+    """
+
+    def __init__(self, limits: Dict[str, Limit], default: Optional[Limit] = None):
+        self._buckets = {path: TokenBucket(*limit) for path, limit in limits.items()}
+        self._default = TokenBucket(*default) if default else None
+
+    def bucket_for(self, path: str) -> Optional[TokenBucket]:
+        return self._buckets.get(path, self._default)
+
+    def cost(self, path: str, params: Optional[Mapping[str, Any]] = None) -> float:
+        """How many tokens a request to `path` with `params` costs."""
+        return 1
+
+    def acquire(self, path: str, cost: float = 1) -> float:
+        """Wait for capacity on `path`'s bucket; returns the time waited."""
+        bucket = self.bucket_for(path)
+        if bucket is None:
+            return 0.0
+        return bucket.acquire(cost)
+
+
+class WeightedRateLimiter(RateLimiter):
+    """
+    One request-weight budget shared by every endpoint, plus optional
+    per-endpoint request limits.
+
+    Args:
+        capacity: Weight allowed per `period` seconds (per IP)
+        period: Budget window in seconds
+        weights: {path: weight}; a weight may be a function of the query
+            parameters (e.g. klines weigh more for a larger ``limit``)
+        limits: Extra {path: (requests, period_seconds)} limits for
+            endpoints with their own quota on top of the weight budget
+        default_weight: Weight of paths not listed in `weights`
+    """
+
+    def __init__(self, capacity: float, period: float, weights: Dict[str, Weight],
+                 limits: Optional[Dict[str, Limit]] = None, default_weight: float = 1):
+        super().__init__(limits or {})
+        self.weight_bucket = TokenBucket(capacity, period)
+        self.weights = weights
+        self.default_weight = default_weight
+
+    def cost(self, path: str, params: Optional[Mapping[str, Any]] = None) -> float:
+        weight = self.weights.get(path, self.default_weight)
+        return weight(params or {}) if callable(weight) else weight
+
+    def acquire(self, path: str, cost: float = 1) -> float:
+        """Wait for `path`'s own limit (if any), then for `cost` weight; returns the time waited."""
+        waited = super().acquire(path)
+        return waited + self.weight_bucket.acquire(cost)
@@ -0,0 +1,30 @@
+"""
+Exchange clients.
+
+Every client returns OKX V5-shaped responses, so services can switch
+exchanges by name. Client modules are imported on first use.
+"""
+import importlib
+from typing import Dict, Tuple, Type
+
+# exchange name -> (module, sync client class, async client class)
+EXCHANGES: Dict[str, Tuple[str, str, str]] = {
+    "okx": ("exdatahub.exchanges.okx_client", "OKXClient", "AsyncOKXClient"),
+    "binance": ("exdatahub.exchanges.binance_client", "BinanceFuturesClient", "AsyncBinanceFuturesClient"),
+    "bybit": ("exdatahub.exchanges.bybit_client", "BybitClient", "AsyncBybitClient"),
+}
+
+
+def client_classes(exchange: str) -> Tuple[Type, Type]:
+    """
+    Return the (sync, async) client classes for an exchange name.
+
+    Raises:
+        ValueError: Unknown exchange
+    """
+    try:
+        module_name, sync_name, async_name = EXCHANGES[exchange.lower()]
+    except KeyError:
+        raise ValueError(f"Exchange '{exchange}' not supported.") from None
+    module = importlib.import_module(module_name)
+    return getattr(module, sync_name), getattr(module, async_name)
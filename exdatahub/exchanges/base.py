@@ -1,5 +1,6 @@
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 
 class BaseExchangeClient(ABC):
     """Abstract base class for all exchange clients."""
@@ -24,3 +25,48 @@ class BaseExchangeClient(ABC):
     def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
         """Fetch orderbook data."""
         pass
+
+
+class AsyncBaseExchangeClient(ABC):
+    """
+    Abstract base class for asyncio exchange clients.
+
+    These are thread-pool wrappers over a synchronous client, not native
+    asyncio I/O: every call runs the blocking sync method on a bounded
+    executor sized to the connection pool and awaits the result. Sync and
+    async callers therefore share the same pooled keep-alive connections,
+    and concurrency is capped by the executor, not by the event loop.
+    """
+
+    def __init__(self, client: BaseExchangeClient, max_workers: Optional[int] = None):
+        self.client = client
+        transport = getattr(client, "transport", None)
+        self.max_workers = max_workers or getattr(transport, "pool_size", None) or 10
+        # Imported here so sync-only callers (the fetch CLI) don't pay for it
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="exdatahub-async")
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call (e.g. a sync client method) on the client's executor."""
+        # Only reachable from a running event loop, so asyncio is already loaded
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    @abstractmethod
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        """Fetch ticker data for a symbol."""
+        pass
+
+    @abstractmethod
+    async def fetch_klines(self, symbol: str, interval: str, limit: int = 100) -> Dict[str, Any]:
+        """Fetch kline (candlestick) data."""
+        pass
+
+    @abstractmethod
+    async def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
+        """Fetch orderbook data."""
+        pass
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,401 @@
+"""
+Binance USDⓈ-M futures public market-data client.
+
+Responses are normalized to OKX V5 shapes (``{"code": "0", "msg": "",
+"data": [...]}`` with OKX field names, klines newest first), so the typed
+``from_okx`` models, the kline store, the exporter and
+``AggregatorService.analyze_market`` work on Binance data unchanged.
+
+Funding rate, mark price and index price all come from
+``/fapi/v1/premiumIndex``; the client keeps each symbol's response for
+``premium_max_age`` seconds, so one ``analyze_market`` costs one request
+for the three of them instead of three.
+"""
+import functools
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from exdatahub.core.cache import ResponseCache, bar_cache_ttl
+from exdatahub.core.exceptions import APIError, RateLimitError
+from exdatahub.core.http import get_transport, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, DEFAULT_RETRY, RetryPolicy, Timeout
+from exdatahub.core.rate_limit import WeightedRateLimiter
+from exdatahub.exchanges.base import BaseExchangeClient, AsyncBaseExchangeClient
+from exdatahub.utils.converters import to_exchange_interval, to_exchange_symbol
+
+# Request weight budget per IP: 2400 per minute
+BINANCE_WEIGHT_LIMIT = (2400, 60)
+
+
+def _kline_weight(params: Mapping[str, Any]) -> float:
+    limit = int(params.get("limit", 500))
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def _depth_weight(params: Mapping[str, Any]) -> float:
+    limit = int(params.get("limit", 500))
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+# Published request weights of the public endpoints used here (single symbol)
+BINANCE_WEIGHTS = {
+    "/fapi/v1/klines": _kline_weight,
+    "/fapi/v1/depth": _depth_weight,
+    "/fapi/v1/ticker/24hr": 1,
+    "/fapi/v1/premiumIndex": 1,
+    "/fapi/v1/fundingRate": 1,
+    "/fapi/v1/openInterest": 1,
+    "/futures/data/openInterestHist": 0,
+}
+
+# Endpoints with their own per-IP quota besides the weight budget
+BINANCE_RATE_LIMITS = {
+    "/fapi/v1/fundingRate": (500, 300),
+    "/futures/data/openInterestHist": (1000, 300),
+}
+
+# Binance error codes meaning "too many requests"
+BINANCE_RATE_LIMIT_CODES = {-1003, -1015}
+
+# Binance error codes for transient server-side failures worth retrying:
+# unknown error, disconnected, unexpected response, timeout
+BINANCE_RETRYABLE_CODES = {-1000, -1001, -1006, -1007}
+
+# Order book depths Binance accepts
+DEPTH_LIMITS = (5, 10, 20, 50, 100, 500, 1000)
+
+# Periods accepted by /futures/data/openInterestHist
+OI_PERIODS = {"5m", "15m", "30m", "1h", "2h", "4h", "6h", "12h", "1d"}
+
+
+def _has_open_bar(rows: List[List[Any]]) -> bool:
+    """Whether a raw klines page (oldest first) ends with the still-open bar; empty pages count as open."""
+    return not rows or rows[-1][6] >= time.time() * 1000
+
+
+def binance_cache_ttl(path: str, params: Optional[Dict[str, Any]], response: Any = None) -> Optional[float]:
+    """
+    How long a response may be cached, or None if it must not be.
+
+    Same policy as ``okx_cache_ttl`` (``bar_cache_ttl``, UTC-aligned bars):
+    kline pages holding the open bar and live values are never cached.
+    """
+    params = params or {}
+    if path == "/fapi/v1/klines":
+        return bar_cache_ttl(params.get("interval", "1m") + "utc",
+                             open_bar=response is not None and _has_open_bar(response))
+    if path == "/futures/data/openInterestHist":
+        return bar_cache_ttl(params.get("period", "5m") + "utc")
+    if path == "/fapi/v1/fundingRate":
+        return bar_cache_ttl("1Hutc")
+    return None
+
+
+def _envelope(data: List[Any]) -> Dict[str, Any]:
+    return {"code": "0", "msg": "", "data": data}
+
+
+def _str(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+class BinanceFuturesClient(BaseExchangeClient):
+    """
+    Binance USDⓈ-M futures public API client.
+
+    Symbols may be given as BTCUSDT or in OKX form (BTC-USDT-SWAP) and bars in
+    OKX form (1m, 1H, 1D); both are translated. Every method returns an
+    OKX-shaped envelope.
+
+    Args:
+        premium_max_age: Seconds a symbol's premiumIndex response is reused
+            for funding / mark / index lookups
+    """
+
+    BASE_URL = "https://fapi.binance.com"
+
+    def __init__(self, api_key: str = "", secret_key: str = "", passphrase: str = "", proxy: Optional[str] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: Timeout = DEFAULT_TIMEOUT,
+                 max_in_flight: Optional[int] = None, rate_limit: bool = True,
+                 retry: Optional[RetryPolicy] = DEFAULT_RETRY, cache: Optional[ResponseCache] = None,
+                 premium_max_age: float = 1.0):
+        super().__init__(api_key, secret_key, passphrase, proxy)
+        self.timeout = timeout
+        self.cache = cache
+        self.premium_max_age = premium_max_age
+        self._premium: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._premium_locks: Dict[str, threading.Lock] = {}
+        self._premium_lock = threading.Lock()
+        limiter = None
+        if rate_limit:
+            limiter = functools.partial(WeightedRateLimiter, *BINANCE_WEIGHT_LIMIT, weights=BINANCE_WEIGHTS,
+                                        limits=BINANCE_RATE_LIMITS)
+        # Shared pooled keep-alive session and weight budget per host, as for OKX
+        self.transport = get_transport(self.BASE_URL, pool_size=pool_size, timeout=timeout, proxy=proxy,
+                                       max_in_flight=max_in_flight, rate_limiter=limiter, retry=retry)
+
+    def _request(self, method: str, path: str, params: Dict[str, Any] = None) -> Any:
+        if self.cache is not None and method == "GET":
+            if binance_cache_ttl(path, params) is not None:
+                key = (self.BASE_URL, path, tuple(sorted((params or {}).items())))
+                return self.cache.get_or_fetch(key, lambda response: binance_cache_ttl(path, params, response),
+                                               lambda: self._send(method, path, params), label=path)
+        return self._send(method, path, params)
+
+    def _send(self, method: str, path: str, params: Dict[str, Any] = None) -> Any:
+        headers = {"X-MBX-APIKEY": self.api_key} if self.api_key else None
+        return self.transport.request(method, path, params=params, headers=headers, timeout=self.timeout,
+                                      validate=self._check_response)
+
+    @staticmethod
+    def _check_response(data: Any):
+        # Successful market-data responses are plain lists / objects; errors
+        # are {"code": <negative int>, "msg": ...}
+        if not (isinstance(data, dict) and "code" in data and "msg" in data):
+            return
+        code = data["code"]
+        if code in (0, 200):
+            return
+        message = f"Binance API Error: {data.get('msg')} (code: {code})"
+        if code in BINANCE_RATE_LIMIT_CODES:
+            raise RateLimitError(message, code=str(code))
+        raise APIError(message, code=str(code), retryable=code in BINANCE_RETRYABLE_CODES)
+
+    def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch the 24h ticker.
+        Binance API: GET /fapi/v1/ticker/24hr?symbol={symbol}
+        """
+        item = self._request("GET", "/fapi/v1/ticker/24hr", {"symbol": to_exchange_symbol("binance", symbol)})
+        return _envelope([{
+            "instId": item["symbol"],
+            "last": item.get("lastPrice"),
+            "lastSz": item.get("lastQty"),
+            "askPx": "",
+            "askSz": "",
+            "bidPx": "",
+            "bidSz": "",
+            "open24h": item.get("openPrice"),
+            "high24h": item.get("highPrice"),
+            "low24h": item.get("lowPrice"),
+            "vol24h": item.get("volume"),
+            "volCcy24h": item.get("quoteVolume"),
+            "ts": _str(item.get("closeTime")),
+        }])
+
+    def fetch_klines(self, symbol: str, interval: str, limit: int = 100,
+                     after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch klines as OKX rows [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm], newest first.
+        Binance API: GET /fapi/v1/klines?symbol={symbol}&interval={interval}&limit={limit}
+
+        Pagination follows OKX (timestamps in ms):
+        - after: return bars older than this ts (the newest `limit` of them)
+        - before: return bars newer than this ts
+        """
+        params = {
+            "symbol": to_exchange_symbol("binance", symbol),
+            "interval": to_exchange_interval("binance", interval),
+            "limit": str(limit)
+        }
+        if after is not None:
+            params["endTime"] = str(int(after) - 1)
+        elif before is not None:
+            params["startTime"] = str(int(before) + 1)
+        rows = self._request("GET", "/fapi/v1/klines", params)
+
+        now_ms = int(time.time() * 1000)
+        floor = int(before) if before is not None else None
+        data = []
+        for row in reversed(rows):
+            if floor is not None and row[0] <= floor:
+                continue
+            # [openTime, open, high, low, close, volume, closeTime, quoteVolume, ...]
+            data.append([str(row[0]), row[1], row[2], row[3], row[4], row[5], row[5], row[7],
+                         "1" if row[6] < now_ms else "0"])
+        return _envelope(data)
+
+    def fetch_history_klines(self, symbol: str, interval: str, limit: int = 100,
+                             after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch older klines. Binance serves the full history from /fapi/v1/klines,
+        so this is fetch_klines (kept for parity with OKXClient's backfill API).
+        """
+        return self.fetch_klines(symbol, interval, limit=limit, after=after, before=before)
+
+    def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Fetch orderbook (levels as OKX [px, sz, "0", "0"]).
+        Binance API: GET /fapi/v1/depth?symbol={symbol}&limit={limit}
+
+        `limit` is rounded up to the nearest depth Binance accepts and the
+        result trimmed back to `limit` levels.
+        """
+        depth = next((d for d in DEPTH_LIMITS if d >= limit), DEPTH_LIMITS[-1])
+        params = {"symbol": to_exchange_symbol("binance", symbol), "limit": str(depth)}
+        item = self._request("GET", "/fapi/v1/depth", params)
+        return _envelope([{
+            "asks": [[px, sz, "0", "0"] for px, sz in item.get("asks", [])[:limit]],
+            "bids": [[px, sz, "0", "0"] for px, sz in item.get("bids", [])[:limit]],
+            "ts": _str(item.get("T") or item.get("E")),
+        }])
+
+    def _premium_index(self, symbol: str) -> Dict[str, Any]:
+        """
+        The symbol's /fapi/v1/premiumIndex response.
+
+        One request per symbol per ``premium_max_age``; concurrent callers
+        wait for the request in flight instead of issuing their own.
+        """
+        symbol = to_exchange_symbol("binance", symbol)
+        with self._premium_lock:
+            lock = self._premium_locks.setdefault(symbol, threading.Lock())
+        with lock:
+            entry = self._premium.get(symbol)
+            if entry is None or time.monotonic() - entry[0] >= self.premium_max_age:
+                item = self._request("GET", "/fapi/v1/premiumIndex", {"symbol": symbol})
+                entry = self._premium[symbol] = (time.monotonic(), item)
+            return entry[1]
+
+    def fetch_funding_rate(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch the current funding rate (from the premiumIndex snapshot).
+        Binance API: GET /fapi/v1/premiumIndex?symbol={symbol}
+
+        Binance doesn't publish a predicted next rate, so nextFundingRate is "".
+        """
+        item = self._premium_index(symbol)
+        return _envelope([{
+            "instId": item["symbol"],
+            "fundingRate": item.get("lastFundingRate"),
+            "nextFundingRate": "",
+            "fundingTime": _str(item.get("nextFundingTime")),
+            "nextFundingTime": _str(item.get("nextFundingTime")),
+            "ts": _str(item.get("time")),
+        }])
+
+    def fetch_mark_price(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch mark price (from the premiumIndex snapshot).
+        Binance API: GET /fapi/v1/premiumIndex?symbol={symbol}
+        """
+        item = self._premium_index(symbol)
+        return _envelope([{"instId": item["symbol"], "markPx": item.get("markPrice"), "ts": _str(item.get("time"))}])
+
+    def fetch_index_tickers(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch index price (from the premiumIndex snapshot).
+        Binance API: GET /fapi/v1/premiumIndex?symbol={symbol}
+        """
+        item = self._premium_index(symbol)
+        return _envelope([{"instId": item["symbol"], "idxPx": item.get("indexPrice"), "ts": _str(item.get("time"))}])
+
+    def fetch_open_interest(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch open interest (in base currency; Binance has no contract unit).
+        Binance API: GET /fapi/v1/openInterest?symbol={symbol}
+        """
+        item = self._request("GET", "/fapi/v1/openInterest", {"symbol": to_exchange_symbol("binance", symbol)})
+        return _envelope([{
+            "instId": item["symbol"],
+            "oi": item.get("openInterest"),
+            "oiCcy": item.get("openInterest"),
+            "ts": _str(item.get("time")),
+        }])
+
+    def fetch_funding_rate_history(self, symbol: str, limit: int = 24,
+                                   after: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch funding rate history, newest first.
+        Binance API: GET /fapi/v1/fundingRate?symbol={symbol}&limit={limit}
+
+        Pagination: after returns records with fundingTime older than this ts (ms).
+        """
+        params = {
+            "symbol": to_exchange_symbol("binance", symbol),
+            "limit": str(limit)
+        }
+        if after is not None:
+            params["endTime"] = str(int(after) - 1)
+        rows = self._request("GET", "/fapi/v1/fundingRate", params)
+        return _envelope([{
+            "instId": item["symbol"],
+            "fundingRate": item.get("fundingRate"),
+            "realizedRate": item.get("fundingRate"),
+            "fundingTime": _str(item.get("fundingTime")),
+        } for item in reversed(rows)])
+
+    def fetch_oi_history(self, symbol: str, period: str = "5m", limit: int = 24) -> Dict[str, Any]:
+        """
+        Fetch open interest history as {"ts", "oi", "oiCcy", "oiUsd"} rows, newest first.
+        Binance API: GET /futures/data/openInterestHist?symbol={symbol}&period={period}&limit={limit}
+        Note: Binance only keeps the latest 30 days
+        """
+        period = to_exchange_interval("binance", period)
+        if period not in OI_PERIODS:
+            raise ValueError(f"Unsupported open interest period '{period}' (one of {sorted(OI_PERIODS)})")
+        params = {
+            "symbol": to_exchange_symbol("binance", symbol),
+            "period": period,
+            "limit": str(limit)
+        }
+        rows = self._request("GET", "/futures/data/openInterestHist", params)
+        return _envelope([{
+            "ts": _str(item.get("timestamp")),
+            "oi": item.get("sumOpenInterest"),
+            "oiCcy": item.get("sumOpenInterest"),
+            "oiUsd": item.get("sumOpenInterestValue"),
+        } for item in reversed(rows)])
+
+
+class AsyncBinanceFuturesClient(AsyncBaseExchangeClient):
+    """Asyncio Binance USDⓈ-M futures client sharing BinanceFuturesClient's pooled transport."""
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(client or BinanceFuturesClient(**kwargs), max_workers=max_workers)
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_ticker, symbol)
+
+    async def fetch_klines(self, symbol: str, interval: str, limit: int = 100,
+                           after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_klines, symbol, interval, limit=limit, after=after, before=before)
+
+    async def fetch_history_klines(self, symbol: str, interval: str, limit: int = 100,
+                                   after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_history_klines, symbol, interval, limit=limit, after=after,
+                              before=before)
+
+    async def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_orderbook, symbol, limit=limit)
+
+    async def fetch_funding_rate(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_funding_rate, symbol)
+
+    async def fetch_index_tickers(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_index_tickers, symbol)
+
+    async def fetch_mark_price(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_mark_price, symbol)
+
+    async def fetch_open_interest(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_open_interest, symbol)
+
+    async def fetch_funding_rate_history(self, symbol: str, limit: int = 24,
+                                         after: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_funding_rate_history, symbol, limit=limit, after=after)
+
+    async def fetch_oi_history(self, symbol: str, period: str = "5m", limit: int = 24) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_oi_history, symbol, period=period, limit=limit)
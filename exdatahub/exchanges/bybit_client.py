@@ -0,0 +1,375 @@
+"""
+Bybit v5 public market-data client (linear USDT perpetuals).
+
+Responses are normalized to OKX V5 shapes, like the Binance client.
+
+Bybit's ``/v5/market/tickers?category=linear`` returns last price, best
+bid/ask, funding rate, mark / index price and open interest for every
+linear instrument in one response. The client keeps that snapshot for
+``tickers_max_age`` seconds and serves ``fetch_ticker``,
+``fetch_funding_rate``, ``fetch_mark_price``, ``fetch_index_tickers`` and
+``fetch_open_interest`` for any symbol from it, so the derivatives part of a
+300-symbol scan costs one request instead of 1200.
+"""
+import functools
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from exdatahub.core.cache import ResponseCache, bar_cache_ttl
+from exdatahub.core.exceptions import APIError, RateLimitError
+from exdatahub.core.http import get_transport, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, DEFAULT_RETRY, RetryPolicy, Timeout
+from exdatahub.core.rate_limit import RateLimiter
+from exdatahub.exchanges.base import BaseExchangeClient, AsyncBaseExchangeClient
+from exdatahub.utils.converters import from_exchange_interval, to_exchange_interval, to_exchange_symbol
+from exdatahub.utils.time_utils import interval_to_seconds
+
+# Public market endpoints share one per-IP limit: 600 requests per 5 seconds
+BYBIT_RATE_LIMIT = (600, 5)
+
+# Bybit retCodes meaning "too many requests"
+BYBIT_RATE_LIMIT_CODES = {10006, 10018}
+
+# Bybit retCodes for transient server-side failures worth retrying:
+# request timeout, server error
+BYBIT_RETRYABLE_CODES = {10000, 10016}
+
+# OKX period -> Bybit open interest intervalTime
+OI_INTERVALS = {"5m": "5min", "15m": "15min", "30m": "30min", "1H": "1h", "4H": "4h", "1D": "1d"}
+
+
+def _has_open_bar(response: Dict[str, Any], bar: str) -> bool:
+    """Whether a raw kline response (newest first) holds the still-open bar; empty pages count as open."""
+    rows = response["result"]["list"]
+    return not rows or int(rows[0][0]) + interval_to_seconds(bar) * 1000 > time.time() * 1000
+
+
+def bybit_cache_ttl(path: str, params: Optional[Dict[str, Any]],
+                    response: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """
+    How long a response may be cached, or None if it must not be.
+
+    Same policy as ``okx_cache_ttl`` (``bar_cache_ttl``); Bybit bars are UTC-aligned.
+    """
+    params = params or {}
+    if path == "/v5/market/kline":
+        bar = from_exchange_interval("bybit", params.get("interval", "1"))
+        return bar_cache_ttl(bar + "utc", open_bar=response is not None and _has_open_bar(response, bar))
+    if path == "/v5/market/open-interest":
+        bar = next((b for b, i in OI_INTERVALS.items() if i == params.get("intervalTime")), "5m")
+        return bar_cache_ttl(bar + "utc")
+    if path == "/v5/market/funding/history":
+        return bar_cache_ttl("1Hutc")
+    return None
+
+
+def _envelope(data) -> Dict[str, Any]:
+    return {"code": "0", "msg": "", "data": data}
+
+
+def _okx_ticker(item: Dict[str, Any], ts: str) -> Dict[str, Any]:
+    """One Bybit linear ticker -> OKX ticker fields plus the derivatives fields it carries."""
+    return {
+        "instId": item["symbol"],
+        "last": item.get("lastPrice"),
+        "lastSz": "",
+        "askPx": item.get("ask1Price"),
+        "askSz": item.get("ask1Size"),
+        "bidPx": item.get("bid1Price"),
+        "bidSz": item.get("bid1Size"),
+        "open24h": item.get("prevPrice24h"),
+        "high24h": item.get("highPrice24h"),
+        "low24h": item.get("lowPrice24h"),
+        "vol24h": item.get("volume24h"),
+        "volCcy24h": item.get("turnover24h"),
+        "markPx": item.get("markPrice"),
+        "idxPx": item.get("indexPrice"),
+        "fundingRate": item.get("fundingRate"),
+        "nextFundingTime": item.get("nextFundingTime"),
+        "oi": item.get("openInterest"),
+        "oiUsd": item.get("openInterestValue"),
+        "ts": ts,
+    }
+
+
+class BybitClient(BaseExchangeClient):
+    """
+    Bybit v5 public API client for linear (USDT) perpetuals.
+
+    Symbols may be given as BTCUSDT or in OKX form (BTC-USDT-SWAP) and bars in
+    OKX form (1m, 1H, 1D); both are translated. Every method returns an
+    OKX-shaped envelope.
+
+    Args:
+        tickers_max_age: Seconds the category-wide ticker snapshot is reused
+            for per-symbol ticker / funding / mark / index / OI lookups
+    """
+
+    BASE_URL = "https://api.bybit.com"
+    CATEGORY = "linear"
+
+    def __init__(self, api_key: str = "", secret_key: str = "", passphrase: str = "", proxy: Optional[str] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: Timeout = DEFAULT_TIMEOUT,
+                 max_in_flight: Optional[int] = None, rate_limit: bool = True,
+                 retry: Optional[RetryPolicy] = DEFAULT_RETRY, cache: Optional[ResponseCache] = None,
+                 tickers_max_age: float = 1.0):
+        super().__init__(api_key, secret_key, passphrase, proxy)
+        self.timeout = timeout
+        self.cache = cache
+        self.tickers_max_age = tickers_max_age
+        self._tickers: Dict[str, Dict[str, Any]] = {}
+        self._tickers_at: Optional[float] = None
+        self._tickers_lock = threading.Lock()
+        limiter = functools.partial(RateLimiter, {}, default=BYBIT_RATE_LIMIT) if rate_limit else None
+        self.transport = get_transport(self.BASE_URL, pool_size=pool_size, timeout=timeout, proxy=proxy,
+                                       max_in_flight=max_in_flight, rate_limiter=limiter, retry=retry)
+
+    def _request(self, method: str, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Send a request and return the response's ``result`` object."""
+        if self.cache is not None and method == "GET":
+            if bybit_cache_ttl(path, params) is not None:
+                key = (self.BASE_URL, path, tuple(sorted((params or {}).items())))
+                data = self.cache.get_or_fetch(key, lambda response: bybit_cache_ttl(path, params, response),
+                                               lambda: self._send(method, path, params), label=path)
+                return data["result"]
+        return self._send(method, path, params)["result"]
+
+    def _send(self, method: str, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        return self.transport.request(method, path, params=params, timeout=self.timeout,
+                                      validate=self._check_response)
+
+    @staticmethod
+    def _check_response(data: Dict[str, Any]):
+        code = data.get("retCode")
+        if code == 0:
+            return
+        message = f"Bybit API Error: {data.get('retMsg')} (code: {code})"
+        if code in BYBIT_RATE_LIMIT_CODES:
+            raise RateLimitError(message, code=str(code))
+        raise APIError(message, code=str(code), retryable=code in BYBIT_RETRYABLE_CODES)
+
+    def linear_tickers(self) -> Dict[str, Dict[str, Any]]:
+        """
+        {symbol: OKX-shaped ticker} for every linear instrument.
+
+        One GET /v5/market/tickers?category=linear per ``tickers_max_age``;
+        concurrent callers wait for the request in flight instead of issuing
+        their own.
+        """
+        with self._tickers_lock:
+            now = time.monotonic()
+            if self._tickers_at is None or now - self._tickers_at >= self.tickers_max_age:
+                response = self._send("GET", "/v5/market/tickers", {"category": self.CATEGORY})
+                ts = str(response.get("time", ""))
+                self._tickers = {item["symbol"]: _okx_ticker(item, ts) for item in response["result"]["list"]}
+                self._tickers_at = time.monotonic()
+            return self._tickers
+
+    def _ticker(self, symbol: str) -> Dict[str, Any]:
+        symbol = to_exchange_symbol("bybit", symbol)
+        try:
+            return self.linear_tickers()[symbol]
+        except KeyError:
+            raise APIError(f"Bybit API Error: unknown {self.CATEGORY} symbol '{symbol}'") from None
+
+    def fetch_tickers(self) -> Dict[str, Any]:
+        """
+        Fetch tickers for every linear instrument (one request).
+        Bybit API: GET /v5/market/tickers?category=linear
+
+        Each item carries the OKX ticker fields plus markPx, idxPx,
+        fundingRate, nextFundingTime, oi and oiUsd.
+        """
+        return _envelope(list(self.linear_tickers().values()))
+
+    def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        """Fetch ticker (from the category-wide snapshot)."""
+        return _envelope([self._ticker(symbol)])
+
+    def fetch_funding_rate(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch the current funding rate (from the category-wide snapshot).
+
+        Bybit doesn't publish a predicted next rate, so nextFundingRate is "".
+        """
+        item = self._ticker(symbol)
+        return _envelope([{
+            "instId": item["instId"],
+            "fundingRate": item["fundingRate"],
+            "nextFundingRate": "",
+            "fundingTime": item["nextFundingTime"],
+            "nextFundingTime": item["nextFundingTime"],
+            "ts": item["ts"],
+        }])
+
+    def fetch_mark_price(self, symbol: str) -> Dict[str, Any]:
+        """Fetch mark price (from the category-wide snapshot)."""
+        item = self._ticker(symbol)
+        return _envelope([{"instId": item["instId"], "markPx": item["markPx"], "ts": item["ts"]}])
+
+    def fetch_index_tickers(self, symbol: str) -> Dict[str, Any]:
+        """Fetch index price (from the category-wide snapshot)."""
+        item = self._ticker(symbol)
+        return _envelope([{"instId": item["instId"], "idxPx": item["idxPx"], "ts": item["ts"]}])
+
+    def fetch_open_interest(self, symbol: str) -> Dict[str, Any]:
+        """Fetch open interest in base currency (from the category-wide snapshot)."""
+        item = self._ticker(symbol)
+        return _envelope([{
+            "instId": item["instId"],
+            "oi": item["oi"],
+            "oiCcy": item["oi"],
+            "oiUsd": item["oiUsd"],
+            "ts": item["ts"],
+        }])
+
+    def fetch_klines(self, symbol: str, interval: str, limit: int = 100,
+                     after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch klines as OKX rows [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm], newest first.
+        Bybit API: GET /v5/market/kline?category=linear&symbol={symbol}&interval={interval}&limit={limit}
+
+        Pagination follows OKX (timestamps in ms):
+        - after: return bars older than this ts (the newest `limit` of them)
+        - before: return bars newer than this ts
+        """
+        params = {
+            "category": self.CATEGORY,
+            "symbol": to_exchange_symbol("bybit", symbol),
+            "interval": to_exchange_interval("bybit", interval),
+            "limit": str(limit)
+        }
+        if after is not None:
+            params["end"] = str(int(after) - 1)
+        elif before is not None:
+            params["start"] = str(int(before) + 1)
+        rows = self._request("GET", "/v5/market/kline", params)["list"]
+
+        bar_ms = interval_to_seconds(interval) * 1000
+        now_ms = int(time.time() * 1000)
+        floor = int(before) if before is not None else None
+        data = []
+        # [startTime, open, high, low, close, volume, turnover], newest first
+        for row in rows:
+            ts = int(row[0])
+            if floor is not None and ts <= floor:
+                continue
+            data.append([row[0], row[1], row[2], row[3], row[4], row[5], row[5], row[6],
+                         "1" if ts + bar_ms <= now_ms else "0"])
+        return _envelope(data)
+
+    def fetch_history_klines(self, symbol: str, interval: str, limit: int = 100,
+                             after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch older klines. Bybit serves the full history from /v5/market/kline,
+        so this is fetch_klines (kept for parity with OKXClient's backfill API).
+        """
+        return self.fetch_klines(symbol, interval, limit=limit, after=after, before=before)
+
+    def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Fetch orderbook (levels as OKX [px, sz, "0", "0"]).
+        Bybit API: GET /v5/market/orderbook?category=linear&symbol={symbol}&limit={limit}
+        """
+        params = {
+            "category": self.CATEGORY,
+            "symbol": to_exchange_symbol("bybit", symbol),
+            "limit": str(limit)
+        }
+        item = self._request("GET", "/v5/market/orderbook", params)
+        return _envelope([{
+            "instId": item.get("s"),
+            "asks": [[px, sz, "0", "0"] for px, sz in item.get("a", [])],
+            "bids": [[px, sz, "0", "0"] for px, sz in item.get("b", [])],
+            "ts": str(item.get("ts", "")),
+        }])
+
+    def fetch_funding_rate_history(self, symbol: str, limit: int = 24,
+                                   after: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch funding rate history, newest first.
+        Bybit API: GET /v5/market/funding/history?category=linear&symbol={symbol}&limit={limit}
+
+        Pagination: after returns records with fundingTime older than this ts (ms).
+        """
+        params = {
+            "category": self.CATEGORY,
+            "symbol": to_exchange_symbol("bybit", symbol),
+            "limit": str(limit)
+        }
+        if after is not None:
+            params["endTime"] = str(int(after) - 1)
+        rows = self._request("GET", "/v5/market/funding/history", params)["list"]
+        return _envelope([{
+            "instId": item["symbol"],
+            "fundingRate": item.get("fundingRate"),
+            "realizedRate": item.get("fundingRate"),
+            "fundingTime": item.get("fundingRateTimestamp"),
+        } for item in rows])
+
+    def fetch_oi_history(self, symbol: str, period: str = "5m", limit: int = 24) -> Dict[str, Any]:
+        """
+        Fetch open interest history as {"ts", "oi", "oiCcy", "oiUsd"} rows, newest first.
+        Bybit API: GET /v5/market/open-interest?category=linear&symbol={symbol}&intervalTime={period}
+        """
+        try:
+            interval_time = OI_INTERVALS[period]
+        except KeyError:
+            raise ValueError(f"Unsupported open interest period '{period}' (one of {sorted(OI_INTERVALS)})") from None
+        params = {
+            "category": self.CATEGORY,
+            "symbol": to_exchange_symbol("bybit", symbol),
+            "intervalTime": interval_time,
+            "limit": str(limit)
+        }
+        rows = self._request("GET", "/v5/market/open-interest", params)["list"]
+        return _envelope([{
+            "ts": item.get("timestamp"),
+            "oi": item.get("openInterest"),
+            "oiCcy": item.get("openInterest"),
+            "oiUsd": "",
+        } for item in rows])
+
+
+class AsyncBybitClient(AsyncBaseExchangeClient):
+    """Asyncio Bybit v5 client sharing BybitClient's pooled transport and ticker snapshot."""
+
+    def __init__(self, client: Optional[BybitClient] = None, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(client or BybitClient(**kwargs), max_workers=max_workers)
+
+    async def fetch_tickers(self) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_tickers)
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_ticker, symbol)
+
+    async def fetch_klines(self, symbol: str, interval: str, limit: int = 100,
+                           after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_klines, symbol, interval, limit=limit, after=after, before=before)
+
+    async def fetch_history_klines(self, symbol: str, interval: str, limit: int = 100,
+                                   after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_history_klines, symbol, interval, limit=limit, after=after,
+                              before=before)
+
+    async def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_orderbook, symbol, limit=limit)
+
+    async def fetch_funding_rate(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_funding_rate, symbol)
+
+    async def fetch_index_tickers(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_index_tickers, symbol)
+
+    async def fetch_mark_price(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_mark_price, symbol)
+
+    async def fetch_open_interest(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_open_interest, symbol)
+
+    async def fetch_funding_rate_history(self, symbol: str, limit: int = 24,
+                                         after: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_funding_rate_history, symbol, limit=limit, after=after)
+
+    async def fetch_oi_history(self, symbol: str, period: str = "5m", limit: int = 24) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_oi_history, symbol, period=period, limit=limit)
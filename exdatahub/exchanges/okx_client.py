@@ -1,20 +1,86 @@
-import requests
 import hmac
 import base64
 import datetime
-import json
+import functools
 from typing import Dict, Any, Optional
-from exdatahub.exchanges.base import BaseExchangeClient
-from exdatahub.core.exceptions import APIError
+from exdatahub.exchanges.base import BaseExchangeClient, AsyncBaseExchangeClient
+from exdatahub.core.exceptions import APIError, RateLimitError
+from exdatahub.core.http import get_transport, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, DEFAULT_RETRY, RetryPolicy, Timeout
+from exdatahub.core.rate_limit import RateLimiter
+from exdatahub.core.cache import ResponseCache, bar_cache_ttl
+
+# Published OKX public endpoint limits: (requests, period seconds), per IP.
+OKX_RATE_LIMITS = {
+    "/api/v5/market/ticker": (20, 2),
+    "/api/v5/market/tickers": (20, 2),
+    "/api/v5/market/index-tickers": (20, 2),
+    "/api/v5/market/books": (40, 2),
+    "/api/v5/market/candles": (40, 2),
+    "/api/v5/market/history-candles": (20, 2),
+    "/api/v5/public/instruments": (20, 2),
+    "/api/v5/public/funding-rate": (20, 2),
+    "/api/v5/public/funding-rate-history": (10, 2),
+    "/api/v5/public/open-interest": (20, 2),
+    "/api/v5/public/mark-price": (10, 2),
+    "/api/v5/rubik/stat/contracts/open-interest-history": (5, 2),
+}
+
+# OKX error codes meaning "too many requests"
+OKX_RATE_LIMIT_CODES = {"50011", "50061"}
+
+# OKX error codes for transient server-side failures worth retrying:
+# service unavailable, endpoint timeout, system busy, system error
+OKX_RETRYABLE_CODES = {"50001", "50004", "50013", "50026"}
+
+CANDLE_PATHS = ("/api/v5/market/candles", "/api/v5/market/history-candles")
+
+
+def _has_open_bar(response: Dict[str, Any]) -> bool:
+    """Whether a candles page holds the still-open bar (confirm == "0"); empty pages count as open."""
+    rows = response.get("data") or []
+    return not rows or any(row[8] == "0" for row in rows)
+
+
+def okx_cache_ttl(path: str, params: Optional[Dict[str, Any]],
+                  response: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """
+    How long a response may be cached, or None if it must not be.
+
+    Bar-aligned data follows ``bar_cache_ttl``; live values (ticker, books,
+    current funding, mark, index, current OI) are never cached. Called
+    without `response` it tells whether the endpoint is cacheable at all;
+    with the fetched page, candle pages holding the open bar are excluded.
+    """
+    params = params or {}
+    if path in CANDLE_PATHS:
+        return bar_cache_ttl(params.get("bar", "1m"), open_bar=response is not None and _has_open_bar(response))
+    if path == "/api/v5/rubik/stat/contracts/open-interest-history":
+        return bar_cache_ttl(params.get("period", "5m"))
+    if path == "/api/v5/public/funding-rate-history":
+        # Funding settles on the hour at the latest (1h/4h/8h intervals)
+        return bar_cache_ttl("1H")
+    if path == "/api/v5/public/instruments":
+        return 3600.0
+    return None
+
 
 class OKXClient(BaseExchangeClient):
     """OKX V5 API Client."""
     
     BASE_URL = "https://www.okx.com"
     
-    def __init__(self, api_key: str = "", secret_key: str = "", passphrase: str = "", proxy: Optional[str] = None):
+    def __init__(self, api_key: str = "", secret_key: str = "", passphrase: str = "", proxy: Optional[str] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: Timeout = DEFAULT_TIMEOUT,
+                 max_in_flight: Optional[int] = None, rate_limit: bool = True,
+                 retry: Optional[RetryPolicy] = DEFAULT_RETRY, cache: Optional[ResponseCache] = None):
         super().__init__(api_key, secret_key, passphrase, proxy)
-        self.proxies = {"http": proxy, "https": proxy} if proxy else None
+        self.timeout = timeout
+        self.cache = cache
+        # All OKXClient instances share one pooled keep-alive session (and
+        # one per-endpoint rate limiter, built with the transport) per host
+        limiter = functools.partial(RateLimiter, OKX_RATE_LIMITS) if rate_limit else None
+        self.transport = get_transport(self.BASE_URL, pool_size=pool_size, timeout=timeout, proxy=proxy,
+                                       max_in_flight=max_in_flight, rate_limiter=limiter, retry=retry)
 
     def _get_timestamp(self) -> str:
         return datetime.datetime.utcnow().isoformat(timespec='seconds') + 'Z'
@@ -31,8 +97,14 @@ class OKXClient(BaseExchangeClient):
         return base64.b64encode(mac.digest()).decode()
 
     def _request(self, method: str, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        url = f"{self.BASE_URL}{path}"
-        
+        if self.cache is not None and method == "GET":
+            if okx_cache_ttl(path, params) is not None:
+                key = (self.BASE_URL, path, tuple(sorted((params or {}).items())))
+                return self.cache.get_or_fetch(key, lambda response: okx_cache_ttl(path, params, response),
+                                               lambda: self._send(method, path, params), label=path)
+        return self._send(method, path, params)
+
+    def _send(self, method: str, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         # Public endpoints don't strictly need auth for market data, 
         # but good to have if we extend to private later.
         # For now, we'll skip auth headers if keys aren't provided.
@@ -58,24 +130,18 @@ class OKXClient(BaseExchangeClient):
                 "OK-ACCESS-PASSPHRASE": self.passphrase,
             })
 
-        try:
-            response = requests.request(
-                method, 
-                url, 
-                params=params, 
-                headers=headers, 
-                proxies=self.proxies,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") != "0":
-                raise APIError(f"OKX API Error: {data.get('msg')} (code: {data.get('code')})")
-                
-            return data
-        except requests.exceptions.RequestException as e:
-            raise APIError(f"Network Error: {str(e)}")
+        return self.transport.request(method, path, params=params, headers=headers, timeout=self.timeout,
+                                      validate=self._check_response)
+
+    @staticmethod
+    def _check_response(data: Dict[str, Any]):
+        code = data.get("code")
+        if code == "0":
+            return
+        message = f"OKX API Error: {data.get('msg')} (code: {code})"
+        if code in OKX_RATE_LIMIT_CODES:
+            raise RateLimitError(message, code=code)
+        raise APIError(message, code=code, retryable=code in OKX_RETRYABLE_CODES)
 
     def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
         """
@@ -86,7 +152,8 @@ class OKXClient(BaseExchangeClient):
         params = {"instId": symbol}
         return self._request("GET", path, params)
 
-    def fetch_klines(self, symbol: str, interval: str, limit: int = 100) -> Dict[str, Any]:
+    def fetch_klines(self, symbol: str, interval: str, limit: int = 100,
+                     after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
         """
         Fetch klines.
         OKX API: GET /api/v5/market/candles?instId={symbol}&bar={interval}&limit={limit}
@@ -94,6 +161,10 @@ class OKXClient(BaseExchangeClient):
         Note: OKX bar parameter is case-sensitive:
         - Lowercase for minutes: 1m, 5m, 15m, 30m
         - Uppercase for hours/days: 1H, 4H, 1D, 1W, etc.
+
+        Pagination (timestamps in ms):
+        - after: return bars older than this ts
+        - before: return bars newer than this ts
         """
         path = "/api/v5/market/candles"
         params = {
@@ -101,6 +172,30 @@ class OKXClient(BaseExchangeClient):
             "bar": interval,  # Keep the interval as-is, it should already be correct
             "limit": str(limit)
         }
+        if after is not None:
+            params["after"] = str(after)
+        if before is not None:
+            params["before"] = str(before)
+        return self._request("GET", path, params)
+
+    def fetch_history_klines(self, symbol: str, interval: str, limit: int = 100,
+                             after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch older klines (back to the instrument's listing), at most 100 per page.
+        OKX API: GET /api/v5/market/history-candles?instId={symbol}&bar={interval}&limit={limit}
+
+        Pagination works like fetch_klines (after = older than, before = newer than).
+        """
+        path = "/api/v5/market/history-candles"
+        params = {
+            "instId": symbol,
+            "bar": interval,
+            "limit": str(limit)
+        }
+        if after is not None:
+            params["after"] = str(after)
+        if before is not None:
+            params["before"] = str(before)
         return self._request("GET", path, params)
 
     def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
@@ -151,16 +246,66 @@ class OKXClient(BaseExchangeClient):
         params = {"instId": symbol}
         return self._request("GET", path, params)
 
-    def fetch_funding_rate_history(self, symbol: str, limit: int = 24) -> Dict[str, Any]:
+    # Category-wide variants: one request returns every instrument of an
+    # instType, so scanning the whole SWAP universe costs a handful of calls.
+
+    def fetch_tickers(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        """
+        Fetch tickers for every instrument of a type.
+        OKX API: GET /api/v5/market/tickers?instType={inst_type}
+        """
+        return self._request("GET", "/api/v5/market/tickers", {"instType": inst_type})
+
+    def fetch_mark_prices(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        """
+        Fetch mark prices for every instrument of a type.
+        OKX API: GET /api/v5/public/mark-price?instType={inst_type}
+        """
+        return self._request("GET", "/api/v5/public/mark-price", {"instType": inst_type})
+
+    def fetch_open_interests(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        """
+        Fetch open interest for every instrument of a type.
+        OKX API: GET /api/v5/public/open-interest?instType={inst_type}
+        """
+        return self._request("GET", "/api/v5/public/open-interest", {"instType": inst_type})
+
+    def fetch_funding_rates(self) -> Dict[str, Any]:
+        """
+        Fetch current funding rates for every perpetual swap.
+        OKX API: GET /api/v5/public/funding-rate?instId=ANY
+        """
+        return self._request("GET", "/api/v5/public/funding-rate", {"instId": "ANY"})
+
+    def fetch_index_tickers_by_quote(self, quote_ccy: str = "USDT") -> Dict[str, Any]:
+        """
+        Fetch every index quoted in a currency (e.g. all X-USDT indexes).
+        OKX API: GET /api/v5/market/index-tickers?quoteCcy={quote_ccy}
+        """
+        return self._request("GET", "/api/v5/market/index-tickers", {"quoteCcy": quote_ccy})
+
+    def fetch_instruments(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        """
+        Fetch instrument metadata (contract size, underlying, settle currency...).
+        OKX API: GET /api/v5/public/instruments?instType={inst_type}
+        """
+        return self._request("GET", "/api/v5/public/instruments", {"instType": inst_type})
+
+    def fetch_funding_rate_history(self, symbol: str, limit: int = 24,
+                                   after: Optional[str] = None) -> Dict[str, Any]:
         """
         Fetch funding rate history.
         OKX API: GET /api/v5/public/funding-rate-history?instId={symbol}&limit={limit}
+
+        Pagination: after returns records with fundingTime older than this ts (ms).
         """
         path = "/api/v5/public/funding-rate-history"
         params = {
             "instId": symbol,
             "limit": str(limit)
         }
+        if after is not None:
+            params["after"] = str(after)
         return self._request("GET", path, params)
 
     def fetch_oi_history(self, symbol: str, period: str = "5m", limit: int = 24) -> Dict[str, Any]:
@@ -177,3 +322,61 @@ class OKXClient(BaseExchangeClient):
         }
         return self._request("GET", path, params)
 
+
+class AsyncOKXClient(AsyncBaseExchangeClient):
+    """Asyncio OKX V5 API Client sharing OKXClient's pooled transport."""
+
+    def __init__(self, client: Optional[OKXClient] = None, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(client or OKXClient(**kwargs), max_workers=max_workers)
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_ticker, symbol)
+
+    async def fetch_klines(self, symbol: str, interval: str, limit: int = 100,
+                           after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_klines, symbol, interval, limit=limit, after=after, before=before)
+
+    async def fetch_history_klines(self, symbol: str, interval: str, limit: int = 100,
+                                   after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_history_klines, symbol, interval, limit=limit, after=after,
+                              before=before)
+
+    async def fetch_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_orderbook, symbol, limit=limit)
+
+    async def fetch_funding_rate(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_funding_rate, symbol)
+
+    async def fetch_index_tickers(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_index_tickers, symbol)
+
+    async def fetch_mark_price(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_mark_price, symbol)
+
+    async def fetch_open_interest(self, symbol: str) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_open_interest, symbol)
+
+    async def fetch_tickers(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        return await self.run(self.client.fetch_tickers, inst_type)
+
+    async def fetch_mark_prices(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        return await self.run(self.client.fetch_mark_prices, inst_type)
+
+    async def fetch_open_interests(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        return await self.run(self.client.fetch_open_interests, inst_type)
+
+    async def fetch_funding_rates(self) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_funding_rates)
+
+    async def fetch_index_tickers_by_quote(self, quote_ccy: str = "USDT") -> Dict[str, Any]:
+        return await self.run(self.client.fetch_index_tickers_by_quote, quote_ccy)
+
+    async def fetch_instruments(self, inst_type: str = "SWAP") -> Dict[str, Any]:
+        return await self.run(self.client.fetch_instruments, inst_type)
+
+    async def fetch_funding_rate_history(self, symbol: str, limit: int = 24,
+                                         after: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_funding_rate_history, symbol, limit=limit, after=after)
+
+    async def fetch_oi_history(self, symbol: str, period: str = "5m", limit: int = 24) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_oi_history, symbol, period=period, limit=limit)
@@ -0,0 +1,396 @@
+"""
+OKX public WebSocket market-data feed.
+
+``OKXWebSocketFeed`` runs its own asyncio loop on a background thread, keeps
+one connection per OKX endpoint open (candles live on the business endpoint,
+everything else on the public one) and stores the latest push for every
+(channel, instId). Order book channels are applied to a local ``L2Book``
+(checksum-validated, resubscribed on mismatch). Callers read that live
+snapshot synchronously instead of polling REST.
+
+OKX closes connections that stay silent for 30 seconds, so the feed sends a
+text ``ping`` whenever nothing has arrived for ``ping_interval`` seconds and
+reconnects if the ``pong`` doesn't come back. Dropped connections are
+re-established with exponential backoff and every subscription is replayed.
+Data received before a reconnect is not served until it has been pushed
+again, so a snapshot is never silently stale.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import websockets
+from websockets.asyncio.client import connect
+
+from exdatahub.core.exceptions import OrderBookError
+from exdatahub.core.http import RetryPolicy
+from exdatahub.core.orderbook import L2Book
+from exdatahub.utils.logger import get_logger
+from exdatahub.utils.metrics import metrics
+from exdatahub.utils.serialization import dumps, loads
+
+PUBLIC_URL = "wss://ws.okx.com:8443/ws/v5/public"
+BUSINESS_URL = "wss://ws.okx.com:8443/ws/v5/business"
+
+# Must stay below OKX's 30 second idle timeout
+DEFAULT_PING_INTERVAL = 20.0
+
+# Reconnect backoff (max_attempts is unused: the feed reconnects forever)
+DEFAULT_RECONNECT = RetryPolicy(backoff_base=1.0, backoff_max=30.0)
+
+# Channels whose pushes are applied to a local L2Book instead of stored as-is
+BOOK_CHANNELS = {"books", "books5", "bbo-tbt", "books-l2-tbt", "books50-l2-tbt"}
+
+logger = get_logger(__name__)
+
+CandleCallback = Callable[[str, str, List[List[str]]], None]
+
+
+def market_channels(inst_id: str, frames: Iterable[str] = (), index_id: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Subscription args for everything ``analyze_market`` needs on one instrument.
+
+    Args:
+        inst_id: Instrument, e.g. BTC-USDT-SWAP
+        frames: Kline bars to stream (``candle<bar>`` channels)
+        index_id: Index for the index-tickers channel, e.g. BTC-USDT
+    """
+    args = [{"channel": channel, "instId": inst_id}
+            for channel in ("tickers", "books", "funding-rate", "mark-price", "open-interest")]
+    if index_id:
+        args.append({"channel": "index-tickers", "instId": index_id})
+    args.extend({"channel": f"candle{frame}", "instId": inst_id} for frame in frames)
+    return args
+
+
+class OKXWebSocketFeed:
+    """
+    Background WebSocket client keeping a live per-instrument snapshot.
+
+    Args:
+        public_url: Public endpoint URL
+        business_url: Business endpoint URL (candle channels)
+        proxy: Proxy URL (None connects directly)
+        ping_interval: Seconds of silence before sending a heartbeat ping
+        reconnect: Backoff policy between reconnect attempts
+        on_candle: Called as ``on_candle(inst_id, bar, rows)`` from the feed
+            thread for every candle push; rows use the REST kline layout
+    """
+
+    def __init__(self, public_url: str = PUBLIC_URL, business_url: str = BUSINESS_URL,
+                 proxy: Optional[str] = None, ping_interval: float = DEFAULT_PING_INTERVAL,
+                 reconnect: RetryPolicy = DEFAULT_RECONNECT, on_candle: Optional[CandleCallback] = None):
+        self.public_url = public_url
+        self.business_url = business_url
+        self.proxy = proxy
+        self.ping_interval = ping_interval
+        self.reconnect = reconnect
+        self.on_candle = on_candle
+
+        self._lock = threading.Lock()
+        # url -> {(channel, instId): arg}, replayed on every (re)connect
+        self._subscriptions: Dict[str, Dict[Tuple[str, str], Dict[str, str]]] = {}
+        # url -> connection generation, bumped on every successful connect
+        self._generations: Dict[str, int] = {}
+        self._connected: Dict[str, bool] = {}
+        # (channel, instId) -> (generation, received_at, item)
+        self._data: Dict[Tuple[str, str], Tuple[int, float, Dict[str, Any]]] = {}
+        # (channel, instId) -> (generation, book)
+        self._books: Dict[Tuple[str, str], Tuple[int, L2Book]] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._stop_event: Optional[asyncio.Event] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._sockets: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "OKXWebSocketFeed":
+        """Start the feed thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run_loop, name="okx-ws-feed", daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Close every connection and stop the feed thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop_event.set)
+        thread.join(timeout)
+        self._ready.clear()
+
+    def __enter__(self) -> "OKXWebSocketFeed":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run_loop(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        with self._lock:
+            urls = [url for url, subs in self._subscriptions.items() if subs]
+        for url in urls:
+            self._ensure_connection(url)
+        self._ready.set()
+
+        await self._stop_event.wait()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        with self._lock:
+            self._connected.clear()
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def _url_for(self, channel: str) -> str:
+        return self.business_url if channel.startswith("candle") else self.public_url
+
+    def subscribe(self, args: Iterable[Dict[str, str]]):
+        """
+        Subscribe to channels (OKX ``{"channel": ..., "instId": ...}`` args).
+
+        Already-subscribed args are ignored; new ones are sent immediately if
+        the feed is running and replayed on every reconnect.
+        """
+        new: Dict[str, List[Dict[str, str]]] = {}
+        with self._lock:
+            for arg in args:
+                url = self._url_for(arg["channel"])
+                subs = self._subscriptions.setdefault(url, {})
+                key = (arg["channel"], arg.get("instId", ""))
+                if key not in subs:
+                    subs[key] = dict(arg)
+                    new.setdefault(url, []).append(dict(arg))
+            running = self._thread is not None
+        if new and running:
+            self._ready.wait()
+            for url, url_args in new.items():
+                asyncio.run_coroutine_threadsafe(self._subscribe_now(url, url_args), self._loop)
+
+    async def _subscribe_now(self, url: str, args: List[Dict[str, str]]):
+        self._ensure_connection(url)
+        ws = self._sockets.get(url)
+        if ws is not None:
+            try:
+                await self._send_subscribe(ws, args)
+            except websockets.exceptions.ConnectionClosed:
+                # Replayed by the reconnect
+                pass
+
+    @staticmethod
+    async def _send_subscribe(ws, args: List[Dict[str, str]]):
+        await ws.send(dumps({"op": "subscribe", "args": args}, compact=True))
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _ensure_connection(self, url: str):
+        task = self._tasks.get(url)
+        if task is None or task.done():
+            self._tasks[url] = asyncio.ensure_future(self._connection(url))
+
+    async def _connection(self, url: str):
+        attempt = 0
+        while True:
+            try:
+                async with connect(url, proxy=self.proxy, ping_interval=None, max_size=None) as ws:
+                    attempt = 0
+                    with self._lock:
+                        self._generations[url] = self._generations.get(url, 0) + 1
+                        self._connected[url] = True
+                        args = list(self._subscriptions.get(url, {}).values())
+                    self._sockets[url] = ws
+                    metrics.incr("ws.connects", url=url)
+                    if args:
+                        await self._send_subscribe(ws, args)
+                    await self._read(ws, url)
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                logger.warning("WebSocket %s disconnected: %s", url, e)
+            except Exception:
+                # Never let a bug in message handling kill the feed
+                logger.exception("WebSocket %s failed", url)
+            finally:
+                self._sockets.pop(url, None)
+                with self._lock:
+                    self._connected[url] = False
+
+            attempt += 1
+            delay = self.reconnect.delay(attempt)
+            metrics.incr("ws.reconnects", url=url)
+            logger.info("Reconnecting to %s in %.2fs", url, delay)
+            await asyncio.sleep(delay)
+
+    async def _read(self, ws, url: str):
+        while True:
+            try:
+                message = await asyncio.wait_for(ws.recv(), self.ping_interval)
+            except asyncio.TimeoutError:
+                await ws.send("ping")
+                try:
+                    message = await asyncio.wait_for(ws.recv(), self.ping_interval)
+                except asyncio.TimeoutError:
+                    raise ConnectionError("Heartbeat timed out (no pong)")
+            if message == "pong":
+                continue
+            self._handle(url, message)
+
+    def _handle(self, url: str, message: str):
+        try:
+            msg = loads(message)
+        except ValueError:
+            logger.warning("Ignoring non-JSON WebSocket message: %r", message[:200])
+            return
+
+        event = msg.get("event")
+        if event == "error":
+            metrics.incr("ws.errors", code=str(msg.get("code")))
+            logger.warning("WebSocket error %s: %s", msg.get("code"), msg.get("msg"))
+            return
+        if event is not None:
+            return
+
+        arg = msg.get("arg") or {}
+        data = msg.get("data")
+        channel = arg.get("channel")
+        if not channel or not data:
+            return
+        inst_id = arg.get("instId", "")
+        metrics.incr("ws.messages", channel=channel)
+
+        if channel in BOOK_CHANNELS:
+            self._apply_book(url, channel, inst_id, msg.get("action"), data)
+            return
+
+        with self._lock:
+            generation = self._generations.get(url, 0)
+            self._data[(channel, inst_id)] = (generation, time.time(), data[0])
+
+        if channel.startswith("candle") and self.on_candle is not None:
+            try:
+                self.on_candle(inst_id, channel[len("candle"):], data)
+            except Exception:
+                logger.exception("Candle callback failed for %s %s", inst_id, channel)
+
+    def _apply_book(self, url: str, channel: str, inst_id: str, action: Optional[str],
+                    data: List[Dict[str, Any]]):
+        key = (channel, inst_id)
+        with self._lock:
+            generation = self._generations.get(url, 0)
+            if action == "update":
+                entry = self._books.get(key)
+                book = entry[1] if entry and entry[0] == generation else None
+            else:
+                book = L2Book(inst_id)
+                self._books[key] = (generation, book)
+        try:
+            if book is None:
+                raise OrderBookError(f"{inst_id}: update received before a snapshot")
+            for item in data:
+                book.apply(item, action)
+        except OrderBookError as e:
+            metrics.incr("ws.book_resyncs", channel=channel)
+            logger.warning("Order book out of sync, resubscribing: %s", e)
+            with self._lock:
+                self._books.pop(key, None)
+            asyncio.ensure_future(self._resubscribe(url, {"channel": channel, "instId": inst_id}))
+
+    async def _resubscribe(self, url: str, arg: Dict[str, str]):
+        """Unsubscribe and subscribe again so the exchange sends a fresh snapshot."""
+        ws = self._sockets.get(url)
+        if ws is None:
+            return
+        try:
+            await ws.send(dumps({"op": "unsubscribe", "args": [arg]}, compact=True))
+            await self._send_subscribe(ws, [arg])
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def _live(self, key: Tuple[str, str], max_age: Optional[float]) -> Optional[Tuple[int, float, Dict[str, Any]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        generation, received_at, _ = entry
+        url = self._url_for(key[0])
+        if not self._connected.get(url) or generation != self._generations.get(url):
+            return None
+        if max_age is not None and time.time() - received_at > max_age:
+            return None
+        return entry
+
+    def get(self, channel: str, inst_id: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Latest pushed item for (channel, instId), or None.
+
+        Only data pushed over the current connection counts as live.
+
+        Args:
+            channel: OKX channel name, e.g. ``mark-price`` or ``candle1m``
+            inst_id: Instrument ID
+            max_age: Also reject items older than this many seconds
+        """
+        with self._lock:
+            entry = self._live((channel, inst_id), max_age)
+        return entry[2] if entry else None
+
+    def live_generation(self, channel: str, inst_id: str) -> Optional[int]:
+        """
+        Connection generation under which (channel, instId) is live, or None.
+
+        The generation changes on every reconnect; pushes may have been missed
+        in between, so callers holding derived state (e.g. kline history)
+        should resynchronise when it changes.
+        """
+        with self._lock:
+            entry = self._live((channel, inst_id), None)
+        return entry[0] if entry else None
+
+    def book(self, inst_id: str, channel: str = "books") -> Optional[L2Book]:
+        """
+        Live local order book for ``inst_id``, or None.
+
+        The returned book keeps updating in place; None means the channel is
+        not subscribed, not yet snapshotted, or resyncing after a reconnect or
+        checksum failure.
+        """
+        url = self._url_for(channel)
+        with self._lock:
+            entry = self._books.get((channel, inst_id))
+            if (entry is None or not self._connected.get(url)
+                    or entry[0] != self._generations.get(url)):
+                return None
+            return entry[1]
+
+    def snapshot(self, inst_id: str, max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Every live channel for ``inst_id``: {channel: latest item}."""
+        with self._lock:
+            keys = [key for key in self._data if key[1] == inst_id]
+            return {key[0]: entry[2] for key in keys if (entry := self._live(key, max_age))}
+
+    def is_connected(self, channel: str = "tickers") -> bool:
+        """Whether the endpoint serving ``channel`` is currently connected."""
+        with self._lock:
+            return bool(self._connected.get(self._url_for(channel)))
@@ -1,199 +1,738 @@
-from typing import Dict, Any, List, Optional
-from exdatahub.exchanges.okx_client import OKXClient
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, AsyncIterator, Tuple
+from exdatahub.core.http import RetryPolicy, DEFAULT_RETRY
+from exdatahub.core.cache import ResponseCache
+from exdatahub.core.models import Kline
+from exdatahub.exchanges import client_classes
+from exdatahub.exchanges.base import AsyncBaseExchangeClient
 from exdatahub.services.analysis import AnalysisService
+from exdatahub.services.derived_metrics import DerivedMetrics
+from exdatahub.services.kline_store import KlineStore
+from exdatahub.services.indicators import IndicatorEngine
 from exdatahub.config.settings import settings
-from exdatahub.config.config_loader import ConfigLoader
+from exdatahub.utils.converters import index_symbol as exchange_index_symbol
+from exdatahub.utils.logger import get_logger
+import asyncio
 import concurrent.futures
+import threading
+
+if TYPE_CHECKING:
+    # Only for annotations; loading YAML support is left to callers that read a config file
+    from exdatahub.config.config_loader import ConfigLoader
+
+logger = get_logger(__name__)
+
+DEFAULT_FRAMES = ['1m', '5m', '15m', '1H', '4H', '1D']
+
+# 盘口深度统计范围：中间价上下 0.5%
+DEPTH_BAND = 0.005
+
+# refresh_parts 中除 K 线周期以外的部分
+REFRESH_PARTS = ("funding", "price", "oi")
 
 class AggregatorService:
-    def __init__(self, exchange_name: str = 'okx', config: Optional[ConfigLoader] = None):
+    def __init__(self, exchange_name: str = 'okx', config: Optional['ConfigLoader'] = None):
         self.config = config
-        if exchange_name.lower() == 'okx':
-            self.client = OKXClient(
-                api_key=settings.OKX_API_KEY,
-                secret_key=settings.OKX_SECRET_KEY,
-                passphrase=settings.OKX_PASSPHRASE,
-                proxy=settings.HTTP_PROXY
-            )
-        else:
-            raise ValueError(f"Exchange '{exchange_name}' not supported.")
-
-    def analyze_market(self, symbol: str, frames: List[str] = None) -> Dict[str, Any]:
+        self._async_client = None
+        # 增量 K 线存储：服务常驻时，后续刷新只拉取新 K 线
+        self.kline_store = KlineStore(exchange_name.lower())
+        # 指标计算后端：pandas（pandas_ta 全量重算）、numpy（向量化内核）或 streaming（增量引擎）
+        self.indicator_backend = config.indicator_backend if config else 'pandas'
+        self._engines: Dict[Tuple[str, str], IndicatorEngine] = {}
+        self._engines_lock = threading.Lock()
+        # WebSocket 实时行情（websocket.enabled 时在首次分析时启动）
+        self.feed = None
+        self._feed_lock = threading.Lock()
+        # (symbol, frame) -> 最近一次用 REST 补齐 K 线时的 WebSocket 连接代数
+        self._kline_sync: Dict[Tuple[str, str], int] = {}
+        # 全市场衍生品扫描（批量分析 / 常驻模式时由 enable_scanner 启用）
+        self.scanner = None
+        self._scanner_lock = threading.Lock()
+        # 已收盘 K 线的磁盘存储（candle_store.directory 配置时启用）
+        self.candle_store = None
+        if config and config.candle_store_directory:
+            from exdatahub.core.candle_store import CandleStore
+            self.candle_store = CandleStore(config.candle_store_directory, exchange_name.lower())
+        self.exchange_name = exchange_name.lower()
+        client_cls, self._async_client_cls = client_classes(self.exchange_name)
+        credentials = {}
+        if self.exchange_name == 'okx':
+            credentials = dict(api_key=settings.OKX_API_KEY, secret_key=settings.OKX_SECRET_KEY,
+                               passphrase=settings.OKX_PASSPHRASE)
+        self.client = client_cls(
+            proxy=settings.HTTP_PROXY,
+            pool_size=config.http_pool_size if config else 20,
+            timeout=config.http_timeout if config else 10,
+            max_in_flight=config.http_max_in_flight if config else None,
+            rate_limit=config.http_rate_limit if config else True,
+            retry=RetryPolicy(**config.http_retry) if config else DEFAULT_RETRY,
+            cache=self._create_cache(config),
+            **credentials
+        )
+        # 合约元数据注册表（instruments.path 配置时启用，目前仅 OKX）：启动时从磁盘加载，缺失或过期时后台拉取
+        self.instruments = None
+        if config and config.instruments_path and self.exchange_name == 'okx':
+            from exdatahub.services.instruments import InstrumentRegistry
+            self.instruments = InstrumentRegistry(self.client, config.instruments_path,
+                                                  refresh_interval=config.instruments_refresh_interval)
+            self.instruments.load()
+
+    @staticmethod
+    def _create_cache(config: Optional['ConfigLoader']) -> Optional[ResponseCache]:
+        if not (config and config.cache_enabled):
+            return None
+        return ResponseCache(max_entries=config.cache_max_entries, disk_dir=config.cache_disk_dir)
+
+    @property
+    def async_client(self) -> AsyncBaseExchangeClient:
+        """Asyncio client sharing this service's pooled transport (created on first use)."""
+        if self._async_client is None:
+            self._async_client = self._async_client_cls(self.client)
+        return self._async_client
+
+    def close(self):
+        if self._async_client is not None:
+            self._async_client.close()
+            self._async_client = None
+        if self.feed is not None:
+            self.feed.stop()
+            self.feed = None
+
+    def _subscribe_feed(self, symbol: str, frames: List[str]):
+        """websocket.enabled 时启动实时行情（首次调用）并订阅该交易对的全部频道（目前仅 OKX）"""
+        if not (self.config and self.config.websocket_enabled) or self.exchange_name != 'okx':
+            return
+        with self._feed_lock:
+            if self.feed is None:
+                from exdatahub.exchanges.okx_ws import OKXWebSocketFeed
+                self.feed = OKXWebSocketFeed(
+                    proxy=settings.HTTP_PROXY,
+                    ping_interval=self.config.websocket_ping_interval,
+                    on_candle=self._on_candle
+                ).start()
+            feed = self.feed
+        from exdatahub.exchanges.okx_ws import market_channels
+        feed.subscribe(market_channels(symbol, frames, self._index_symbol(symbol)))
+
+    def _on_candle(self, symbol: str, frame: str, rows: List[List[str]]):
+        # WebSocket 推送的 K 线直接合并进增量存储
+        self.kline_store.apply(symbol, frame, rows, limit=self._frame_limit(frame))
+        if self.candle_store is not None:
+            self.candle_store.append(symbol, frame, rows)
+
+    def _from_feed(self, channel: str, inst_id: str) -> Optional[Dict[str, Any]]:
         """
-        Fetch all market data and calculate indicators.
-        
-        Args:
-            symbol: Trading pair symbol
-            frames: List of timeframes (if None, use config or default)
+        从 WebSocket 快照读取数据，包装成与 REST 相同的响应结构
+
+        快照不可用（未开启、尚未推送或断线重连中）时返回 None，由调用方退回 REST
+        """
+        if self.feed is None:
+            return None
+        max_age = self.config.websocket_max_age if self.config else None
+        item = self.feed.get(channel, inst_id, max_age=max_age)
+        if item is None:
+            return None
+        return {"code": "0", "msg": "", "data": [item]}
+
+    def enable_scanner(self, symbol_count: int) -> bool:
+        """
+        批量场景启用全市场衍生品扫描（目前仅 OKX）
+
+        交易对数量达到 scanner.min_symbols 时，资金费率 / 持仓量 / 标记价 / 指数价改为读取
+        DerivativesScanner 的全市场表（每 scanner.max_age 秒用几次全市场请求刷新一次），
+        表中没有的合约仍逐个请求。已启用时保持启用。
+
+        Returns:
+            扫描是否已启用
+        """
+        if self.exchange_name != 'okx' or (self.config and not self.config.scanner_enabled):
+            return False
+        with self._scanner_lock:
+            if self.scanner is None and symbol_count >= (self.config.scanner_min_symbols if self.config else 5):
+                from exdatahub.services.scanner import DerivativesScanner
+                max_age = self.config.scanner_max_age if self.config else 1.0
+                self.scanner = DerivativesScanner(self.client, max_age=max_age)
+            return self.scanner is not None
+
+    def refresh_scanner(self) -> bool:
+        """
+        全市场扫描表超过 scanner.max_age 时重新扫描（未启用扫描时什么都不做）
+
+        批量分析与常驻模式每轮只调用一次，之后各交易对只读取扫描表，
+        不会因为单个交易对的读取而重复下载全市场数据。
+
+        Returns:
+            是否执行了扫描
+        """
+        return self.scanner.refresh() if self.scanner is not None else False
+
+    def _from_scan(self, channel: str, inst_id: str) -> Optional[Dict[str, Any]]:
+        """
+        从全市场扫描表读取数据，包装成与 REST 相同的响应结构（只读表，不触发扫描）
+
+        未启用扫描或表中没有该合约时返回 None，由调用方退回逐个请求
         """
-        # Use config if available
+        if self.scanner is None:
+            return None
+        item = self.scanner.get(channel, inst_id)
+        if item is None:
+            return None
+        return {"code": "0", "msg": "", "data": [item]}
+
+    def resolve_frames(self, frames: Optional[List[str]] = None) -> List[str]:
+        """Timeframes to analyze: `frames`, else the configured ones, else the defaults."""
         if frames is None:
-            frames = self.config.kline_frames if self.config else ['1m', '5m', '15m', '1H', '4H', '1D']
-        
-        result = {
+            frames = self.config.kline_frames if self.config else DEFAULT_FRAMES
+        return frames
+
+    def _frame_limit(self, frame: str) -> int:
+        # 获取每个周期的 limit
+        return self.config.get_kline_limit(frame) if self.config else 300
+
+    @property
+    def _funding_history_enabled(self) -> bool:
+        return bool(self.config and self.config.enable_funding_history)
+
+    @property
+    def _oi_history_enabled(self) -> bool:
+        return bool(self.config and self.config.enable_oi_history)
+
+    @staticmethod
+    def _new_result(symbol: str) -> Dict[str, Any]:
+        return {
             "symbol": symbol,
             "timestamp": None,
             "klines": {},
             "derivatives": {}
         }
 
+    def _registry(self):
+        """
+        合约元数据注册表（未启用时为 None）
+
+        不阻塞分析：磁盘文件缺失或过期时都在后台拉取，拉取完成前按 instId 推断指数、不校验交易对
+        """
+        return self.instruments.ensure(block_if_empty=False) if self.instruments is not None else None
+
+    def _check_symbol(self, symbol: str):
+        """注册表已加载时校验交易对，未知合约直接报错，不再发出注定失败的请求"""
+        registry = self._registry()
+        if registry is not None and len(registry) and symbol not in registry:
+            raise ValueError(f"Unknown {self.exchange_name.upper()} instrument '{symbol}'")
+
+    def _index_symbol(self, symbol: str) -> str:
+        # Symbol to query the index price with (OKX: BTC-USDT-SWAP -> BTC-USDT);
+        # the instrument registry knows the exact underlying when enabled
+        registry = self._registry()
+        if registry is not None:
+            return registry.index_symbol(symbol)
+        return exchange_index_symbol(self.exchange_name, symbol)
+
+    def analyze_market(self, symbol: str, frames: List[str] = None, rescan: bool = True) -> Dict[str, Any]:
+        """
+        Fetch all market data and calculate indicators.
+
+        Args:
+            symbol: Trading pair symbol
+            frames: List of timeframes (if None, use config or default)
+            rescan: Refresh the market-wide scanner tables first (callers that
+                refresh them once for many symbols pass False)
+        """
+        frames = self.resolve_frames(frames)
+        self._check_symbol(symbol)
+        result = self._new_result(symbol)
+        self._subscribe_feed(symbol, frames)
+
         # 1. Fetch Klines for all frames (Parallel)
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_frame = {}
-            for frame in frames:
-                # 获取每个周期的 limit
-                limit = self.config.get_kline_limit(frame) if self.config else 300
-                future_to_frame[executor.submit(self.client.fetch_klines, symbol, frame, limit=limit)] = frame
-            
-            for future in concurrent.futures.as_completed(future_to_frame):
-                frame = future_to_frame[future]
-                try:
-                    data = future.result()
-                    if data.get("code") == "0":
-                        # OKX returns data in 'data' field
-                        # We need to reverse it to be chronological for pandas_ta?
-                        # OKX returns newest first. pandas_ta usually expects chronological (oldest first).
-                        # Let's reverse it.
-                        raw_klines = data.get("data", [])
-                        raw_klines.reverse()
-                        
-                        # Calculate indicators
-                        indicators = AnalysisService.calculate_indicators(raw_klines)
-                        
-                        # Calculate derived metrics (labels)
-                        from exdatahub.services.derived_metrics import DerivedMetrics
-                        
-                        # 获取当前价格（最新K线的收盘价）
-                        current_price = None
-                        if raw_klines:
-                            try:
-                                current_price = float(raw_klines[-1][4])  # close price
-                            except (IndexError, ValueError, TypeError):
-                                pass
-                        
-                        summary = {
-                            "trend_label": DerivedMetrics.get_trend_label(indicators),
-                            "volatility_label": DerivedMetrics.get_volatility_label(indicators, current_price),
-                            "volume_label": DerivedMetrics.get_volume_label(indicators.get('volume', {}))
-                        }
-                        
-                        result["klines"][frame] = {
-                            "data": raw_klines[-5:], # Only show last 5 to avoid huge JSON in console, user can adjust
-                            "indicators": indicators,
-                            "summary": summary
-                        }
-                        
-                        if frame == '1m' and raw_klines:
-                            result["timestamp"] = raw_klines[-1][0] # Use 1m close time as ref
-                            
-                except Exception as e:
-                    result["klines"][frame] = {"error": str(e)}
+            for future in [executor.submit(self.refresh_frame, result, frame) for frame in frames]:
+                future.result()
+
+        # 2. Fetch Derivatives Data (price first: OI converts contracts to USD at the mark price)
+        if rescan:
+            self.refresh_scanner()
+        self.refresh_funding(result)
+        self.refresh_price(result)
+        self.refresh_oi(result)
+        self._add_orderbook(result)
+        return result
+
+    # Each refresh_* method updates one section of an analyze_market result in
+    # place, recording a failure as {"error": ...} in that section. The watch
+    # daemon calls them (through refresh_parts) on their own schedules to keep
+    # a snapshot current.
+
+    def refresh_parts(self, symbol: str, parts: Iterable[str] = (),
+                      result: Optional[Dict[str, Any]] = None, rescan: bool = True) -> Dict[str, Any]:
+        """
+        Refresh selected sections of an analyze_market result.
+
+        Args:
+            symbol: Trading pair symbol
+            parts: Kline frames (e.g. "1m") and/or "funding", "price" (mark /
+                index plus the live order book) and "oi"
+            result: Result to update in place; None starts an empty one
+            rescan: Refresh the market-wide scanner tables before reading
+                derivatives (the watch daemon refreshes them once per tick
+                and passes False)
 
-        # 2. Fetch Derivatives Data
-        # Funding Rate
+        Returns:
+            The updated result
+        """
+        if result is None:
+            result = self._new_result(symbol)
+        parts = list(parts)
+        if rescan and any(part in REFRESH_PARTS for part in parts):
+            self.refresh_scanner()
+        for frame in parts:
+            if frame not in REFRESH_PARTS:
+                self.refresh_frame(result, frame)
+        if "funding" in parts:
+            self.refresh_funding(result)
+        # Price before OI: OI converts contracts to USD at the mark price
+        if "price" in parts:
+            self.refresh_price(result)
+            self.refresh_orderbook(result)
+        if "oi" in parts:
+            self.refresh_oi(result)
+        return result
+
+    def refresh_frame(self, result: Dict[str, Any], frame: str):
+        """Refresh result["klines"][frame] (klines, indicators and labels)."""
+        try:
+            self._add_frame(result, frame, self._fetch_frame(result["symbol"], frame))
+        except Exception as e:
+            result["klines"][frame] = {"error": str(e)}
+
+    def refresh_funding(self, result: Dict[str, Any]):
+        """Refresh result["derivatives"]["funding_rate"] (plus history if enabled)."""
+        symbol = result["symbol"]
         try:
-            funding = self.client.fetch_funding_rate(symbol)
-            if funding.get("code") == "0" and funding.get("data"):
-                f_data = funding["data"][0]
-                result["derivatives"]["funding_rate"] = {
-                    "current": f_data.get("fundingRate"),
-                    "next": f_data.get("nextFundingRate"),
-                    "next_time": f_data.get("nextFundingTime")
-                }
-                
-                # Add funding history if enabled
-                if self.config and self.config.enable_funding_history:
-                    try:
-                        history = self.client.fetch_funding_rate_history(
-                            symbol, 
-                            limit=self.config.funding_history_limit
-                        )
-                        if history.get("code") == "0" and history.get("data"):
-                            result["derivatives"]["funding_rate"]["history"] = [
-                                {
-                                    "ts": item.get("fundingTime"),
-                                    "rate": item.get("fundingRate")
-                                }
-                                for item in history["data"]
-                            ]
-                            
-                            # Calculate funding stats
-                            from exdatahub.services.derived_metrics import DerivedMetrics
-                            stats = DerivedMetrics.calculate_funding_stats(
-                                result["derivatives"]["funding_rate"]["history"]
-                            )
-                            result["derivatives"]["funding_rate"].update(stats)
-                    except Exception as e:
-                        result["derivatives"]["funding_rate"]["history_error"] = str(e)
+            funding = (self._from_feed("funding-rate", symbol) or self._from_scan("funding-rate", symbol)
+                       or self.client.fetch_funding_rate(symbol))
+            history = None
+            if self._funding_history_enabled and funding.get("code") == "0" and funding.get("data"):
+                try:
+                    history = self.client.fetch_funding_rate_history(
+                        symbol,
+                        limit=self.config.funding_history_limit
+                    )
+                except Exception as e:
+                    history = e
+            self._add_funding(result, funding, history)
         except Exception as e:
             result["derivatives"]["funding_rate"] = {"error": str(e)}
 
+    def refresh_oi(self, result: Dict[str, Any]):
+        """Refresh result["derivatives"]["oi"] (plus history if enabled)."""
+        symbol = result["symbol"]
         try:
-            oi = self.client.fetch_open_interest(symbol)
-            if oi.get("code") == "0" and oi.get("data"):
-                oi_data = oi["data"][0]
-                current_oi = float(oi_data.get("oi", 0))
-                result["derivatives"]["oi"] = {
-                    "value": oi_data.get("oi"),
-                    "value_usd": oi_data.get("oiCcy"),
-                    "ts": oi_data.get("ts")
-                }
-                
-                # Add OI change if history is available
-                if self.config and self.config.enable_oi_history:
-                    try:
-                        oi_history = self.client.fetch_oi_history(
-                            symbol,
-                            limit=self.config.oi_history_limit
-                        )
-                        if oi_history.get("code") == "0" and oi_history.get("data"):
-                            result["derivatives"]["oi"]["history"] = oi_history["data"]
-                            
-                            # Calculate OI change
-                            from exdatahub.services.derived_metrics import DerivedMetrics
-                            change = DerivedMetrics.calculate_oi_change(current_oi, oi_history["data"])
-                            result["derivatives"]["oi"].update(change)
-                    except Exception as e:
-                        result["derivatives"]["oi"]["history_error"] = str(e)
+            oi = (self._from_feed("open-interest", symbol) or self._from_scan("open-interest", symbol)
+                  or self.client.fetch_open_interest(symbol))
+            oi_history = None
+            if self._oi_history_enabled and oi.get("code") == "0" and oi.get("data"):
+                try:
+                    oi_history = self.client.fetch_oi_history(
+                        symbol,
+                        limit=self.config.oi_history_limit
+                    )
+                except Exception as e:
+                    oi_history = e
+            self._add_oi(result, oi, oi_history)
         except Exception as e:
             result["derivatives"]["oi"] = {"error": str(e)}
 
+    def refresh_price(self, result: Dict[str, Any]):
+        """Refresh result["derivatives"]["price"] (mark, index, basis)."""
+        symbol = result["symbol"]
         try:
             # Get mark price and index price
-            mark_data = self.client.fetch_mark_price(symbol)
-            
-            # For SWAP contracts, need to convert symbol for index price
-            # BTC-USDT-SWAP -> BTC-USDT for index-tickers
-            index_symbol = symbol.replace("-SWAP", "")
-            index_data = self.client.fetch_index_tickers(index_symbol)
-            
-            mark_price = None
-            index_price = None
-            ts = None
-            
-            # Extract mark price from mark-price endpoint
-            if mark_data.get("code") == "0" and mark_data.get("data"):
-                m_data = mark_data["data"][0]
-                mark_price = m_data.get("markPx")
-                ts = m_data.get("ts")
-            
-            # Extract index price from index-tickers endpoint
-            if index_data.get("code") == "0" and index_data.get("data"):
-                i_data = index_data["data"][0]
-                index_price = i_data.get("idxPx")
-            
-            result["derivatives"]["price"] = {
-                "mark": mark_price,
-                "index": index_price,
-                "ts": ts
-            }
-            
-            # Calculate basis (mark - index)
-            if mark_price and index_price:
-                from exdatahub.services.derived_metrics import DerivedMetrics
-                basis_info = DerivedMetrics.calculate_basis(mark_price, index_price)
-                result["derivatives"]["price"].update(basis_info)
+            index_symbol = self._index_symbol(symbol)
+            mark_data = (self._from_feed("mark-price", symbol) or self._from_scan("mark-price", symbol)
+                         or self.client.fetch_mark_price(symbol))
+            index_data = (self._from_feed("index-tickers", index_symbol)
+                          or self._from_scan("index-tickers", index_symbol)
+                          or self.client.fetch_index_tickers(index_symbol))
+            self._add_price(result, mark_data, index_data)
         except Exception as e:
             result["derivatives"]["price"] = {"error": str(e)}
 
+    def refresh_orderbook(self, result: Dict[str, Any]):
+        """Refresh result["orderbook"] from the live local book (no-op without the feed)."""
+        self._add_orderbook(result)
+
+    async def analyze_market_async(self, symbol: str, frames: List[str] = None,
+                                   rescan: bool = True) -> Dict[str, Any]:
+        """
+        Async version of analyze_market.
+
+        Every request for the symbol (all kline frames plus funding, funding
+        history, OI, OI history, mark price and index ticker) is issued
+        concurrently, so the snapshot costs roughly one round trip. With the
+        WebSocket feed enabled, live values are read from memory instead; with
+        the market-wide scanner enabled, derivatives come from its tables.
+
+        Args:
+            symbol: Trading pair symbol
+            frames: List of timeframes (if None, use config or default)
+            rescan: Refresh the market-wide scanner tables (analyze_many_async
+                refreshes them once per batch and passes False)
+        """
+        result, kline_responses = await self._fetch_market_async(symbol, frames, rescan)
+        for frame, data in kline_responses.items():
+            try:
+                if isinstance(data, Exception):
+                    raise data
+                self._add_frame(result, frame, data)
+            except Exception as e:
+                result["klines"][frame] = {"error": str(e)}
         return result
+
+    async def _fetch_market_async(self, symbol: str, frames: Optional[List[str]],
+                                  rescan: bool) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Everything analyze_market_async does except adding the kline frames.
+
+        Returns:
+            (result with derivatives filled in, {frame: raw klines or the exception fetching them})
+        """
+        frames = self.resolve_frames(frames)
+        client = self.async_client
+        self._check_symbol(symbol)
+        result = self._new_result(symbol)
+        self._subscribe_feed(symbol, frames)
+        index_symbol = self._index_symbol(symbol)
+
+        async def optional(enabled, coro_factory):
+            return await coro_factory() if enabled else None
+
+        # 全市场扫描（需要时）在线程池中与 K 线请求同时进行，衍生品字段等待扫描完成后读取扫描表
+        scan = asyncio.ensure_future(client.run(self.refresh_scanner)) if rescan and self.scanner is not None else None
+
+        async def live(channel, inst_id, coro_factory):
+            if scan is not None:
+                await asyncio.wait([scan])
+            return (self._from_feed(channel, inst_id) or self._from_scan(channel, inst_id)
+                    or await coro_factory())
+
+        kline_calls = [client.run(self._fetch_frame, symbol, frame) for frame in frames]
+        derivative_calls = [
+            live("funding-rate", symbol, lambda: client.fetch_funding_rate(symbol)),
+            optional(self._funding_history_enabled, lambda: client.fetch_funding_rate_history(
+                symbol, limit=self.config.funding_history_limit)),
+            live("open-interest", symbol, lambda: client.fetch_open_interest(symbol)),
+            optional(self._oi_history_enabled, lambda: client.fetch_oi_history(
+                symbol, limit=self.config.oi_history_limit)),
+            live("mark-price", symbol, lambda: client.fetch_mark_price(symbol)),
+            live("index-tickers", index_symbol, lambda: client.fetch_index_tickers(index_symbol)),
+        ]
+        responses = await asyncio.gather(*kline_calls, *derivative_calls, return_exceptions=True)
+        kline_responses = dict(zip(frames, responses[:len(frames)]))
+        funding, funding_history, oi, oi_history, mark_data, index_data = responses[len(frames):]
+
+        try:
+            if isinstance(funding, Exception):
+                raise funding
+            self._add_funding(result, funding, funding_history)
+        except Exception as e:
+            result["derivatives"]["funding_rate"] = {"error": str(e)}
+
+        try:
+            for data in (mark_data, index_data):
+                if isinstance(data, Exception):
+                    raise data
+            self._add_price(result, mark_data, index_data)
+        except Exception as e:
+            result["derivatives"]["price"] = {"error": str(e)}
+
+        try:
+            if isinstance(oi, Exception):
+                raise oi
+            self._add_oi(result, oi, oi_history)
+        except Exception as e:
+            result["derivatives"]["oi"] = {"error": str(e)}
+
+        self._add_orderbook(result)
+        return result, kline_responses
+
+    async def analyze_many_async(self, symbols: List[str], frames: List[str] = None,
+                                 concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Batch analysis: yield (symbol, result) as each symbol completes.
+
+        All symbols share this service's client and connection pool; the
+        transport caps in-flight requests globally, and at most
+        `concurrency` symbols are analyzed at once so results stream out
+        steadily instead of all finishing together. With the market-wide
+        scanner enabled, its tables are refreshed once before the batch and
+        every symbol reads from them.
+
+        With the numpy indicator backend, symbols are analyzed in waves of
+        `concurrency` instead: once a wave's data is in, each frame's
+        indicators are computed for the whole wave in one vectorized pass
+        (AnalysisService.calculate_indicators_many) and the wave's results
+        are yielded together.
+
+        Args:
+            symbols: Trading pair symbols
+            frames: List of timeframes (if None, use config or default)
+            concurrency: Symbols analyzed at once (if None, use config or 8)
+        """
+        if concurrency is None:
+            concurrency = self.config.batch_concurrency if self.config else 8
+        concurrency = max(1, concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        if self.enable_scanner(len(symbols)):
+            try:
+                await self.async_client.run(self.refresh_scanner)
+            except Exception as e:
+                # 扫描失败时各交易对退回逐个请求
+                logger.warning("Scanner refresh failed: %s", e)
+
+        if self.indicator_backend == 'numpy':
+            for start in range(0, len(symbols), concurrency):
+                for item in await self._analyze_wave_async(symbols[start:start + concurrency], frames):
+                    yield item
+            return
+
+        async def run(symbol):
+            async with semaphore:
+                try:
+                    return symbol, await self.analyze_market_async(symbol, frames, rescan=False)
+                except Exception as e:
+                    return symbol, {"symbol": symbol, "error": str(e)}
+
+        for next_done in asyncio.as_completed([run(symbol) for symbol in symbols]):
+            yield await next_done
+
+    async def _analyze_wave_async(self, symbols: List[str],
+                                  frames: Optional[List[str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Analyze `symbols` concurrently and add every frame with one batched indicator pass per frame."""
+        fetched = await asyncio.gather(*(self._fetch_market_async(symbol, frames, rescan=False)
+                                         for symbol in symbols), return_exceptions=True)
+        done = {symbol: item for symbol, item in zip(symbols, fetched) if not isinstance(item, Exception)}
+
+        for frame in self.resolve_frames(frames):
+            rows_by_symbol = {}
+            for symbol, (result, kline_responses) in done.items():
+                data = kline_responses[frame]
+                if isinstance(data, Exception):
+                    result["klines"][frame] = {"error": str(data)}
+                else:
+                    rows_by_symbol[symbol] = data
+            try:
+                indicators = AnalysisService.calculate_indicators_many(rows_by_symbol)
+            except Exception as e:
+                for symbol in rows_by_symbol:
+                    done[symbol][0]["klines"][frame] = {"error": str(e)}
+                continue
+            for symbol, rows in rows_by_symbol.items():
+                result = done[symbol][0]
+                try:
+                    self._add_frame(result, frame, rows, indicators[symbol])
+                except Exception as e:
+                    result["klines"][frame] = {"error": str(e)}
+
+        return [(symbol, done[symbol][0]) if symbol in done else (symbol, {"symbol": symbol, "error": str(item)})
+                for symbol, item in zip(symbols, fetched)]
+
+    def _fetch_frame(self, symbol: str, frame: str) -> List[List[str]]:
+        """
+        Refresh one frame through the incremental kline store.
+
+        Returns chronological (oldest first) rows, as pandas_ta expects;
+        OKX itself returns newest first.
+
+        With the WebSocket feed live for this frame, the store is kept current
+        by candle pushes and is read from memory. After every (re)connect one
+        REST refresh fills whatever was missed while disconnected.
+        """
+        limit = self._frame_limit(frame)
+        generation = self.feed.live_generation(f"candle{frame}", symbol) if self.feed else None
+        if generation is not None and self._kline_sync.get((symbol, frame)) == generation:
+            rows = self.kline_store.get(symbol, frame, limit=limit)
+            if rows:
+                return rows
+        rows = self.kline_store.refresh(self.client, symbol, frame, limit=limit)
+        if generation is not None:
+            self._kline_sync[(symbol, frame)] = generation
+        return rows
+
+    def _calculate_indicators(self, symbol: str, frame: str, raw_klines: List[List[str]]) -> Dict[str, Any]:
+        if self.indicator_backend != 'streaming' or not raw_klines:
+            return AnalysisService.calculate_indicators(raw_klines, backend=self.indicator_backend)
+
+        with self._engines_lock:
+            engine = self._engines.get((symbol, frame))
+            start = None
+            if engine is not None:
+                # Resume from the engine's pending bar; if it is no longer in
+                # the window (gap), reseed from the full window.
+                for i in range(len(raw_klines) - 1, -1, -1):
+                    if int(raw_klines[i][0]) == engine.last_ts:
+                        start = i
+                        break
+            if start is None:
+                engine = self._engines[(symbol, frame)] = IndicatorEngine()
+                start = 0
+            engine.update_many(raw_klines[start:])
+            return engine.values()
+
+    def _add_frame(self, result: Dict[str, Any], frame: str, raw_klines: List[List[str]],
+                   indicators: Optional[Dict[str, Any]] = None):
+        # Calculate indicators (unless already computed in a batch)
+        if indicators is None:
+            indicators = self._calculate_indicators(result["symbol"], frame, raw_klines)
+
+        # Calculate derived metrics (labels)
+        # 获取当前价格（最新K线的收盘价）
+        current_price = None
+        if raw_klines:
+            try:
+                current_price = Kline.from_okx(raw_klines[-1]).close
+            except (IndexError, ValueError, TypeError):
+                pass
+
+        summary = {
+            "trend_label": DerivedMetrics.get_trend_label(indicators),
+            "volatility_label": DerivedMetrics.get_volatility_label(indicators, current_price),
+            "volume_label": DerivedMetrics.get_volume_label(indicators.get('volume', {}))
+        }
+
+        result["klines"][frame] = {
+            "data": raw_klines[-5:], # Only show last 5 to avoid huge JSON in console, user can adjust
+            "indicators": indicators,
+            "summary": summary
+        }
+
+        if frame == '1m' and raw_klines:
+            result["timestamp"] = raw_klines[-1][0] # Use 1m close time as ref
+
+    def _add_funding(self, result: Dict[str, Any], funding: Dict[str, Any], history: Any = None):
+        """history: funding history response, the exception raised fetching it, or None"""
+        if not (funding.get("code") == "0" and funding.get("data")):
+            return
+
+        f_data = funding["data"][0]
+        result["derivatives"]["funding_rate"] = {
+            "current": f_data.get("fundingRate"),
+            "next": f_data.get("nextFundingRate"),
+            "next_time": f_data.get("nextFundingTime")
+        }
+
+        # Add funding history if enabled
+        if history is None:
+            return
+        try:
+            if isinstance(history, Exception):
+                raise history
+            if history.get("code") == "0" and history.get("data"):
+                result["derivatives"]["funding_rate"]["history"] = [
+                    {
+                        "ts": item.get("fundingTime"),
+                        "rate": item.get("fundingRate")
+                    }
+                    for item in history["data"]
+                ]
+
+                # Calculate funding stats
+                stats = DerivedMetrics.calculate_funding_stats(
+                    result["derivatives"]["funding_rate"]["history"]
+                )
+                result["derivatives"]["funding_rate"].update(stats)
+        except Exception as e:
+            result["derivatives"]["funding_rate"]["history_error"] = str(e)
+
+    def _add_oi(self, result: Dict[str, Any], oi: Dict[str, Any], oi_history: Any = None):
+        """oi_history: OI history response, the exception raised fetching it, or None"""
+        if not (oi.get("code") == "0" and oi.get("data")):
+            return
+
+        oi_data = oi["data"][0]
+        current_oi = float(oi_data.get("oi", 0))
+        result["derivatives"]["oi"] = {
+            "value": oi_data.get("oi"),
+            # value_usd has always carried oiCcy (a coin amount) and is kept as is for
+            # existing consumers; the USD value is notional_usd
+            "value_usd": oi_data.get("oiCcy"),
+            "value_ccy": oi_data.get("oiCcy"),
+            "notional_usd": oi_data.get("oiUsd") or self._oi_usd(result, current_oi),
+            "ts": oi_data.get("ts")
+        }
+
+        # Add OI change if history is available
+        if oi_history is None:
+            return
+        try:
+            if isinstance(oi_history, Exception):
+                raise oi_history
+            if oi_history.get("code") == "0" and oi_history.get("data"):
+                result["derivatives"]["oi"]["history"] = oi_history["data"]
+
+                # Calculate OI change
+                change = DerivedMetrics.calculate_oi_change(current_oi, oi_history["data"])
+                result["derivatives"]["oi"].update(change)
+        except Exception as e:
+            result["derivatives"]["oi"]["history_error"] = str(e)
+
+    def _oi_usd(self, result: Dict[str, Any], contracts: float) -> Optional[float]:
+        """Convert OI contracts to USD with the registry's contract size at the mark price (if known)."""
+        registry = self._registry()
+        if registry is None:
+            return None
+        mark = result["derivatives"].get("price", {}).get("mark")
+        try:
+            return registry.oi_usd(result["symbol"], contracts, float(mark) if mark else None)
+        except (TypeError, ValueError):
+            return None
+
+    def _add_price(self, result: Dict[str, Any], mark_data: Dict[str, Any], index_data: Dict[str, Any]):
+        mark_price = None
+        index_price = None
+        ts = None
+
+        # Extract mark price from mark-price endpoint
+        if mark_data.get("code") == "0" and mark_data.get("data"):
+            m_data = mark_data["data"][0]
+            mark_price = m_data.get("markPx")
+            ts = m_data.get("ts")
+
+        # Extract index price from index-tickers endpoint
+        if index_data.get("code") == "0" and index_data.get("data"):
+            i_data = index_data["data"][0]
+            index_price = i_data.get("idxPx")
+
+        result["derivatives"]["price"] = {
+            "mark": mark_price,
+            "index": index_price,
+            "ts": ts
+        }
+
+        # Calculate basis (mark - index)
+        if mark_price and index_price:
+            basis_info = DerivedMetrics.calculate_basis(mark_price, index_price)
+            result["derivatives"]["price"].update(basis_info)
+
+    def _add_orderbook(self, result: Dict[str, Any]):
+        """
+        WebSocket 本地订单簿可用时，加入盘口摘要（买一 / 卖一、价差、中间价 ±0.5% 内的深度）
+
+        订单簿只来自实时行情，不为此额外请求 REST 深度快照
+        """
+        book = self.feed.book(result["symbol"]) if self.feed is not None else None
+        if book is None:
+            return
+        bid, ask = book.best_bid(), book.best_ask()
+        if bid is None or ask is None:
+            return
+        mid = (bid[0] + ask[0]) / 2
+        result["orderbook"] = {
+            "best_bid": bid[0],
+            "best_bid_size": bid[1],
+            "best_ask": ask[0],
+            "best_ask_size": ask[1],
+            "spread": ask[0] - bid[0],
+            "spread_bps": (ask[0] - bid[0]) / mid * 10000,
+            "bid_depth": book.depth_to_price("bids", mid * (1 - DEPTH_BAND)),
+            "ask_depth": book.depth_to_price("asks", mid * (1 + DEPTH_BAND)),
+            "ts": book.ts
+        }
@@ -1,30 +1,67 @@
-import pandas as pd
-import pandas_ta as ta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
+
+from exdatahub.core.models import KlineSeries
+
+BACKENDS = ("pandas", "numpy", "streaming")
 
 class AnalysisService:
     @staticmethod
-    def calculate_indicators(klines: List[List[str]]) -> Dict[str, Any]:
+    def calculate_indicators(klines: Union[List[List[str]], KlineSeries], backend: str = "pandas") -> Dict[str, Any]:
         """
         Calculate technical indicators from raw kline data.
         
         Args:
-            klines: List of kline data [ts, open, high, low, close, vol, ...]
+            klines: List of kline data [ts, open, high, low, close, vol, ...],
+                or a KlineSeries (e.g. a zero-copy CandleStore window)
+            backend: "pandas" (pandas_ta) or "numpy" (vectorized kernels, no
+                DataFrame and no pandas_ta import); both give the same output
             
         Returns:
             Dict containing the last values of calculated indicators.
         """
+        if backend == "numpy":
+            from exdatahub.services.vector_indicators import calculate_indicators
+            return calculate_indicators(klines)
+        return AnalysisService._calculate_pandas(klines)
+
+    @staticmethod
+    def calculate_indicators_many(klines_by_symbol: Dict[str, List[List[str]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate indicators for many symbols in one vectorized pass.
+
+        Symbols with the same number of bars are stacked into a (symbols x bars)
+        matrix and computed together with the NumPy kernels.
+
+        Args:
+            klines_by_symbol: Mapping of symbol to its kline data (oldest first)
+
+        Returns:
+            Mapping of symbol to the same dict calculate_indicators returns.
+        """
+        from exdatahub.services.vector_indicators import calculate_indicators_many
+        return calculate_indicators_many(klines_by_symbol)
+
+    @staticmethod
+    def _calculate_pandas(klines: Union[List[List[str]], KlineSeries]) -> Dict[str, Any]:
+        # pandas / pandas_ta are heavy imports; only pay for them on this path
+        import pandas as pd
+        import pandas_ta as ta
+
         if not klines:
             return {}
 
-        # Convert to DataFrame
-        # OKX Kline format: [ts, open, high, low, close, vol, volCcy, volCcyQuote, confirm]
-        df = pd.DataFrame(klines, columns=['ts', 'open', 'high', 'low', 'close', 'vol', 'volCcy', 'volCcyQuote', 'confirm'])
-        
-        # Convert types
-        numeric_cols = ['open', 'high', 'low', 'close', 'vol']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col])
+        if isinstance(klines, KlineSeries):
+            # Already numeric columns (e.g. CandleStore views); no string parsing
+            df = pd.DataFrame({col: getattr(klines, col) for col in ('ts', 'open', 'high', 'low', 'close', 'vol')})
+        else:
+            # Convert to DataFrame
+            # OKX Kline format: [ts, open, high, low, close, vol, volCcy, volCcyQuote, confirm]
+            df = pd.DataFrame(klines, columns=['ts', 'open', 'high', 'low', 'close', 'vol', 'volCcy', 'volCcyQuote', 'confirm'])
+
+            # Convert types
+            numeric_cols = ['open', 'high', 'low', 'close', 'vol']
+            for col in numeric_cols:
+                df[col] = pd.to_numeric(df[col])
             
         # Calculate Indicators
         
@@ -0,0 +1,198 @@
+"""
+本地 HTTP / JSON 接口
+
+在 WatchService 常驻刷新的基础上，用标准库 ThreadingHTTPServer 对外提供最新快照，
+多个下游服务读取同一份内存数据，不会各自请求交易所。
+
+接口（symbol 为交易对，如 BTC-USDT-SWAP；frame 参数可选，只返回该周期）：
+    GET /health                          服务状态
+    GET /symbols                         已监控的交易对
+    GET /snapshot/{symbol}               完整快照（与 analyze 输出相同，另含 updated_at）
+    GET /klines/{symbol}?frame=1m        各周期最近 K 线
+    GET /indicators/{symbol}?frame=1m    各周期指标与标签
+    GET /derivatives/{symbol}            资金费率、持仓量、标记价 / 指数价、盘口
+
+响应带 ETag（内容哈希）；请求带 If-None-Match 且内容未变时返回 304，不传输正文。
+除 /snapshot 外，ETag 不包含每次发布都会变化的 updated_at：只刷新价格时 /klines、/indicators 的 ETag 不变。
+同一快照的编码结果会被缓存，大量客户端轮询时不重复序列化。
+"""
+import hashlib
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from exdatahub.utils.logger import get_logger
+from exdatahub.utils.serialization import dumps_bytes
+
+logger = get_logger(__name__)
+
+VIEWS = ("snapshot", "klines", "indicators", "derivatives")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（支持多个值、弱校验 W/ 前缀与 *）"""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def render_view(snapshot: Dict[str, Any], view: str, frame: Optional[str] = None) -> Any:
+    """从快照中取出某个接口对应的部分"""
+    if view == "snapshot":
+        return snapshot
+    meta = {"symbol": snapshot["symbol"], "timestamp": snapshot.get("timestamp"),
+            "updated_at": snapshot.get("updated_at")}
+    if view == "derivatives":
+        return dict(meta, derivatives=snapshot.get("derivatives", {}), orderbook=snapshot.get("orderbook"))
+
+    klines = snapshot.get("klines", {})
+    if frame is not None:
+        klines = {frame: klines[frame]} if frame in klines else {}
+    if view == "klines":
+        data = {f: v.get("data", []) if "error" not in v else v for f, v in klines.items()}
+    else:
+        data = {f: {"indicators": v.get("indicators", {}), "summary": v.get("summary", {})}
+                if "error" not in v else v for f, v in klines.items()}
+    return dict(meta, **{view: data})
+
+
+class SnapshotAPI:
+    """
+    快照 HTTP 服务
+
+    Args:
+        watch: 提供 snapshot(symbol) 与 symbols 的 WatchService
+        host: 监听地址（默认仅本机）
+        port: 监听端口，0 表示随机端口
+    """
+
+    def __init__(self, watch, host: str = "127.0.0.1", port: int = 8080):
+        self.watch = watch
+        self._cache: Dict[Tuple[str, str, Optional[str]], Tuple[Dict[str, Any], bytes, str]] = {}
+        self._cache_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.api = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def render(self, symbol: str, view: str, frame: Optional[str]) -> Optional[Tuple[bytes, str]]:
+        """
+        编码某个接口的响应
+
+        Returns:
+            (正文, ETag)；快照尚未就绪时返回 None
+        """
+        snapshot = self.watch.snapshot(symbol)
+        if snapshot is None:
+            return None
+        key = (symbol, view, frame)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        # 快照每次发布都是新对象，同一对象的编码结果可以直接复用
+        if cached is not None and cached[0] is snapshot:
+            return cached[1], cached[2]
+        payload = render_view(snapshot, view, frame)
+        body = dumps_bytes(payload, compact=True)
+        if view == "snapshot":
+            etag = make_etag(body)
+        else:
+            # updated_at 每次发布都会变化，只按数据部分计算 ETag，数据未变时 If-None-Match 仍能命中
+            etag = make_etag(dumps_bytes({k: v for k, v in payload.items() if k != "updated_at"}, compact=True))
+        with self._cache_lock:
+            self._cache[key] = (snapshot, body, etag)
+        return body, etag
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def start(self) -> "SnapshotAPI":
+        """在后台线程运行"""
+        self._thread = threading.Thread(target=self.serve_forever, name="exdatahub-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ExDataHub"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        self._send(status, dumps_bytes({"error": message}, compact=True), headers)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        api: SnapshotAPI = self.server.api
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        query = parse_qs(url.query)
+
+        if parts == ["health"]:
+            ready = [s for s in api.watch.symbols if api.watch.snapshot(s) is not None]
+            self._send(HTTPStatus.OK, dumps_bytes({"status": "ok", "symbols": len(api.watch.symbols),
+                                                   "ready": len(ready)}, compact=True))
+            return
+        if parts == ["symbols"]:
+            self._send(HTTPStatus.OK, dumps_bytes(api.watch.symbols, compact=True))
+            return
+        if len(parts) != 2 or parts[0] not in VIEWS:
+            self._error(HTTPStatus.NOT_FOUND, f"Unknown path {url.path}")
+            return
+
+        view, symbol = parts
+        if symbol not in api.watch.symbols:
+            self._error(HTTPStatus.NOT_FOUND, f"Symbol '{symbol}' is not being watched")
+            return
+        frame = query.get("frame", [None])[0]
+        rendered = api.render(symbol, view, frame)
+        if rendered is None:
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE, f"No snapshot for '{symbol}' yet",
+                        {"Retry-After": "1"})
+            return
+        body, etag = rendered
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send(HTTPStatus.NOT_MODIFIED, headers=headers)
+            return
+        self._send(HTTPStatus.OK, body, headers)
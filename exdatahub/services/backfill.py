@@ -0,0 +1,175 @@
+"""
+历史 K 线回补
+
+通过 /api/v5/market/history-candles 向过去翻页拉取任意时间段的 K 线：
+- 时间段按 UTC 日期切分为多个窗口，多个窗口并行拉取（受客户端限频器约束，不会超过 OKX 接口限频）
+- 每个窗口从窗口结束时间向前翻页，按 ts 去重后写入 ExportService 的分区存储
+- 每次写入后记录断点，中断后重新执行同一命令即从断点继续
+
+窗口边界对齐到 UTC 日期，因此每个日期分区只由一个窗口写入，并行写入互不冲突。
+
+用法：
+    exporter = ExportService("data")
+    backfill = BackfillService(client, exporter, workers=4)
+    rows = backfill.run("BTC-USDT-SWAP", "1m", parse_time_ms("2024-01-01"), parse_time_ms("2024-04-01"))
+"""
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from exdatahub.core.models import KlineSeries, okx_data
+from exdatahub.services.export import DAY_MS, ExportService
+from exdatahub.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# history-candles 单页上限
+PAGE_LIMIT = 100
+
+# 每个 worker 平均分到的窗口数（窗口越多，各 worker 负载越均衡）
+WINDOWS_PER_WORKER = 4
+
+
+def split_windows(start_ms: int, end_ms: int, workers: int) -> List[Dict[str, Any]]:
+    """
+    将 [start_ms, end_ms) 切分为按 UTC 日期对齐的窗口
+
+    Returns:
+        [{"start", "end", "cursor", "done"}, ...]，cursor 为下一页的 after 参数（初始为窗口结束时间）
+    """
+    if end_ms <= start_ms:
+        return []
+    first_day = start_ms // DAY_MS
+    last_day = (end_ms - 1) // DAY_MS
+    days = last_day - first_day + 1
+    target = max(1, workers * WINDOWS_PER_WORKER)
+    step = max(1, -(-days // target))  # 向上取整
+
+    windows = []
+    day = first_day
+    while day <= last_day:
+        w_start = max(start_ms, day * DAY_MS)
+        w_end = min(end_ms, (day + step) * DAY_MS)
+        windows.append({"start": w_start, "end": w_end, "cursor": w_end, "done": False})
+        day += step
+    return windows
+
+
+class BackfillService:
+    """
+    并行分页回补历史 K 线
+
+    Args:
+        client: OKXClient（需提供 fetch_history_klines）
+        exporter: 写入目标
+        workers: 并行窗口数
+        checkpoint_dir: 断点文件目录，默认 <exporter.root>/_checkpoints
+        flush_rows: 每个窗口累计多少行写入一次存储并更新断点
+        on_progress: 每次写入后回调 (写入行数, 已完成窗口数, 窗口总数)
+    """
+
+    def __init__(self, client, exporter: ExportService, workers: int = 4, checkpoint_dir: Optional[str] = None,
+                 flush_rows: int = 5000, on_progress: Optional[Callable[[int, int, int], None]] = None):
+        self.client = client
+        self.exporter = exporter
+        self.workers = max(1, workers)
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else exporter.root / "_checkpoints"
+        self.flush_rows = flush_rows
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}
+
+    # ---------- 断点 ----------
+
+    def checkpoint_path(self, symbol: str, bar: str) -> Path:
+        return self.checkpoint_dir / f"backfill_{self.exporter.exchange}_{symbol}_{bar}.json"
+
+    def _load_state(self, path: Path, symbol: str, bar: str, start_ms: int, end_ms: int,
+                    restart: bool) -> Dict[str, Any]:
+        if not restart and path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("start") == start_ms and state.get("end") == end_ms:
+                done = sum(w["done"] for w in state["windows"])
+                logger.info("Resuming backfill %s %s: %d/%d windows done", symbol, bar, done, len(state['windows']))
+                return state
+        return {"symbol": symbol, "bar": bar, "start": start_ms, "end": end_ms,
+                "windows": split_windows(start_ms, end_ms, self.workers)}
+
+    def _save_state(self, path: Path):
+        # 调用方持有 self._lock
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._state, f)
+        os.replace(tmp, path)
+
+    # ---------- 回补 ----------
+
+    def run(self, symbol: str, bar: str, start_ms: int, end_ms: Optional[int] = None,
+            restart: bool = False) -> int:
+        """
+        回补 [start_ms, end_ms) 的 K 线
+
+        Args:
+            end_ms: 默认当前时间
+            restart: 忽略已有断点，从头开始
+
+        Returns:
+            本次写入的行数
+
+        Raises:
+            任一窗口拉取失败时，在其余窗口结束后抛出该异常（已完成部分保留在断点中）
+        """
+        end_ms = int(time.time() * 1000) if end_ms is None else end_ms
+        path = self.checkpoint_path(symbol, bar)
+        self._state = self._load_state(path, symbol, bar, start_ms, end_ms, restart)
+        pending = [w for w in self._state["windows"] if not w["done"]]
+        if not pending:
+            return 0
+
+        written = [0]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                   thread_name_prefix="exdatahub-backfill") as executor:
+            futures = [executor.submit(self._run_window, symbol, bar, window, path, written)
+                       for window in pending]
+            concurrent.futures.wait(futures)
+        for future in futures:
+            future.result()
+        return written[0]
+
+    def _run_window(self, symbol: str, bar: str, window: Dict[str, Any], path: Path, written: List[int]):
+        rows: List[List[str]] = []
+        cursor = window["cursor"]
+        while True:
+            page = okx_data(self.client.fetch_history_klines(symbol, bar, limit=PAGE_LIMIT, after=str(cursor),
+                                                             before=str(window["start"] - 1)))
+            page = [row for row in page if window["start"] <= int(row[0]) < window["end"]]
+            oldest = min((int(row[0]) for row in page), default=cursor)
+            rows.extend(page)
+            finished = not page or oldest <= window["start"] or oldest >= cursor
+            cursor = oldest
+            if finished or len(rows) >= self.flush_rows:
+                self._flush(symbol, bar, window, rows, cursor, finished, path, written)
+                rows = []
+            if finished:
+                return
+
+    def _flush(self, symbol: str, bar: str, window: Dict[str, Any], rows: List[List[str]], cursor: int,
+               done: bool, path: Path, written: List[int]):
+        if rows:
+            self.exporter.write_klines(KlineSeries.from_okx(rows, inst_id=symbol, bar=bar))
+        with self._lock:
+            window["cursor"] = cursor
+            window["done"] = done
+            written[0] += len(rows)
+            self._save_state(path)
+            completed = sum(w["done"] for w in self._state["windows"])
+            total = len(self._state["windows"])
+            total_written = written[0]
+        if self.on_progress:
+            self.on_progress(total_written, completed, total)
@@ -0,0 +1,198 @@
+"""
+常驻刷新服务（watch 模式）
+
+保持 AggregatorService（连接池、增量 K 线存储、指标引擎、WebSocket 行情）常驻，
+按各自节奏刷新快照的不同部分：
+- 每个 K 线周期在收盘后刷新（1m 每分钟、1H 每小时整点、1D 在日线收盘时）
+- 持仓量在 OI 历史周期（默认 5m）收盘后刷新
+- 资金费率、标记价 / 指数价 / 盘口按固定间隔刷新
+
+每轮刷新结束后发布一份新的快照（snapshot(symbol) 读取，或通过 on_snapshot 回调推送）。
+
+用法：
+    watch = WatchService(aggregator, ["BTC-USDT-SWAP"], on_snapshot=print_snapshot).start()
+    ...
+    watch.stop()
+"""
+import concurrent.futures
+import heapq
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from exdatahub.utils.logger import get_logger
+from exdatahub.utils.time_utils import next_bar_close
+
+logger = get_logger(__name__)
+
+# 任务：(交易对, 类型, K 线周期)；类型为 frame / oi / funding / price
+Task = Tuple[str, str, Optional[str]]
+
+
+class WatchService:
+    """
+    按周期调度的常驻快照刷新
+
+    Args:
+        aggregator: AggregatorService（需提供 exchange_name、analyze_market、resolve_frames、refresh_parts
+            与 refresh_scanner）
+        symbols: 交易对列表（不能为空）
+        frames: K 线周期，None 时使用配置或默认周期
+        price_interval: 标记价 / 指数价 / 盘口刷新间隔（秒）
+        funding_interval: 资金费率刷新间隔（秒）
+        oi_bar: 持仓量刷新对齐的周期（与 OI 历史周期一致）
+        settle_delay: 周期收盘后等待多少秒再拉取（等待交易所生成收盘 K 线）
+        on_snapshot: 快照更新回调 (symbol, snapshot)
+        max_workers: 同时执行的刷新任务数
+        clock: 当前时间（秒），测试时可替换
+    """
+
+    def __init__(self, aggregator, symbols: List[str], frames: Optional[List[str]] = None,
+                 price_interval: float = 5.0, funding_interval: float = 60.0, oi_bar: str = "5m",
+                 settle_delay: float = 2.0, on_snapshot: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 max_workers: int = 8, clock: Callable[[], float] = time.time):
+        if not symbols:
+            raise ValueError("WatchService needs at least one symbol")
+        self.aggregator = aggregator
+        self.symbols = list(symbols)
+        # OKX 6H 及以上周期按香港时间收盘，Binance / Bybit 全部按 UTC 收盘
+        self._utc_bars = aggregator.exchange_name != "okx"
+        self.frames = aggregator.resolve_frames(frames)
+        self.price_interval = price_interval
+        self.funding_interval = funding_interval
+        self.oi_bar = oi_bar
+        self.settle_delay = settle_delay
+        self.on_snapshot = on_snapshot
+        self.max_workers = max_workers
+        self.clock = clock
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- 调度 ----------
+
+    def _exchange_bar(self, bar: str) -> str:
+        """按交易所的收盘对齐方式书写周期（非 OKX 交易所加 utc 后缀）"""
+        return bar + "utc" if self._utc_bars and not bar.endswith("utc") else bar
+
+    def next_run(self, task: Task, now: float) -> float:
+        """任务的下一次执行时间（秒）"""
+        _, kind, bar = task
+        if kind == "frame":
+            return next_bar_close(self._exchange_bar(bar), now) + self.settle_delay
+        if kind == "oi":
+            return next_bar_close(self._exchange_bar(self.oi_bar), now) + self.settle_delay
+        if kind == "funding":
+            return now + self.funding_interval
+        return now + self.price_interval
+
+    def _tasks(self, symbol: str) -> List[Task]:
+        tasks = [(symbol, "frame", frame) for frame in self.frames]
+        tasks += [(symbol, "oi", None), (symbol, "funding", None), (symbol, "price", None)]
+        return tasks
+
+    def _execute(self, task: Task):
+        symbol, kind, frame = task
+        # 全市场扫描表已在本轮开始时刷新，这里只读取
+        self.aggregator.refresh_parts(symbol, [frame if kind == "frame" else kind], self._results[symbol],
+                                      rescan=False)
+
+    def _refresh_scanner(self):
+        try:
+            self.aggregator.refresh_scanner()
+        except Exception as e:
+            logger.error("Scanner refresh failed: %s", e)
+
+    # ---------- 快照 ----------
+
+    def _publish(self, symbol: str):
+        result = self._results[symbol]
+        # 各 refresh_* 方法整体替换自己负责的子字典，复制两层即可得到不再变化的快照
+        snapshot = dict(result, klines=dict(result["klines"]), derivatives=dict(result["derivatives"]),
+                        updated_at=int(self.clock() * 1000))
+        with self._lock:
+            self._snapshots[symbol] = snapshot
+        if self.on_snapshot is not None:
+            try:
+                self.on_snapshot(symbol, snapshot)
+            except Exception as e:
+                logger.error("Snapshot callback failed for %s: %s", symbol, e)
+
+    def snapshot(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """最新发布的快照（尚未完成首次分析时为 None）"""
+        with self._lock:
+            return self._snapshots.get(symbol)
+
+    def snapshots(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self._snapshots)
+
+    # ---------- 运行 ----------
+
+    def run(self):
+        """阻塞运行，直到 stop()"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="exdatahub-watch") as executor:
+            # 首次完整分析（同时订阅 WebSocket 频道）；全市场扫描表对所有交易对只刷新一次
+            self._refresh_scanner()
+            futures = {executor.submit(self.aggregator.analyze_market, symbol, self.frames, rescan=False): symbol
+                       for symbol in self.symbols}
+            for future in concurrent.futures.as_completed(futures):
+                symbol = futures[future]
+                try:
+                    self._results[symbol] = future.result()
+                except Exception as e:
+                    logger.error("Initial analysis failed for %s: %s", symbol, e)
+                    # 从空结果开始，由各刷新任务逐步填充
+                    self._results[symbol] = self.aggregator.refresh_parts(symbol)
+                self._publish(symbol)
+
+            now = self.clock()
+            queue: List[Tuple[float, Task]] = []
+            for symbol in self.symbols:
+                for task in self._tasks(symbol):
+                    heapq.heappush(queue, (self.next_run(task, now), task))
+
+            while not self._stop.is_set():
+                delay = queue[0][0] - self.clock()
+                if delay > 0:
+                    self._stop.wait(delay)
+                    continue
+                now = self.clock()
+                due = []
+                while queue and queue[0][0] <= now:
+                    due.append(heapq.heappop(queue)[1])
+                # 本轮有衍生品任务时只刷新一次全市场扫描表，而不是每个交易对各刷新一次
+                if any(kind != "frame" for _, kind, _ in due):
+                    self._refresh_scanner()
+                for task, future in [(task, executor.submit(self._execute, task)) for task in due]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error("Refresh %s failed: %s", task, e)
+                # 同一轮的任务按同一时间重新排期，下次仍一起到期、共用一次扫描
+                now = self.clock()
+                for task in due:
+                    heapq.heappush(queue, (self.next_run(task, now), task))
+                for symbol in dict.fromkeys(task[0] for task in due):
+                    self._publish(symbol)
+
+    def start(self) -> "WatchService":
+        """在后台线程运行"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="exdatahub-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait(self):
+        """阻塞到 stop() 被调用（前台运行时使用，可被 Ctrl-C 中断）"""
+        while not self._stop.wait(0.5):
+            pass
@@ -0,0 +1,287 @@
+"""
+历史数据列式导出（Parquet / Feather / CSV）
+
+按 交易所 / 交易对 / 周期 / 日期 分区写入，目录结构（Hive 风格，pandas / pyarrow 可直接按分区读取）：
+
+    data/klines/exchange=okx/symbol=BTC-USDT-SWAP/bar=1m/date=2023-11-14/part.parquet
+    data/funding/exchange=okx/symbol=BTC-USDT-SWAP/date=2023-11-14/part.parquet
+    data/open_interest/exchange=okx/symbol=BTC-USDT-SWAP/bar=5m/date=2023-11-14/part.parquet
+
+追加模式下与已有分区按 ts 合并去重（新数据覆盖旧数据），可反复执行而不产生重复行。
+Parquet / Feather 需要 pyarrow（uv sync --extra export），CSV 只使用标准库。
+
+用法：
+    exporter = ExportService("data", fmt="parquet")
+    exporter.dump_klines(client, "BTC-USDT-SWAP", "1m", limit=1440)
+    df = exporter.load("klines", "BTC-USDT-SWAP", bar="1m")
+"""
+import csv
+import datetime
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from exdatahub.core.models import KlineSeries, okx_data
+
+FORMATS = ("parquet", "feather", "csv")
+
+EXTENSIONS = {"parquet": "parquet", "feather": "feather", "csv": "csv"}
+
+# 各数据集的列及类型（ts 均为毫秒时间戳，用于分区与去重）
+SCHEMAS = {
+    "klines": {
+        "ts": np.int64, "open": np.float64, "high": np.float64, "low": np.float64, "close": np.float64,
+        "vol": np.float64, "vol_ccy": np.float64, "vol_ccy_quote": np.float64, "confirmed": np.bool_,
+    },
+    "funding": {"ts": np.int64, "funding_rate": np.float64, "realized_rate": np.float64},
+    "open_interest": {"ts": np.int64, "oi": np.float64, "oi_ccy": np.float64, "oi_usd": np.float64},
+}
+
+DAY_MS = 86_400_000
+
+# OKX 单页上限
+KLINE_PAGE = 300
+FUNDING_PAGE = 100
+OI_PAGE = 100
+
+Columns = Dict[str, np.ndarray]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Parquet / Feather 导出需要 pyarrow，请执行: uv sync --extra export "
+                          "（或使用 --format csv）") from e
+    return pyarrow
+
+
+def _float(value: Any) -> float:
+    return float(value) if value not in (None, "") else np.nan
+
+
+def kline_columns(series: KlineSeries) -> Columns:
+    """KlineSeries -> 导出列"""
+    return {name: getattr(series, name) for name in SCHEMAS["klines"]}
+
+
+def funding_columns(payload: Any) -> Columns:
+    """OKX 资金费率历史响应 -> 导出列"""
+    items = okx_data(payload)
+    return {
+        "ts": np.array([int(item["fundingTime"]) for item in items], dtype=np.int64),
+        "funding_rate": np.array([_float(item.get("fundingRate")) for item in items], dtype=np.float64),
+        "realized_rate": np.array([_float(item.get("realizedRate")) for item in items], dtype=np.float64),
+    }
+
+
+def oi_columns(payload: Any) -> Columns:
+    """
+    OKX 持仓量历史响应 -> 导出列
+
+    兼容两种行格式：[ts, oi, oiCcy, oiUsd] 数组，或 {"ts", "oi", "oiCcy", "oiUsd"} 字典
+    """
+    rows = []
+    for item in okx_data(payload):
+        if isinstance(item, dict):
+            item = [item.get("ts"), item.get("oi"), item.get("oiCcy"), item.get("oiUsd")]
+        rows.append((int(item[0]),) + tuple(_float(v) for v in (list(item[1:4]) + [None] * 3)[:3]))
+    return {
+        "ts": np.array([row[0] for row in rows], dtype=np.int64),
+        "oi": np.array([row[1] for row in rows], dtype=np.float64),
+        "oi_ccy": np.array([row[2] for row in rows], dtype=np.float64),
+        "oi_usd": np.array([row[3] for row in rows], dtype=np.float64),
+    }
+
+
+def merge_columns(old: Columns, new: Columns) -> Columns:
+    """合并两组列：按 ts 升序，ts 相同时保留 new 中的行"""
+    merged = {name: np.concatenate([old[name], new[name]]) for name in new}
+    # 反转后 np.unique 返回的是原数组中每个 ts 最后一次出现的位置
+    ts = merged["ts"]
+    _, first_in_reversed = np.unique(ts[::-1], return_index=True)
+    keep = len(ts) - 1 - first_in_reversed
+    return {name: values[keep] for name, values in merged.items()}
+
+
+class ExportService:
+    """
+    列式历史数据导出
+
+    Args:
+        root: 数据根目录
+        fmt: parquet / feather / csv
+        exchange: 交易所名称（分区键）
+    """
+
+    def __init__(self, root: str = "data", fmt: str = "parquet", exchange: str = "okx"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}', expected one of: {', '.join(FORMATS)}")
+        if fmt != "csv":
+            _require_pyarrow()
+        self.root = Path(root)
+        self.fmt = fmt
+        self.exchange = exchange
+
+    # ---------- 路径 ----------
+
+    def dataset_dir(self, dataset: str, symbol: str, bar: Optional[str] = None) -> Path:
+        path = self.root / dataset / f"exchange={self.exchange}" / f"symbol={symbol}"
+        return path / f"bar={bar}" if bar else path
+
+    def partition_path(self, dataset: str, symbol: str, bar: Optional[str], day: str) -> Path:
+        return self.dataset_dir(dataset, symbol, bar) / f"date={day}" / f"part.{EXTENSIONS[self.fmt]}"
+
+    # ---------- 写入 ----------
+
+    def write(self, dataset: str, symbol: str, columns: Columns, bar: Optional[str] = None,
+              append: bool = True) -> List[str]:
+        """
+        按 UTC 日期分区写入
+
+        Args:
+            dataset: klines / funding / open_interest
+            columns: 列名 -> numpy 数组（须包含 SCHEMAS[dataset] 的全部列）
+            append: True 时与已有分区合并去重；False 时覆盖涉及到的分区
+
+        Returns:
+            写入的文件路径（按日期升序）
+        """
+        schema = SCHEMAS[dataset]
+        columns = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in schema.items()}
+        if not len(columns["ts"]):
+            return []
+
+        days = columns["ts"] // DAY_MS
+        paths = []
+        for day in np.unique(days):
+            mask = days == day
+            part = {name: values[mask] for name, values in columns.items()}
+            label = datetime.datetime.fromtimestamp(int(day) * 86400, tz=datetime.timezone.utc).strftime("%Y-%m-%d")
+            path = self.partition_path(dataset, symbol, bar, label)
+            if append and path.exists():
+                old = self._read_file(path, schema)
+            else:
+                old = {name: values[:0] for name, values in part.items()}
+            self._write_file(path, merge_columns(old, part))
+            paths.append(str(path))
+        return paths
+
+    def write_klines(self, series: KlineSeries, append: bool = True) -> List[str]:
+        return self.write("klines", series.inst_id, kline_columns(series), bar=series.bar, append=append)
+
+    def _write_file(self, path: Path, columns: Columns):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，中断时不会留下半个分区
+        tmp = path.with_name(path.name + ".tmp")
+        if self.fmt == "csv":
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(list(columns))
+                writer.writerows(zip(*(values.tolist() for values in columns.values())))
+        else:
+            pa = _require_pyarrow()
+            table = pa.table(columns)
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+                pq.write_table(table, tmp)
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(table, tmp)
+        os.replace(tmp, path)
+
+    # ---------- 读取 ----------
+
+    def _read_file(self, path: Path, schema: Dict[str, Any]) -> Columns:
+        if self.fmt == "csv":
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                rows = list(reader)
+            columns = {}
+            for i, name in enumerate(header):
+                values = [row[i] for row in rows]
+                if schema[name] is np.bool_:
+                    columns[name] = np.array([v == "True" for v in values], dtype=bool)
+                else:
+                    columns[name] = np.array(values, dtype=np.float64).astype(schema[name])
+            return columns
+
+        _require_pyarrow()
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+        else:
+            import pyarrow.feather as feather
+            table = feather.read_table(path)
+        return {name: table.column(name).to_numpy() for name in schema}
+
+    def read(self, dataset: str, symbol: str, bar: Optional[str] = None) -> Columns:
+        """读取全部分区，按 ts 升序合并为列"""
+        schema = SCHEMAS[dataset]
+        empty = {name: np.empty(0, dtype=dtype) for name, dtype in schema.items()}
+        pattern = f"date=*/part.{EXTENSIONS[self.fmt]}"
+        parts = [self._read_file(path, schema)
+                 for path in sorted(self.dataset_dir(dataset, symbol, bar).glob(pattern))]
+        if not parts:
+            return empty
+        # 一次拼接后再去重，避免逐个分区合并的平方复杂度
+        return merge_columns(empty, {name: np.concatenate([part[name] for part in parts]) for name in schema})
+
+    def load(self, dataset: str, symbol: str, bar: Optional[str] = None):
+        """读取为 pandas DataFrame（ts 列转换为 UTC 时间索引）"""
+        import pandas as pd
+
+        df = pd.DataFrame(self.read(dataset, symbol, bar))
+        df.index = pd.to_datetime(df["ts"], unit="ms", utc=True)
+        df.index.name = "time"
+        return df
+
+    # ---------- 拉取并导出 ----------
+
+    def dump_klines(self, client, symbol: str, bar: str, limit: int = 1440, append: bool = True) -> int:
+        """
+        分页拉取最近 limit 根 K 线并写入（OKX candles 接口只提供最近 1440 根）
+
+        Returns:
+            写入的行数
+        """
+        pages = []
+        after = None
+        remaining = limit
+        while remaining > 0:
+            rows = okx_data(client.fetch_klines(symbol, bar, limit=min(KLINE_PAGE, remaining), after=after))
+            if not rows:
+                break
+            pages.extend(rows)
+            remaining -= len(rows)
+            after = min(rows, key=lambda row: int(row[0]))[0]
+        series = KlineSeries.from_okx(pages, inst_id=symbol, bar=bar)
+        self.write_klines(series, append=append)
+        return len(series)
+
+    def dump_funding_history(self, client, symbol: str, limit: int = 300, append: bool = True) -> int:
+        """分页拉取最近 limit 条资金费率记录并写入，返回写入的行数"""
+        items = []
+        after = None
+        remaining = limit
+        while remaining > 0:
+            page = okx_data(client.fetch_funding_rate_history(symbol, limit=min(FUNDING_PAGE, remaining),
+                                                              after=after))
+            if not page:
+                break
+            items.extend(page)
+            remaining -= len(page)
+            after = min(int(item["fundingTime"]) for item in page)
+        columns = funding_columns(items)
+        self.write("funding", symbol, columns, append=append)
+        return len(columns["ts"])
+
+    def dump_oi_history(self, client, symbol: str, period: str = "5m", limit: int = OI_PAGE,
+                        append: bool = True) -> int:
+        """拉取持仓量历史并写入（OKX 单次最多 100 条），返回写入的行数"""
+        columns = oi_columns(client.fetch_oi_history(symbol, period=period, limit=min(limit, OI_PAGE)))
+        self.write("open_interest", symbol, columns, bar=period, append=append)
+        return len(columns["ts"])
@@ -0,0 +1,244 @@
+"""
+增量（流式）技术指标引擎
+每个指标只保留 O(1) 的运行状态（EMA 递推、滚动窗口、Wilder 平滑），
+每来一根新 K 线或未收盘 K 线更新时增量计算，不再对完整历史重建 DataFrame。
+
+计算口径与 AnalysisService（pandas_ta）一致：对同一段 K 线序列，结果相同（浮点误差内）。
+引擎从第一根喂入的 K 线开始累积状态，因此持续运行后相当于对"种子窗口 + 之后所有 K 线"
+做 pandas_ta 计算。
+"""
+import math
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+# OKX K 线字段: [ts, open, high, low, close, vol, ...]
+TS, HIGH, LOW, CLOSE, VOL = 0, 2, 3, 4, 5
+
+
+class _EMA:
+    """
+    指数移动平均（presma：前 length 个值的 SMA 作为初值，与 pandas_ta / TA-Lib 一致）
+    """
+    __slots__ = ("length", "alpha", "count", "seed_sum", "value")
+
+    def __init__(self, length: int, alpha: Optional[float] = None, presma: bool = True):
+        self.length = length
+        self.alpha = alpha if alpha is not None else 2.0 / (length + 1)
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = None
+        if not presma:
+            # 无 presma：第一个值即初值（pandas ewm(adjust=False)）
+            self.length = 1
+
+    def peek(self, x: float) -> Optional[float]:
+        if self.count + 1 < self.length:
+            return None
+        if self.count + 1 == self.length:
+            return (self.seed_sum + x) / self.length
+        return (1 - self.alpha) * self.value + self.alpha * x
+
+    def push(self, x: float):
+        self.value = self.peek(x)
+        if self.count < self.length:
+            self.seed_sum += x
+        self.count += 1
+
+
+class _Window:
+    """
+    滚动窗口（保存最近 length - 1 个已确认值，加上当前值组成完整窗口）
+    滚动和定期重算，避免浮点累积误差
+    """
+    __slots__ = ("length", "values", "total", "pushes")
+
+    def __init__(self, length: int):
+        self.length = length
+        self.values = deque(maxlen=max(length - 1, 0))
+        self.total = 0.0
+        self.pushes = 0
+
+    def ready(self) -> bool:
+        return len(self.values) + 1 >= self.length
+
+    def mean(self, x: float) -> Optional[float]:
+        if not self.ready():
+            return None
+        return (self.total + x) / self.length
+
+    def std(self, x: float) -> Optional[float]:
+        """样本标准差（ddof=1，与 pandas rolling var 一致）"""
+        if not self.ready() or self.length < 2:
+            return None
+        mean = (self.total + x) / self.length
+        ss = (x - mean) ** 2 + sum((v - mean) ** 2 for v in self.values)
+        return math.sqrt(ss / (self.length - 1))
+
+    def push(self, x: float):
+        if self.values.maxlen == 0:
+            return
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self.pushes += 1
+        if self.pushes % 1024 == 0:
+            self.total = math.fsum(self.values)
+
+
+class _Bar:
+    __slots__ = ("ts", "high", "low", "close", "vol")
+
+    def __init__(self, row: List[str]):
+        self.ts = int(row[TS])
+        self.high = float(row[HIGH])
+        self.low = float(row[LOW])
+        self.close = float(row[CLOSE])
+        self.vol = float(row[VOL])
+
+
+class IndicatorEngine:
+    """
+    单个 (symbol, frame) 的流式指标引擎
+
+    最新一根 K 线始终作为"待定"处理：同一时间戳的 K 线再次到来时替换它（未收盘 K 线更新），
+    更新时间戳的 K 线到来时才把它提交进各指标状态。
+    """
+
+    def __init__(self):
+        self.bars = 0  # 已提交的 K 线数量
+        self.pending: Optional[_Bar] = None
+        self.prev_close: Optional[float] = None
+
+        self.ema_9 = _EMA(9)
+        self.ema_21 = _EMA(21)
+        self.ema_50 = _EMA(50)
+        self.ma_100 = _Window(100)
+        self.ma_200 = _Window(200)
+
+        self.bb = _Window(20)
+        # ATR: true range 的 Wilder 平滑（RMA），前 14 个 TR 的 SMA 作为初值
+        self.atr = _EMA(14, alpha=1.0 / 14)
+        # RSI: 涨跌幅的 Wilder 平滑，无 presma
+        self.rsi_up = _EMA(14, alpha=1.0 / 14, presma=False)
+        self.rsi_down = _EMA(14, alpha=1.0 / 14, presma=False)
+
+        self.macd_fast = _EMA(12)
+        self.macd_slow = _EMA(26)
+        self.macd_signal = _EMA(9)
+
+        self.vol_ma = _Window(20)
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return self.pending.ts if self.pending else None
+
+    def update(self, row: List[str]):
+        """
+        喂入一根 K 线（OKX 格式，按时间正序）
+
+        时间戳等于当前待定 K 线时视为修订，较新时先提交待定 K 线，较旧的忽略
+        """
+        bar = _Bar(row)
+        if self.pending is not None:
+            if bar.ts < self.pending.ts:
+                return
+            if bar.ts > self.pending.ts:
+                self._commit(self.pending)
+        self.pending = bar
+
+    def update_many(self, rows: List[List[str]]):
+        for row in rows:
+            self.update(row)
+
+    def _true_range(self, bar: _Bar) -> float:
+        hl = bar.high - bar.low
+        if self.prev_close is None:
+            return abs(hl)
+        return max(abs(hl), abs(bar.high - self.prev_close), abs(self.prev_close - bar.low))
+
+    def _commit(self, bar: _Bar):
+        close = bar.close
+        self.ema_9.push(close)
+        self.ema_21.push(close)
+        self.ema_50.push(close)
+        self.ma_100.push(close)
+        self.ma_200.push(close)
+        self.bb.push(close)
+        self.atr.push(self._true_range(bar))
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            self.rsi_up.push(max(change, 0.0))
+            self.rsi_down.push(min(change, 0.0))
+        fast = self.macd_fast.peek(close)
+        slow = self.macd_slow.peek(close)
+        if fast is not None and slow is not None:
+            self.macd_signal.push(fast - slow)
+        self.macd_fast.push(close)
+        self.macd_slow.push(close)
+        self.vol_ma.push(bar.vol)
+        self.prev_close = close
+        self.bars += 1
+
+    def values(self) -> Dict[str, Any]:
+        """
+        返回最新 K 线的指标值，结构与 AnalysisService.calculate_indicators 相同
+        """
+        bar = self.pending
+        if bar is None:
+            return {}
+        n = self.bars + 1  # 包含待定 K 线的序列长度
+        close = bar.close
+
+        def gated(min_length: int, value: Optional[float]) -> Optional[float]:
+            # pandas_ta 在序列长度不足时整体返回 None
+            if n < min_length or value is None or math.isnan(value):
+                return None
+            return value
+
+        bb_mid = self.bb.mean(close)
+        bb_std = self.bb.std(close)
+        bb_upper = bb_mid + 2 * bb_std if bb_mid is not None and bb_std is not None else None
+        bb_lower = bb_mid - 2 * bb_std if bb_mid is not None and bb_std is not None else None
+
+        rsi = None
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            up = self.rsi_up.peek(max(change, 0.0))
+            down = self.rsi_down.peek(min(change, 0.0))
+            if up is not None and down is not None and (up + abs(down)) != 0:
+                rsi = 100 * up / (up + abs(down))
+
+        macd = signal = hist = None
+        fast = self.macd_fast.peek(close)
+        slow = self.macd_slow.peek(close)
+        if fast is not None and slow is not None:
+            macd = fast - slow
+            signal = self.macd_signal.peek(macd)
+            if signal is not None:
+                hist = macd - signal
+
+        return {
+            "trend": {
+                "ema_9": gated(9, self.ema_9.peek(close)),
+                "ema_21": gated(21, self.ema_21.peek(close)),
+                "ema_50": gated(50, self.ema_50.peek(close)),
+                "ma_100": gated(100, self.ma_100.mean(close)),
+                "ma_200": gated(200, self.ma_200.mean(close)),
+            },
+            "volatility": {
+                "bb_upper": gated(20, bb_upper),
+                "bb_lower": gated(20, bb_lower),
+                "atr_14": gated(15, self.atr.peek(self._true_range(bar))),
+            },
+            "momentum": {
+                "rsi_14": gated(15, rsi),
+                "macd": gated(34, macd),
+                "macd_signal": gated(34, signal),
+                "macd_hist": gated(34, hist),
+            },
+            "volume": {
+                "vol": bar.vol,
+                "vol_ma_20": gated(20, self.vol_ma.mean(bar.vol)),
+            }
+        }
@@ -0,0 +1,231 @@
+"""
+合约元数据注册表（OKX）
+
+从 /api/v5/public/instruments 拉取 SPOT / SWAP / FUTURES 的全部合约，提供 O(1) 查询：
+- get(inst_id)：合约元数据（面值 ctVal、乘数 ctMult、面值币种 ctValCcy、合约类型 ctType、标的 uly 等）
+- by_underlying(uly)：同一标的的全部合约（BTC-USDT -> BTC-USDT-SWAP、BTC-USDT-240329 ...）
+- by_settle(ccy)：同一结算币种的全部合约
+- index_symbol(inst_id)：查询指数价使用的交易对（合约取标的 uly，现货取自身）
+- oi_usd(inst_id, oi, price)：持仓张数换算为美元价值
+
+注册表持久化到磁盘（JSON），启动时先加载磁盘文件，批量扫描无需等待元数据请求；
+数据超过 refresh_interval 后在后台线程刷新，刷新期间继续使用旧数据。
+OPTION 需要按 instFamily 逐个查询，不在注册表中。
+
+用法：
+    registry = InstrumentRegistry(client, path=".cache/instruments.json")
+    registry.ensure()                              # 加载磁盘文件，缺失时同步拉取，过期时后台刷新
+    registry.get("BTC-USDT-SWAP")["ctVal"]         # "0.01"
+    registry.oi_usd("BTC-USDT-SWAP", 1000, 60000)  # 600000.0
+"""
+import concurrent.futures
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from exdatahub.utils.converters import index_symbol as default_index_symbol
+from exdatahub.utils.logger import get_logger
+from exdatahub.utils.serialization import dumps_bytes, loads
+
+logger = get_logger(__name__)
+
+INST_TYPES = ("SPOT", "SWAP", "FUTURES")
+
+# 拉取失败后多少秒内不再重试（交易所不可达时避免每次查询都等待超时）
+RETRY_AFTER = 60.0
+
+# 持久化保留的字段（其余字段查询时用不到，不写入磁盘）
+FIELDS = ("instType", "instId", "uly", "instFamily", "baseCcy", "quoteCcy", "settleCcy", "ctVal", "ctMult",
+          "ctValCcy", "ctType", "state", "listTime", "expTime", "tickSz", "lotSz", "minSz")
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class InstrumentRegistry:
+    """
+    合约元数据注册表
+
+    Args:
+        client: OKXClient（需提供 fetch_instruments）；None 时只能从磁盘加载
+        path: 持久化文件路径，None 表示只在内存中
+        refresh_interval: 数据有效期（秒），超过后刷新
+        inst_types: 拉取的合约类型
+    """
+
+    def __init__(self, client=None, path: Optional[str] = None, refresh_interval: float = 3600.0,
+                 inst_types=INST_TYPES):
+        self.client = client
+        self.path = Path(path) if path else None
+        self.refresh_interval = refresh_interval
+        self.inst_types = tuple(inst_types)
+        self.updated_at: Optional[int] = None  # 数据拉取时间（ms）
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_underlying: Dict[str, List[str]] = {}
+        self._by_settle: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._failed_at: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, inst_id: str) -> bool:
+        return inst_id in self._by_id
+
+    # ---------- 加载 / 刷新 ----------
+
+    def _build(self, instruments: List[Dict[str, Any]], updated_at: int):
+        by_id, by_underlying, by_settle = {}, {}, {}
+        for item in instruments:
+            inst_id = item["instId"]
+            by_id[inst_id] = item
+            underlying = item.get("uly") or item.get("instFamily")
+            if underlying:
+                by_underlying.setdefault(underlying, []).append(inst_id)
+            if item.get("settleCcy"):
+                by_settle.setdefault(item["settleCcy"], []).append(inst_id)
+        # 整体替换引用，读取方不需要加锁
+        self._by_id, self._by_underlying, self._by_settle = by_id, by_underlying, by_settle
+        self.updated_at = updated_at
+
+    def load(self) -> bool:
+        """
+        从磁盘加载
+
+        Returns:
+            是否加载成功（文件不存在或损坏时返回 False）
+        """
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            state = loads(self.path.read_bytes())
+            self._build(state["instruments"], state["updated_at"])
+        except Exception as e:
+            logger.warning("Failed to load instruments from %s: %s", self.path, e)
+            return False
+        return True
+
+    def save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_bytes(dumps_bytes({"updated_at": self.updated_at, "instruments": list(self._by_id.values())},
+                                    compact=True))
+        os.replace(tmp, self.path)
+
+    def refresh(self) -> int:
+        """
+        从交易所拉取全部合约类型（并发），重建索引并写入磁盘
+
+        任一类型拉取失败时保留原有数据并抛出异常
+
+        Returns:
+            合约数量
+        """
+        if self.client is None:
+            raise RuntimeError("InstrumentRegistry has no client to refresh from")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.inst_types)) as executor:
+            responses = list(executor.map(self.client.fetch_instruments, self.inst_types))
+        instruments = [{k: item[k] for k in FIELDS if k in item}
+                       for response in responses for item in response.get("data", [])]
+        with self._lock:
+            self._build(instruments, int(time.time() * 1000))
+            self.save()
+        logger.info("Loaded %d instruments", len(instruments))
+        return len(instruments)
+
+    @property
+    def stale(self) -> bool:
+        return self.updated_at is None or time.time() * 1000 - self.updated_at >= self.refresh_interval * 1000
+
+    def _recently_failed(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_AFTER
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+            self._failed_at = None
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            logger.warning("Refreshing instruments failed: %s", e)
+
+    def ensure(self, background: bool = True, block_if_empty: bool = True) -> "InstrumentRegistry":
+        """
+        保证注册表可用：首次调用先加载磁盘文件；没有任何数据时同步拉取（block_if_empty=False 时也在后台拉取），
+        数据过期时（background=True）在后台线程刷新，期间继续使用旧数据
+        """
+        if self.updated_at is None:
+            self.load()
+        if not self.stale or self.client is None:
+            return self
+        if self._recently_failed():
+            return self
+        if (not self._by_id and block_if_empty) or not background:
+            # 同步拉取：并发调用只拉取一次，其余调用等待
+            with self._refresh_lock:
+                if self.stale and not self._recently_failed():
+                    self._refresh_quietly()
+            return self
+        with self._lock:
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(target=self._refresh_quietly, name="exdatahub-instruments",
+                                                        daemon=True)
+                self._refresh_thread.start()
+        return self
+
+    # ---------- 查询 ----------
+
+    def get(self, inst_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(inst_id)
+
+    def by_underlying(self, underlying: str) -> List[Dict[str, Any]]:
+        return [self._by_id[i] for i in self._by_underlying.get(underlying, ())]
+
+    def by_settle(self, ccy: str, inst_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        items = [self._by_id[i] for i in self._by_settle.get(ccy, ())]
+        return [item for item in items if item.get("instType") == inst_type] if inst_type else items
+
+    def inst_ids(self, inst_type: Optional[str] = None) -> List[str]:
+        return [i for i, item in self._by_id.items() if inst_type is None or item.get("instType") == inst_type]
+
+    def index_symbol(self, inst_id: str) -> str:
+        """查询指数价使用的交易对：合约取标的（uly），现货取自身；未知合约按 instId 推断"""
+        item = self._by_id.get(inst_id)
+        if item is None:
+            return default_index_symbol("okx", inst_id)
+        return item.get("uly") or item.get("instFamily") or inst_id
+
+    def contract_size(self, inst_id: str) -> Optional[float]:
+        """每张合约的面值（ctVal × ctMult，单位为 ctValCcy）；未知合约或现货返回 None"""
+        item = self._by_id.get(inst_id)
+        if item is None:
+            return None
+        value = _float(item.get("ctVal"))
+        if value is None:
+            return None
+        return value * (_float(item.get("ctMult")) or 1.0)
+
+    def oi_usd(self, inst_id: str, oi: float, price: Optional[float]) -> Optional[float]:
+        """
+        持仓张数换算为美元价值
+
+        正向合约（面值为币，如 0.01 BTC）：张数 × 面值 × 价格；
+        反向合约（面值为美元，如 100 USD）：张数 × 面值，不需要价格
+        """
+        size = self.contract_size(inst_id)
+        if size is None:
+            return None
+        if self._by_id[inst_id].get("ctType") == "inverse":
+            return oi * size
+        if price is None:
+            return None
+        return oi * size * price
@@ -0,0 +1,132 @@
+"""
+增量 K 线存储
+按 (exchange, instId, bar) 缓存已获取的 K 线，刷新时只请求最后一根已确认 K 线之后的数据，
+并用最新数据替换尚未收盘的 K 线
+"""
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from exdatahub.core.models import KlineSeries
+
+# OKX K 线字段: [ts, open, high, low, close, vol, volCcy, volCcyQuote, confirm]
+TS, CONFIRM = 0, 8
+
+# 增量请求的 limit（OKX candles 接口单次最多 300 根）
+INCREMENTAL_LIMIT = 100
+
+
+class _Series:
+    __slots__ = ("rows", "last_confirmed_ts", "lock")
+
+    def __init__(self):
+        self.rows: List[List[str]] = []
+        self.last_confirmed_ts: Optional[int] = None
+        self.lock = threading.Lock()
+
+
+class KlineStore:
+    """增量 K 线存储（线程安全）"""
+
+    def __init__(self, exchange: str = "okx"):
+        self.exchange = exchange
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _get_series(self, symbol: str, bar: str) -> _Series:
+        key = (self.exchange, symbol, bar)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            return series
+
+    def get(self, symbol: str, bar: str, limit: Optional[int] = None) -> List[List[str]]:
+        """
+        返回已缓存的 K 线（按时间正序）
+
+        Args:
+            symbol: 交易对
+            bar: 周期
+            limit: 最多返回最近多少根（None 表示全部）
+        """
+        series = self._get_series(symbol, bar)
+        with series.lock:
+            rows = series.rows if limit is None else series.rows[-limit:]
+            return list(rows)
+
+    def series(self, symbol: str, bar: str, limit: Optional[int] = None) -> KlineSeries:
+        """返回已缓存的 K 线（列式 KlineSeries，按时间正序）"""
+        return KlineSeries.from_okx(self.get(symbol, bar, limit), inst_id=symbol, bar=bar)
+
+    def last_confirmed_ts(self, symbol: str, bar: str) -> Optional[int]:
+        return self._get_series(symbol, bar).last_confirmed_ts
+
+    def refresh(self, client, symbol: str, bar: str, limit: int = 100) -> List[List[str]]:
+        """
+        刷新并返回最近 limit 根 K 线（按时间正序）
+
+        首次调用拉取完整的 limit 根；之后用 OKX 的 before 参数只拉取最后一根已确认 K 线之后的数据。
+        如果增量结果填满了一页（可能存在缺口），退回完整拉取。
+
+        Args:
+            client: 交易所客户端（需支持 fetch_klines(..., before=...)）
+            symbol: 交易对
+            bar: 周期
+            limit: 保留 / 返回的 K 线数量
+        """
+        series = self._get_series(symbol, bar)
+        with series.lock:
+            full = (series.last_confirmed_ts is None or len(series.rows) < limit)
+            if not full:
+                page_limit = min(INCREMENTAL_LIMIT, limit)
+                data = client.fetch_klines(symbol, bar, limit=page_limit, before=str(series.last_confirmed_ts))
+                new_rows = data.get("data", [])
+                if len(new_rows) >= page_limit:
+                    full = True
+                else:
+                    self._merge(series, new_rows)
+
+            if full:
+                data = client.fetch_klines(symbol, bar, limit=limit)
+                series.rows = []
+                self._merge(series, data.get("data", []))
+
+            if len(series.rows) > limit:
+                del series.rows[:-limit]
+            return list(series.rows)
+
+    def apply(self, symbol: str, bar: str, rows: List[List[str]], limit: Optional[int] = None):
+        """
+        合并外部推送的 K 线（例如 WebSocket candle 频道）
+
+        只有已有历史数据时才合并，避免只保存零散的几根 K 线
+
+        Args:
+            limit: 合并后最多保留的 K 线数量（None 表示不截断）
+        """
+        series = self._get_series(symbol, bar)
+        with series.lock:
+            if series.rows:
+                self._merge(series, rows)
+                if limit is not None and len(series.rows) > limit:
+                    del series.rows[:-limit]
+
+    @staticmethod
+    def _merge(series: _Series, new_rows: List[List[str]]):
+        """合并 K 线：新数据覆盖同一时间戳及之后的旧数据（包括未收盘 K 线）"""
+        if not new_rows:
+            return
+        # OKX 返回最新在前
+        new_rows = sorted(new_rows, key=lambda row: int(row[TS]))
+        first_ts = int(new_rows[0][TS])
+        rows = series.rows
+        cut = len(rows)
+        while cut > 0 and int(rows[cut - 1][TS]) >= first_ts:
+            cut -= 1
+        del rows[cut:]
+        rows.extend(new_rows)
+
+        for row in reversed(rows):
+            if len(row) <= CONFIRM or row[CONFIRM] == "1":
+                series.last_confirmed_ts = int(row[TS])
+                break
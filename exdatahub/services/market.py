@@ -0,0 +1,197 @@
+"""
+跨交易所行情门面
+
+同一合约在多个交易所（OKX / Binance / Bybit）的数据并发拉取，统一格式后对齐：
+- snapshot(symbol)：各交易所的最新价、标记价、指数价、基差、资金费率、持仓量，
+  以及跨交易所的资金费率 / 基差 / 标记价价差
+- klines(symbol, bar, limit)：各交易所 K 线按开盘时间对齐（只保留所有交易所都有的 K 线）
+
+交易对与周期可使用任意交易所的写法（BTC-USDT-SWAP / BTCUSDT，1H / 1h / 60），由 utils.converters 转换。
+每个交易所复用一个 AggregatorService 的客户端与连接池；所有请求在同一个事件循环中并发发出，
+耗时约等于最慢交易所的一次往返，而不是多条串行流程之和。
+
+用法：
+    market = MarketService(["okx", "binance", "bybit"])
+    snap = market.snapshot("BTC-USDT-SWAP")
+    snap["spreads"]["funding_rate"]   # {"max", "min", "spread", "high": "okx", "low": "binance"}
+    series = market.klines("BTCUSDT", "1H", limit=200)   # {exchange: KlineSeries}，ts 完全一致
+"""
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+
+from exdatahub.core.models import FundingRate, IndexTicker, KlineSeries, MarkPrice, OpenInterest, Ticker
+from exdatahub.services.aggregator import AggregatorService
+from exdatahub.utils.converters import index_symbol, normalize_interval, parse_symbol, to_exchange_symbol
+from exdatahub.utils.logger import get_logger
+from exdatahub.utils.time_utils import interval_to_seconds
+
+if TYPE_CHECKING:
+    from exdatahub.config.config_loader import ConfigLoader
+
+logger = get_logger(__name__)
+
+DEFAULT_EXCHANGES = ("okx", "binance", "bybit")
+
+# 计算跨交易所价差的字段
+SPREAD_FIELDS = ("funding_rate", "basis_pct", "mark")
+
+
+def venue_spread(venues: Dict[str, Dict[str, Any]], field: str) -> Optional[Dict[str, Any]]:
+    """
+    某个字段在各交易所之间的价差
+
+    Returns:
+        {"max", "min", "spread", "high": 最大值所在交易所, "low": 最小值所在交易所}；
+        有效数据不足两个交易所时返回 None
+    """
+    values = {exchange: v[field] for exchange, v in venues.items() if v.get(field) is not None}
+    if len(values) < 2:
+        return None
+    high = max(values, key=values.get)
+    low = min(values, key=values.get)
+    return {"max": values[high], "min": values[low], "spread": values[high] - values[low], "high": high, "low": low}
+
+
+def align_series(series: Dict[str, KlineSeries]) -> Dict[str, KlineSeries]:
+    """只保留所有交易所都有的开盘时间，返回 ts 完全一致的各交易所序列"""
+    if not series:
+        return {}
+    common = None
+    for s in series.values():
+        common = s.ts if common is None else np.intersect1d(common, s.ts, assume_unique=True)
+    aligned = {}
+    for exchange, s in series.items():
+        mask = np.isin(s.ts, common, assume_unique=True)
+        aligned[exchange] = KlineSeries(
+            s.ts[mask], s.open[mask], s.high[mask], s.low[mask], s.close[mask], s.vol[mask],
+            vol_ccy=s.vol_ccy[mask], vol_ccy_quote=s.vol_ccy_quote[mask], confirmed=s.confirmed[mask],
+            inst_id=s.inst_id, bar=s.bar,
+        )
+    return aligned
+
+
+class MarketService:
+    """
+    跨交易所行情服务
+
+    Args:
+        exchanges: 交易所列表（默认 OKX / Binance / Bybit）
+        config: 配置（连接池、超时、限频、缓存等，与 AggregatorService 相同）
+        aggregators: 预先创建的 {交易所: AggregatorService}，未提供的按需创建
+    """
+
+    def __init__(self, exchanges: Optional[List[str]] = None, config: Optional['ConfigLoader'] = None,
+                 aggregators: Optional[Dict[str, AggregatorService]] = None):
+        self.exchanges = [e.lower() for e in (exchanges or DEFAULT_EXCHANGES)]
+        self.aggregators = dict(aggregators or {})
+        for exchange in self.exchanges:
+            if exchange not in self.aggregators:
+                self.aggregators[exchange] = AggregatorService(exchange, config=config)
+
+    def close(self):
+        for aggregator in self.aggregators.values():
+            aggregator.close()
+
+    async def _venue(self, exchange: str, symbol: str) -> Dict[str, Any]:
+        """单个交易所的统一格式数据；单项请求失败只影响对应字段（记录在 errors 中）"""
+        client = self.aggregators[exchange].async_client
+        native = to_exchange_symbol(exchange, symbol)
+        responses = await asyncio.gather(
+            client.fetch_ticker(native),
+            client.fetch_funding_rate(native),
+            client.fetch_mark_price(native),
+            client.fetch_index_tickers(index_symbol(exchange, native)),
+            client.fetch_open_interest(native),
+            return_exceptions=True,
+        )
+        venue = {"exchange": exchange, "symbol": native, "last": None, "mark": None, "index": None,
+                 "basis": None, "basis_pct": None, "funding_rate": None, "next_funding_time": None,
+                 "oi_ccy": None, "ts": None}
+        errors = {}
+        parsers = (
+            ("ticker", Ticker, lambda m: {"last": m.last}),
+            ("funding_rate", FundingRate, lambda m: {"funding_rate": m.rate, "next_funding_time": m.next_funding_time}),
+            ("mark", MarkPrice, lambda m: {"mark": m.price, "ts": m.ts}),
+            ("index", IndexTicker, lambda m: {"index": m.price}),
+            # 持仓量统一用币数量比较（OKX 的 oi 是张数）
+            ("oi", OpenInterest, lambda m: {"oi_ccy": m.oi_ccy}),
+        )
+        for (name, model, fields), response in zip(parsers, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                venue.update(fields(model.from_okx(response)))
+            except Exception as e:
+                errors[name] = str(e)
+
+        if venue["mark"] is not None and venue["index"]:
+            venue["basis"] = venue["mark"] - venue["index"]
+            venue["basis_pct"] = venue["basis"] / venue["index"] * 100
+        if errors:
+            venue["errors"] = errors
+        return venue
+
+    async def snapshot_async(self, symbol: str) -> Dict[str, Any]:
+        """
+        各交易所同一合约的对齐快照
+
+        Args:
+            symbol: 任意交易所写法的交易对
+
+        Returns:
+            {"symbol": 统一写法, "timestamp": 拉取时间 ms, "venues": {交易所: {...}},
+             "spreads": {"funding_rate" / "basis_pct" / "mark": venue_spread(...)}}
+        """
+        key = parse_symbol(symbol).key
+        results = await asyncio.gather(*(self._venue(e, symbol) for e in self.exchanges), return_exceptions=True)
+        venues = {}
+        for exchange, result in zip(self.exchanges, results):
+            venues[exchange] = ({"exchange": exchange, "error": str(result)}
+                                if isinstance(result, Exception) else result)
+        spreads = {field: venue_spread(venues, field) for field in SPREAD_FIELDS}
+        mark = spreads["mark"]
+        if mark is not None:
+            mid = (mark["max"] + mark["min"]) / 2
+            mark["spread_bps"] = mark["spread"] / mid * 10000 if mid else None
+        return {"symbol": key, "timestamp": int(time.time() * 1000), "venues": venues, "spreads": spreads}
+
+    def snapshot(self, symbol: str) -> Dict[str, Any]:
+        """snapshot_async 的同步版本"""
+        return asyncio.run(self.snapshot_async(symbol))
+
+    async def klines_async(self, symbol: str, bar: str = "1H", limit: int = 100) -> Dict[str, KlineSeries]:
+        """
+        各交易所的 K 线，按开盘时间对齐
+
+        OKX 6H 及以上周期默认按香港时间对齐，这里改用 UTC 对齐的写法（如 1Dutc），与 Binance / Bybit 一致。
+        拉取失败的交易所不出现在结果中（记录警告日志）。
+
+        Returns:
+            {交易所: KlineSeries}（最早在前，各序列 ts 完全一致）
+        """
+        bar = normalize_interval(bar)
+
+        async def fetch(exchange):
+            native_bar = bar
+            if exchange == "okx" and not bar.endswith("utc") and interval_to_seconds(bar) >= 6 * 3600:
+                native_bar = bar + "utc"
+            native = to_exchange_symbol(exchange, symbol)
+            client = self.aggregators[exchange].async_client
+            response = await client.fetch_klines(native, native_bar, limit=limit)
+            return KlineSeries.from_okx(response, inst_id=native, bar=bar)
+
+        results = await asyncio.gather(*(fetch(e) for e in self.exchanges), return_exceptions=True)
+        series = {}
+        for exchange, result in zip(self.exchanges, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to fetch %s klines from %s: %s", symbol, exchange, result)
+                continue
+            series[exchange] = result
+        return align_series(series)
+
+    def klines(self, symbol: str, bar: str = "1H", limit: int = 100) -> Dict[str, KlineSeries]:
+        """klines_async 的同步版本"""
+        return asyncio.run(self.klines_async(symbol, bar, limit))
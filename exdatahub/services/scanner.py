@@ -0,0 +1,165 @@
+"""
+全市场衍生品扫描（OKX）
+
+按 instType 一次拉取全部合约的行情、标记价、持仓量、资金费率与指数价，建立按 instId 索引的内存表：
+- /api/v5/market/tickers?instType=SWAP
+- /api/v5/public/mark-price?instType=SWAP
+- /api/v5/public/open-interest?instType=SWAP
+- /api/v5/public/funding-rate?instId=ANY
+- /api/v5/market/index-tickers?quoteCcy=USDT（每个计价币一次）
+
+扫描整个 SWAP 市场只需要几次请求，而不是每个交易对各请求一遍。表中的数据保持 OKX 原始字段，
+频道名与 WebSocket 行情一致（tickers / mark-price / open-interest / funding-rate / index-tickers），
+AggregatorService 可以像读取 WebSocket 快照一样读取。
+
+用法：
+    scanner = DerivativesScanner(client, max_age=5)
+    scanner.refresh()                               # 超过 max_age 才重新扫描
+    scanner.get("funding-rate", "BTC-USDT-SWAP")    # OKX 原始数据项
+    top = sorted(scanner.records(), key=lambda r: r["funding_rate"] or 0)[-10:]
+"""
+import concurrent.futures
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from exdatahub.utils.converters import index_symbol
+from exdatahub.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _index(response: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {item["instId"]: item for item in response.get("data", []) if item.get("instId")}
+
+
+class DerivativesScanner:
+    """
+    全市场衍生品数据表
+
+    Args:
+        client: OKXClient（需提供 fetch_tickers 等全市场接口）
+        inst_type: 合约类型（SWAP / FUTURES）；资金费率只对 SWAP 拉取
+        max_age: 表的最长有效期（秒），refresh() 在超过后重新扫描
+    """
+
+    def __init__(self, client, inst_type: str = "SWAP", max_age: float = 1.0):
+        self.client = client
+        self.inst_type = inst_type
+        self.max_age = max_age
+        self.updated_at: Optional[int] = None  # 最近一次扫描完成时间（ms）
+        self._tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._scanned_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _sources(self) -> Dict[str, Callable[[], Dict[str, Any]]]:
+        sources = {
+            "tickers": lambda: self.client.fetch_tickers(self.inst_type),
+            "mark-price": lambda: self.client.fetch_mark_prices(self.inst_type),
+            "open-interest": lambda: self.client.fetch_open_interests(self.inst_type),
+        }
+        if self.inst_type == "SWAP":
+            sources["funding-rate"] = self.client.fetch_funding_rates
+        return sources
+
+    def scan(self) -> Dict[str, int]:
+        """
+        立即扫描并重建全部表；单个接口失败只影响对应的表（保留为空并记录警告日志）
+
+        Returns:
+            {频道: 合约数量}
+        """
+        tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+        def load(channel, fetch):
+            try:
+                tables[channel] = _index(fetch())
+            except Exception as e:
+                logger.warning("Scanning %s failed: %s", channel, e)
+
+        sources = self._sources()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            list(executor.map(lambda item: load(*item), sources.items()))
+
+        # 指数价按计价币批量查询，计价币取自合约 instId 的第二段（BTC-USDT-SWAP -> USDT）
+        quotes = sorted({inst_id.split("-")[1] for table in tables.values() for inst_id in table
+                         if inst_id.count("-") >= 2})
+        if quotes:
+            index: Dict[str, Dict[str, Any]] = {}
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(quotes)) as executor:
+                for quote, future in [(q, executor.submit(self.client.fetch_index_tickers_by_quote, q))
+                                      for q in quotes]:
+                    try:
+                        index.update(_index(future.result()))
+                    except Exception as e:
+                        logger.warning("Scanning %s index tickers failed: %s", quote, e)
+            tables["index-tickers"] = index
+
+        self._tables = tables
+        self.updated_at = int(time.time() * 1000)
+        return {channel: len(table) for channel, table in tables.items()}
+
+    def refresh(self) -> bool:
+        """
+        表超过 max_age 时重新扫描；并发调用只扫描一次，其余调用等待扫描完成
+
+        Returns:
+            是否执行了扫描
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._scanned_at is not None and now - self._scanned_at < self.max_age:
+                return False
+            try:
+                self.scan()
+            finally:
+                # 扫描失败同样计时，避免每次读取都重新请求
+                self._scanned_at = time.monotonic()
+            return True
+
+    def get(self, channel: str, inst_id: str) -> Optional[Dict[str, Any]]:
+        """表中的 OKX 原始数据项；没有该频道或合约时返回 None（不触发扫描）"""
+        return self._tables.get(channel, {}).get(inst_id)
+
+    def table(self, channel: str) -> Dict[str, Dict[str, Any]]:
+        """{instId: 数据项}"""
+        return self._tables.get(channel, {})
+
+    @property
+    def inst_ids(self) -> List[str]:
+        """表中全部合约（不含指数）"""
+        return sorted(set().union(*(table for channel, table in self._tables.items() if channel != "index-tickers")))
+
+    def records(self) -> List[Dict[str, Any]]:
+        """
+        每个合约一行的合并数据（数值已转换为 float）
+
+        basis_pct 为 (标记价 - 指数价) / 指数价 × 100；oi_usd 为 OKX 返回的持仓价值（美元）
+        """
+        rows = []
+        for inst_id in self.inst_ids:
+            ticker = self.get("tickers", inst_id) or {}
+            mark = _float((self.get("mark-price", inst_id) or {}).get("markPx"))
+            index = _float((self.get("index-tickers", index_symbol("okx", inst_id)) or {}).get("idxPx"))
+            funding = self.get("funding-rate", inst_id) or {}
+            oi = self.get("open-interest", inst_id) or {}
+            rows.append({
+                "inst_id": inst_id,
+                "last": _float(ticker.get("last")),
+                "vol_ccy_24h": _float(ticker.get("volCcy24h")),
+                "mark": mark,
+                "index": index,
+                "basis_pct": (mark - index) / index * 100 if mark is not None and index else None,
+                "funding_rate": _float(funding.get("fundingRate")),
+                "next_funding_time": funding.get("nextFundingTime") or None,
+                "oi": _float(oi.get("oi")),
+                "oi_ccy": _float(oi.get("oiCcy")),
+                "oi_usd": _float(oi.get("oiUsd")),
+            })
+        return rows
@@ -0,0 +1,296 @@
+"""
+NumPy 向量化指标后端
+直接把 OKX 原始 K 线解析为 float64 数组计算指标，不构造 DataFrame、不依赖 pandas_ta。
+输出结构与 AnalysisService.calculate_indicators 相同，计算口径与 pandas_ta 一致。
+
+所有内核沿最后一个轴（时间轴）计算，既支持单个序列（1-D），也支持多个序列组成的矩阵（2-D）。
+滚动类指标完全向量化；EMA / Wilder 平滑这类递推指标按时间步循环，每步对所有序列做向量运算。
+"""
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from exdatahub.core.models import KlineSeries
+
+# pandas_ta 在序列长度不足时返回 None，这里用对应的最小长度复现
+MIN_LENGTH_ATR = 15
+MIN_LENGTH_RSI = 15
+MIN_LENGTH_MACD = 34
+
+
+def parse_klines(klines: Union[List[List[str]], KlineSeries]) -> Dict[str, np.ndarray]:
+    """
+    把 OKX K 线（[ts, open, high, low, close, vol, ...]，按时间正序）解析为 float64 数组
+
+    已经是 KlineSeries 时直接使用其列，不再解析
+
+    Returns:
+        {"open", "high", "low", "close", "vol"} -> 1-D float64 数组
+    """
+    if isinstance(klines, KlineSeries):
+        return {"open": klines.open, "high": klines.high, "low": klines.low,
+                "close": klines.close, "vol": klines.vol}
+    if not klines:
+        empty = np.empty(0, dtype=np.float64)
+        return {"open": empty, "high": empty, "low": empty, "close": empty, "vol": empty}
+    ohlcv = np.array([row[1:6] for row in klines], dtype=np.float64)
+    return {
+        "open": ohlcv[:, 0],
+        "high": ohlcv[:, 1],
+        "low": ohlcv[:, 2],
+        "close": ohlcv[:, 3],
+        "vol": ohlcv[:, 4],
+    }
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan)
+
+
+def sma(x: np.ndarray, length: int) -> np.ndarray:
+    """简单移动平均"""
+    out = _nan_like(x)
+    if x.shape[-1] < length:
+        return out
+    out[..., length - 1:] = sliding_window_view(x, length, axis=-1).mean(axis=-1)
+    return out
+
+
+def rolling_std(x: np.ndarray, length: int, ddof: int = 1) -> np.ndarray:
+    """滚动标准差（默认样本标准差，与 pandas rolling var 一致）"""
+    out = _nan_like(x)
+    if x.shape[-1] < length:
+        return out
+    out[..., length - 1:] = sliding_window_view(x, length, axis=-1).std(axis=-1, ddof=ddof)
+    return out
+
+
+def ema(x: np.ndarray, length: int, alpha: Optional[float] = None, presma: bool = True) -> np.ndarray:
+    """
+    指数移动平均
+
+    Args:
+        x: 输入序列
+        length: 周期
+        alpha: 平滑系数（默认 2 / (length + 1)）
+        presma: 是否用前 length 个值的 SMA 作为初值（pandas_ta 默认）
+    """
+    out = _nan_like(x)
+    n = x.shape[-1]
+    if n < length:
+        return out
+    alpha = 2.0 / (length + 1) if alpha is None else alpha
+    if presma:
+        start = length - 1
+        value = x[..., :length].mean(axis=-1)
+    else:
+        start = 0
+        value = x[..., 0]
+    out[..., start] = value
+    decay = 1.0 - alpha
+    for i in range(start + 1, n):
+        value = decay * value + alpha * x[..., i]
+        out[..., i] = value
+    return out
+
+
+def rma(x: np.ndarray, length: int, presma: bool = False) -> np.ndarray:
+    """Wilder 平滑（alpha = 1 / length）"""
+    return ema(x, length, alpha=1.0 / length, presma=presma)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """真实波幅（第一根 K 线为 high - low）"""
+    hl = np.abs(high - low)
+    tr = hl.copy()
+    prev_close = close[..., :-1]
+    tr[..., 1:] = np.maximum(hl[..., 1:], np.maximum(np.abs(high[..., 1:] - prev_close),
+                                                     np.abs(prev_close - low[..., 1:])))
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14) -> np.ndarray:
+    """平均真实波幅（TR 的 Wilder 平滑，前 length 个 TR 的 SMA 为初值）"""
+    if close.shape[-1] < length + 1:
+        return _nan_like(close)
+    return rma(true_range(high, low, close), length, presma=True)
+
+
+def rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    """相对强弱指数（涨跌幅 Wilder 平滑，无 presma）"""
+    out = _nan_like(close)
+    if close.shape[-1] < length + 1:
+        return out
+    change = np.diff(close, axis=-1)
+    up = rma(np.maximum(change, 0.0), length)
+    down = np.abs(rma(np.minimum(change, 0.0), length))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., 1:] = 100 * up / (up + down)
+    return out
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """
+    MACD
+
+    Returns:
+        (macd, signal, histogram)
+    """
+    if close.shape[-1] < slow + signal - 1:
+        nan = _nan_like(close)
+        return nan, nan.copy(), nan.copy()
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = _nan_like(close)
+    signal_line[..., slow - 1:] = ema(line[..., slow - 1:], signal)
+    return line, signal_line, line - signal_line
+
+
+def _last(x: np.ndarray) -> Optional[float]:
+    if x.shape[-1] == 0:
+        return None
+    value = float(x[-1])
+    return None if np.isnan(value) else value
+
+
+def indicator_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, vol: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    计算完整指标序列（沿时间轴）
+
+    Returns:
+        {指标名: 与输入同形状的数组}，指标名与输出字典的键相同
+    """
+    bb_mid = sma(close, 20)
+    bb_std = rolling_std(close, 20)
+    macd_line, macd_signal, macd_hist = macd(close, 12, 26, 9)
+    return {
+        "ema_9": ema(close, 9),
+        "ema_21": ema(close, 21),
+        "ema_50": ema(close, 50),
+        "ma_100": sma(close, 100),
+        "ma_200": sma(close, 200),
+        "bb_upper": bb_mid + 2 * bb_std,
+        "bb_lower": bb_mid - 2 * bb_std,
+        "atr_14": atr(high, low, close, 14),
+        "rsi_14": rsi(close, 14),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_hist,
+        "vol": vol,
+        "vol_ma_20": sma(vol, 20),
+    }
+
+
+def format_indicators(values: Dict[str, Optional[float]]) -> Dict[str, Any]:
+    """把扁平的最新指标值整理成 calculate_indicators 的输出结构"""
+    return {
+        "trend": {
+            "ema_9": values["ema_9"],
+            "ema_21": values["ema_21"],
+            "ema_50": values["ema_50"],
+            "ma_100": values["ma_100"],
+            "ma_200": values["ma_200"],
+        },
+        "volatility": {
+            "bb_upper": values["bb_upper"],
+            "bb_lower": values["bb_lower"],
+            "atr_14": values["atr_14"],
+        },
+        "momentum": {
+            "rsi_14": values["rsi_14"],
+            "macd": values["macd"],
+            "macd_signal": values["macd_signal"],
+            "macd_hist": values["macd_hist"],
+        },
+        "volume": {
+            "vol": values["vol"],
+            "vol_ma_20": values["vol_ma_20"],
+        }
+    }
+
+
+def calculate_indicators(klines: Union[List[List[str]], KlineSeries]) -> Dict[str, Any]:
+    """
+    计算最新一根 K 线的指标（NumPy 后端）
+
+    Args:
+        klines: OKX K 线 [ts, open, high, low, close, vol, ...]，按时间正序；或 KlineSeries
+
+    Returns:
+        与 AnalysisService.calculate_indicators 相同结构的字典
+    """
+    if len(klines) == 0:
+        return {}
+    arrays = parse_klines(klines)
+    series = indicator_series(arrays["high"], arrays["low"], arrays["close"], arrays["vol"])
+    return format_indicators({name: _last(values) for name, values in series.items()})
+
+
+def calculate_indicators_batch(high: np.ndarray, low: np.ndarray, close: np.ndarray, vol: np.ndarray,
+                               symbols: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    批量计算多个交易对的最新指标（一次向量化计算）
+
+    Args:
+        high / low / close / vol: 形状为 (交易对数, K 线数) 的矩阵，每行按时间正序且长度相同
+        symbols: 每行对应的交易对名称（默认使用行号）
+
+    Returns:
+        {交易对: 与 calculate_indicators 相同结构的字典}
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim != 2:
+        raise ValueError(f"Expected a 2-D (symbols x bars) matrix, got shape {close.shape}")
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    vol = np.asarray(vol, dtype=np.float64)
+    for name, matrix in (("high", high), ("low", low), ("vol", vol)):
+        if matrix.shape != close.shape:
+            raise ValueError(f"'{name}' has shape {matrix.shape}, expected {close.shape}")
+    if symbols is None:
+        symbols = [str(i) for i in range(close.shape[0])]
+    elif len(symbols) != close.shape[0]:
+        raise ValueError(f"Got {len(symbols)} symbols for {close.shape[0]} rows")
+
+    if close.shape[1] == 0:
+        return {symbol: {} for symbol in symbols}
+
+    series = indicator_series(high, low, close, vol)
+    latest = {name: values[:, -1] for name, values in series.items()}
+    results = {}
+    for i, symbol in enumerate(symbols):
+        values = {}
+        for name, column in latest.items():
+            value = float(column[i])
+            values[name] = None if np.isnan(value) else value
+        results[symbol] = format_indicators(values)
+    return results
+
+
+def calculate_indicators_many(klines_by_symbol: Dict[str, List[List[str]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    批量计算多个交易对的最新指标
+
+    K 线数量相同的交易对堆叠成一个矩阵一起计算（通常同一周期的请求 limit 相同，只有一组）。
+    不截断较长的序列，因此每个交易对的结果与单独调用 calculate_indicators 相同。
+
+    Args:
+        klines_by_symbol: {交易对: OKX K 线列表（按时间正序）}
+
+    Returns:
+        {交易对: 指标字典}，顺序与输入相同
+    """
+    groups: Dict[int, List[str]] = {}
+    for symbol, klines in klines_by_symbol.items():
+        groups.setdefault(len(klines), []).append(symbol)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for length, symbols in groups.items():
+        if length == 0:
+            results.update({symbol: {} for symbol in symbols})
+            continue
+        ohlcv = np.array([[row[1:6] for row in klines_by_symbol[symbol]] for symbol in symbols],
+                         dtype=np.float64)
+        results.update(calculate_indicators_batch(ohlcv[:, :, 1], ohlcv[:, :, 2], ohlcv[:, :, 3],
+                                                  ohlcv[:, :, 4], symbols=symbols))
+    return {symbol: results[symbol] for symbol in klines_by_symbol}
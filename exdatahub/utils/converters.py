@@ -0,0 +1,185 @@
+"""
+交易对 / K 线周期在各交易所写法之间的转换
+
+统一写法（内部使用）：
+    交易对：Instrument(base, quote, kind)，kind 为 swap（永续）或 spot
+    周期：OKX 写法，如 1m、15m、1H、4H、1D、1W、1M（另有 OKX 的 1Dutc 等 UTC 对齐写法）
+
+各交易所写法：
+    交易对  OKX BTC-USDT-SWAP / BTC-USDT，Binance U 本位 BTCUSDT，Bybit linear BTCUSDT
+    周期    OKX 1H，Binance 1h，Bybit 60
+
+周期对照表在导入时一次性生成；转换结果按输入缓存，重复查询只是一次字典查找。
+
+用法：
+    to_exchange_symbol("binance", "BTC-USDT-SWAP")   # BTCUSDT
+    to_exchange_symbol("okx", "BTCUSDT")             # BTC-USDT-SWAP
+    index_symbol("okx", "BTC-USDT-SWAP")             # BTC-USDT
+    to_exchange_interval("bybit", "1H")              # 60
+    normalize_interval("1h")                         # 1H
+"""
+import functools
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+EXCHANGES = ("okx", "binance", "bybit")
+
+SWAP = "swap"
+SPOT = "spot"
+
+# 无分隔符写法（BTCUSDT）按计价币后缀拆分，较长的后缀优先匹配
+QUOTES = ("FDUSD", "USDT", "USDC", "BUSD", "USD")
+
+
+@dataclass(frozen=True)
+class Instrument:
+    """交易所无关的交易对"""
+    base: str
+    quote: str
+    kind: str = SWAP
+
+    @property
+    def key(self) -> str:
+        """统一写法，如 BTC-USDT-SWAP / BTC-USDT（与 OKX 相同）"""
+        return f"{self.base}-{self.quote}-SWAP" if self.kind == SWAP else f"{self.base}-{self.quote}"
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_symbol(symbol: str) -> Instrument:
+    """
+    解析任意交易所写法的交易对
+
+    支持 BTC-USDT-SWAP、BTC-USDT、BTCUSDT（视为永续，与 Binance / Bybit 合约一致）、
+    BTC/USDT:USDT（ccxt 永续写法）与 BTC/USDT
+
+    Raises:
+        ValueError: 无法识别的写法
+    """
+    value = symbol.strip().upper()
+    if value.endswith("-SWAP"):
+        parts = value[:-len("-SWAP")].split("-")
+        if len(parts) == 2 and all(parts):
+            return Instrument(parts[0], parts[1], SWAP)
+    elif "/" in value:
+        pair, _, settle = value.partition(":")
+        base, _, quote = pair.partition("/")
+        if base and quote:
+            return Instrument(base, quote, SWAP if settle else SPOT)
+    elif "-" in value:
+        parts = value.split("-")
+        if len(parts) == 2 and all(parts):
+            return Instrument(parts[0], parts[1], SPOT)
+    else:
+        for quote in QUOTES:
+            if value.endswith(quote) and len(value) > len(quote):
+                return Instrument(value[:-len(quote)], quote, SWAP)
+    raise ValueError(f"Unrecognized symbol '{symbol}'")
+
+
+def _check_exchange(exchange: str) -> str:
+    exchange = exchange.lower()
+    if exchange not in EXCHANGES:
+        raise ValueError(f"Exchange '{exchange}' not supported.")
+    return exchange
+
+
+@functools.lru_cache(maxsize=4096)
+def to_exchange_symbol(exchange: str, symbol: str) -> str:
+    """
+    转换为交易所的交易对写法
+
+    Binance / Bybit 客户端只对接合约，现货写法（BTC-USDT）同样映射为 BTCUSDT
+    """
+    exchange = _check_exchange(exchange)
+    instrument = parse_symbol(symbol)
+    if exchange == "okx":
+        return instrument.key
+    return f"{instrument.base}{instrument.quote}"
+
+
+@functools.lru_cache(maxsize=4096)
+def index_symbol(exchange: str, symbol: str) -> str:
+    """
+    查询指数价使用的交易对
+
+    OKX 指数按币对查询，取 instId 的前两段（BTC-USDT-SWAP / BTC-USD-240329 -> BTC-USDT / BTC-USD），
+    无分隔符写法先转换；Binance / Bybit 的指数价随合约行情返回，使用合约本身的交易对
+    """
+    exchange = _check_exchange(exchange)
+    if exchange == "okx":
+        if "-" not in symbol:
+            symbol = to_exchange_symbol("okx", symbol)
+        return "-".join(symbol.split("-")[:2])
+    return to_exchange_symbol(exchange, symbol)
+
+
+# 统一周期 -> 交易所周期（只列出交易所支持的周期）
+INTERVALS: Dict[str, Dict[str, str]] = {
+    "okx": {b: b for b in ("1m", "3m", "5m", "15m", "30m", "1H", "2H", "4H", "6H", "12H",
+                           "1D", "2D", "3D", "1W", "1M", "3M")},
+    "binance": {"1m": "1m", "3m": "3m", "5m": "5m", "15m": "15m", "30m": "30m", "1H": "1h", "2H": "2h",
+                "4H": "4h", "6H": "6h", "8H": "8h", "12H": "12h", "1D": "1d", "3D": "3d", "1W": "1w",
+                "1M": "1M"},
+    "bybit": {"1m": "1", "3m": "3", "5m": "5", "15m": "15", "30m": "30", "1H": "60", "2H": "120",
+              "4H": "240", "6H": "360", "12H": "720", "1D": "D", "1W": "W", "1M": "M"},
+}
+
+# 交易所周期 -> 统一周期
+_FROM_EXCHANGE: Dict[str, Dict[str, str]] = {
+    exchange: {native: bar for bar, native in table.items()} for exchange, table in INTERVALS.items()
+}
+
+# 任意写法 -> 统一周期。Bybit 的纯数字写法（60）也可识别；1m（分钟）与 1M（月）区分大小写
+_INTERVAL_ALIASES: Dict[str, str] = {}
+for _table in _FROM_EXCHANGE.values():
+    _INTERVAL_ALIASES.update(_table)
+_INTERVAL_ALIASES.update({bar: bar for table in INTERVALS.values() for bar in table})
+
+
+def _split_utc(bar: str) -> Tuple[str, str]:
+    return (bar[:-3], "utc") if bar.endswith("utc") else (bar, "")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_interval(interval: str) -> str:
+    """
+    任意写法的周期 -> 统一写法（1h -> 1H，60 -> 1H，D -> 1D；OKX 的 utc 后缀保留）
+
+    Raises:
+        ValueError: 无法识别的周期
+    """
+    core, utc = _split_utc(interval.strip())
+    try:
+        return _INTERVAL_ALIASES[core] + utc
+    except KeyError:
+        raise ValueError(f"Unrecognized interval '{interval}'") from None
+
+
+@functools.lru_cache(maxsize=1024)
+def to_exchange_interval(exchange: str, interval: str) -> str:
+    """
+    转换为交易所的周期写法
+
+    Binance / Bybit 的周期都按 UTC 对齐，utc 后缀只对 OKX 有意义，其余交易所忽略
+
+    Raises:
+        ValueError: 周期无法识别，或该交易所不支持
+    """
+    exchange = _check_exchange(exchange)
+    bar = normalize_interval(interval)
+    core, utc = _split_utc(bar)
+    try:
+        native = INTERVALS[exchange][core]
+    except KeyError:
+        raise ValueError(f"Exchange '{exchange}' has no '{interval}' interval") from None
+    return native + utc if exchange == "okx" else native
+
+
+def from_exchange_interval(exchange: str, interval: str) -> str:
+    """交易所周期写法 -> 统一写法（如 bybit 的 60 -> 1H）"""
+    exchange = _check_exchange(exchange)
+    core, utc = _split_utc(interval)
+    try:
+        return _FROM_EXCHANGE[exchange][core] + utc
+    except KeyError:
+        raise ValueError(f"Exchange '{exchange}' has no '{interval}' interval") from None
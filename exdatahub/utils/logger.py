@@ -0,0 +1,29 @@
+"""
+日志工具
+所有模块通过 get_logger 获取 exdatahub.* 命名空间下的 logger，输出到 stderr
+（stdout 留给 JSON 输出）
+"""
+import logging
+import sys
+
+_configured = False
+
+
+def _configure():
+    global _configured
+    if _configured:
+        return
+    from exdatahub.config.settings import settings
+
+    root = logging.getLogger("exdatahub")
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """获取 logger（首次调用时按 LOG_LEVEL 初始化）"""
+    _configure()
+    return logging.getLogger(name)
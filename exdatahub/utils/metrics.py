@@ -0,0 +1,54 @@
+"""
+进程内指标计数器
+线程安全，按名称 + 标签聚合，供重试、缓存命中等埋点使用
+"""
+import threading
+from typing import Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """简单计数器注册表"""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """计数器累加"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def get(self, name: str, **labels) -> float:
+        """
+        读取计数
+
+        不传标签时返回该指标所有标签组合的总和
+        """
+        with self._lock:
+            series = self._counters.get(name, {})
+            if not labels:
+                return sum(series.values())
+            return series.get(self._key(labels), 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """导出所有计数器：{name: {"k=v,k=v": value}}"""
+        with self._lock:
+            return {
+                name: {",".join(f"{k}={v}" for k, v in key): value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = Metrics()
@@ -1,11 +1,12 @@
 import os
-import json
 import datetime
 import random
 import string
 from pathlib import Path
 from typing import Dict, Any
 
+from exdatahub.utils.serialization import dumps, dumps_bytes
+
 class OutputHandler:
     """输出处理器"""
     
@@ -24,7 +25,8 @@ class OutputHandler:
         return f"{timestamp}_{random_str}.json"
     
     @staticmethod
-    def save_to_file(data: Dict[str, Any], directory: str = "output", filename: str = None) -> str:
+    def save_to_file(data: Dict[str, Any], directory: str = "output", filename: str = None,
+                     compact: bool = False) -> str:
         """
         保存数据到 JSON 文件
         
@@ -32,6 +34,7 @@ class OutputHandler:
             data: 要保存的数据
             directory: 输出目录
             filename: 文件名（如果为 None 则自动生成）
+            compact: 紧凑输出（不缩进），文件更小、写入更快
         
         Returns:
             保存的文件路径
@@ -48,13 +51,14 @@ class OutputHandler:
         filepath = output_dir / filename
         
         # 写入文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(dumps_bytes(data, compact=compact))
         
         return str(filepath)
     
     @staticmethod
-    def output(data: Dict[str, Any], mode: str = "console", directory: str = "output") -> str:
+    def output(data: Dict[str, Any], mode: str = "console", directory: str = "output",
+               compact: bool = False) -> str:
         """
         统一输出接口
         
@@ -62,15 +66,16 @@ class OutputHandler:
             data: 数据
             mode: 输出模式 (console 或 file)
             directory: 文件输出目录
+            compact: 紧凑输出（不缩进）
         
         Returns:
             如果是 file 模式，返回文件路径；否则返回空字符串
         """
         if mode == "file":
-            filepath = OutputHandler.save_to_file(data, directory)
+            filepath = OutputHandler.save_to_file(data, directory, compact=compact)
             print(f"✅ Data saved to: {filepath}")
             return filepath
         else:
             # console 模式
-            print(json.dumps(data, indent=2, ensure_ascii=False))
+            print(dumps(data, compact=compact))
             return ""
@@ -0,0 +1,164 @@
+"""
+JSON 序列化层
+优先使用 orjson，其次 msgspec，都未安装时退回标准库 json；三者输出的 JSON 内容一致。
+
+用法：
+    from exdatahub.utils.serialization import loads, dumps, decode
+    data = loads(response.content)
+    text = dumps(result, compact=True)
+    ticker = decode(response.content, Ticker)
+"""
+import json
+from typing import Any, Callable, Optional, Type, TypeVar, Union
+
+T = TypeVar("T")
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class Serializer:
+    """
+    JSON 编解码后端
+
+    Args:
+        name: 后端名称
+        loads: bytes / str -> 对象
+        dumps: (对象, indent) -> bytes（UTF-8，不转义非 ASCII 字符）
+    """
+
+    def __init__(self, name: str, loads: Callable[[Union[bytes, str]], Any],
+                 dumps: Callable[[Any, bool], bytes]):
+        self.name = name
+        self._loads = loads
+        self._dumps = dumps
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """解析 JSON，格式错误时统一抛出 ValueError"""
+        return self._loads(data)
+
+    def dumps_bytes(self, obj: Any, compact: bool = False) -> bytes:
+        """编码为 UTF-8 JSON（compact=False 时缩进 2 格）"""
+        return self._dumps(obj, not compact)
+
+    def dumps(self, obj: Any, compact: bool = False) -> str:
+        return self.dumps_bytes(obj, compact).decode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"Serializer({self.name!r})"
+
+
+def _default(obj: Any) -> Any:
+    # numpy 标量 / 数组（如指标结果）
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_serializer() -> Serializer:
+    def dumps(obj: Any, indent: bool) -> bytes:
+        if indent:
+            text = json.dumps(obj, indent=2, ensure_ascii=False, default=_default)
+        else:
+            text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default)
+        return text.encode("utf-8")
+
+    return Serializer("json", json.loads, dumps)
+
+
+def _orjson_serializer() -> Serializer:
+    import orjson
+
+    base = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any, indent: bool) -> bytes:
+        return orjson.dumps(obj, default=_default, option=(base | orjson.OPT_INDENT_2) if indent else base)
+
+    # orjson.JSONDecodeError 是 ValueError 的子类
+    return Serializer("orjson", orjson.loads, dumps)
+
+
+def _msgspec_serializer() -> Serializer:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(obj: Any, indent: bool) -> bytes:
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if indent else data
+
+    return Serializer("msgspec", loads, dumps)
+
+
+_FACTORIES = {
+    "orjson": _orjson_serializer,
+    "msgspec": _msgspec_serializer,
+    "json": _json_serializer,
+}
+
+_serializer: Optional[Serializer] = None
+
+
+def create_serializer(backend: str = "auto") -> Serializer:
+    """
+    创建指定后端的序列化器
+
+    Args:
+        backend: orjson / msgspec / json，或 auto（按此顺序选第一个可用的）
+
+    Raises:
+        ValueError: 未知后端
+        ImportError: 指定的后端未安装
+    """
+    if backend == "auto":
+        for name in BACKENDS:
+            try:
+                return _FACTORIES[name]()
+            except ImportError:
+                continue
+    if backend not in _FACTORIES:
+        raise ValueError(f"Unknown JSON backend '{backend}', expected one of: auto, {', '.join(BACKENDS)}")
+    return _FACTORIES[backend]()
+
+
+def get_serializer() -> Serializer:
+    """当前全局序列化器（首次调用时自动选择）"""
+    global _serializer
+    if _serializer is None:
+        _serializer = create_serializer("auto")
+    return _serializer
+
+
+def set_backend(backend: str = "auto") -> Serializer:
+    """切换全局序列化后端"""
+    global _serializer
+    _serializer = create_serializer(backend)
+    return _serializer
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    return get_serializer().loads(data)
+
+
+def dumps(obj: Any, compact: bool = False) -> str:
+    return get_serializer().dumps(obj, compact)
+
+
+def dumps_bytes(obj: Any, compact: bool = False) -> bytes:
+    return get_serializer().dumps_bytes(obj, compact)
+
+
+def decode(data: Union[bytes, str], model: Type[T]) -> T:
+    """
+    解析 JSON 并直接构造类型化模型（core.models 中带 from_okx 的类）
+
+    Example:
+        ticker = decode(response.content, Ticker)
+    """
+    return model.from_okx(loads(data))
@@ -0,0 +1,104 @@
+"""
+时间工具
+K 线周期换算、周期边界（收盘时间）计算
+"""
+import calendar
+import datetime
+import time
+from typing import Optional
+
+_UNIT_SECONDS = {"s": 1, "m": 60, "H": 3600, "D": 86400, "W": 7 * 86400}
+
+# OKX 6H 及以上周期默认按香港时间（UTC+8）对齐，带 utc 后缀的按 UTC 对齐
+OKX_DEFAULT_OFFSET = 8 * 3600
+_HK_ALIGNED_UNITS = {"D", "W", "M"}
+
+
+def _split_bar(bar: str):
+    utc = bar.endswith("utc")
+    core = bar[:-3] if utc else bar
+    count, unit = int(core[:-1]), core[-1]
+    if unit == "h":
+        unit = "H"
+    elif unit == "d":
+        unit = "D"
+    elif unit == "w":
+        unit = "W"
+    return count, unit, utc
+
+
+def _bar_offset(count: int, unit: str, utc: bool) -> int:
+    """返回周期对齐使用的时区偏移（秒）"""
+    if utc:
+        return 0
+    if unit in _HK_ALIGNED_UNITS or (unit == "H" and count >= 6):
+        return OKX_DEFAULT_OFFSET
+    return 0
+
+
+def interval_to_seconds(bar: str) -> int:
+    """
+    周期转秒数
+
+    Args:
+        bar: OKX 周期，如 1m, 15m, 1H, 4H, 1D, 1Dutc, 1W（月线按 30 天估算）
+    """
+    count, unit, _ = _split_bar(bar)
+    if unit == "M":
+        return count * 30 * 86400
+    return count * _UNIT_SECONDS[unit]
+
+
+def next_bar_close(bar: str, now: Optional[float] = None) -> float:
+    """
+    计算当前 K 线的收盘时间（即下一根 K 线的开盘时间）
+
+    Args:
+        bar: OKX 周期
+        now: 当前时间戳（秒），默认 time.time()
+
+    Returns:
+        收盘时间戳（秒）
+    """
+    now = time.time() if now is None else now
+    count, unit, utc = _split_bar(bar)
+    offset = _bar_offset(count, unit, utc)
+    local = now + offset
+
+    if unit == "M":
+        # 月线：按自然月对齐
+        dt = datetime.datetime.fromtimestamp(local, tz=datetime.timezone.utc)
+        months = dt.year * 12 + (dt.month - 1)
+        next_months = (months // count + 1) * count
+        year, month = divmod(next_months, 12)
+        boundary = calendar.timegm((year, month + 1, 1, 0, 0, 0))
+        return boundary - offset
+
+    seconds = interval_to_seconds(bar)
+    if unit == "W":
+        # 周线从周一开始，1970-01-01 是周四
+        local += 3 * 86400
+        return (local // seconds + 1) * seconds - 3 * 86400 - offset
+    return (local // seconds + 1) * seconds - offset
+
+
+def seconds_until_bar_close(bar: str, now: Optional[float] = None) -> float:
+    """距离当前 K 线收盘的秒数"""
+    now = time.time() if now is None else now
+    return next_bar_close(bar, now) - now
+
+
+def parse_time_ms(value: str) -> int:
+    """
+    解析时间为毫秒时间戳（UTC）
+
+    Args:
+        value: 毫秒时间戳，或 ISO 日期 / 时间（如 2024-01-01、2024-01-01T08:00，无时区时按 UTC）
+    """
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    dt = datetime.datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp() * 1000)
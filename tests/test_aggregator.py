@@ -0,0 +1,232 @@
+"""
+AggregatorService 测试（使用模拟客户端，不访问外网）
+"""
+import asyncio
+import random
+import time
+
+import pytest
+
+from exdatahub.core.orderbook import L2Book
+from exdatahub.services.aggregator import AggregatorService
+
+LATENCY = 0.1
+
+
+def make_klines(count=250, seed=1):
+    """生成 OKX 格式的 K 线（最新在前）"""
+    rng = random.Random(seed)
+    rows = []
+    price = 100.0
+    for i in range(count):
+        open_ = price
+        price += rng.uniform(-1, 1)
+        high = max(open_, price) + rng.random()
+        low = min(open_, price) - rng.random()
+        rows.append([str(1700000000000 + i * 60000), str(open_), str(high), str(low), str(price),
+                     str(rng.uniform(1, 100)), "0", "0", "1"])
+    rows.reverse()
+    return rows
+
+
+class FakeOKXClient:
+    """模拟 OKXClient：每次调用固定延迟，返回 OKX 格式数据"""
+
+    def __init__(self, latency=LATENCY):
+        self.latency = latency
+        self.calls = []
+
+    def _respond(self, name, data):
+        self.calls.append(name)
+        time.sleep(self.latency)
+        return {"code": "0", "msg": "", "data": data}
+
+    def fetch_klines(self, symbol, interval, limit=100, after=None, before=None):
+        return self._respond("klines", make_klines())
+
+    def fetch_funding_rate(self, symbol):
+        return self._respond("funding", [{"fundingRate": "0.0001", "nextFundingRate": "0.0002",
+                                          "nextFundingTime": "1700000000000"}])
+
+    def fetch_funding_rate_history(self, symbol, limit=24):
+        return self._respond("funding_history", [{"fundingTime": str(i), "fundingRate": "0.0001"}
+                                                 for i in range(limit)])
+
+    def fetch_open_interest(self, symbol):
+        return self._respond("oi", [{"oi": "1000", "oiCcy": "10", "ts": "1700000000000"}])
+
+    def fetch_oi_history(self, symbol, period="5m", limit=24):
+        return self._respond("oi_history", [{"ts": str(i), "oi": "900"} for i in range(limit)])
+
+    def fetch_mark_price(self, symbol):
+        return self._respond("mark", [{"markPx": "100.5", "ts": "1700000000000"}])
+
+    def fetch_index_tickers(self, symbol):
+        return self._respond("index", [{"idxPx": "100.0"}])
+
+
+def make_service(client=None):
+    service = AggregatorService("okx")
+    service.client = client or FakeOKXClient()
+    return service
+
+
+def test_async_matches_sync():
+    """测试异步分析结果与同步版本一致"""
+    service = make_service()
+    frames = ["1m", "5m"]
+
+    sync_result = service.analyze_market("BTC-USDT-SWAP", frames)
+    async_result = asyncio.run(service.analyze_market_async("BTC-USDT-SWAP", frames))
+    service.close()
+
+    assert async_result == sync_result
+    assert async_result["derivatives"]["price"]["basis"] == 0.5
+
+
+def test_async_requests_run_concurrently():
+    """测试异步版本所有请求并发执行（耗时约为一次往返）"""
+    service = make_service()
+
+    start = time.perf_counter()
+    result = asyncio.run(service.analyze_market_async("BTC-USDT-SWAP", ["1m", "5m", "15m"]))
+    elapsed = time.perf_counter() - start
+    service.close()
+
+    assert set(result["klines"]) == {"1m", "5m", "15m"}
+    assert elapsed < LATENCY * 3
+
+
+def test_async_errors_are_isolated():
+    """测试单个请求失败只影响对应字段"""
+    client = FakeOKXClient(latency=0)
+
+    def broken(symbol):
+        raise RuntimeError("boom")
+
+    client.fetch_open_interest = broken
+    service = make_service(client)
+    result = asyncio.run(service.analyze_market_async("BTC-USDT-SWAP", ["1m"]))
+    service.close()
+
+    assert result["derivatives"]["oi"] == {"error": "boom"}
+    assert "current" in result["derivatives"]["funding_rate"]
+    assert "indicators" in result["klines"]["1m"]
+
+
+def test_analyze_many_streams_results():
+    """测试批量分析按完成顺序逐个返回结果"""
+    service = make_service(FakeOKXClient(latency=0.01))
+    symbols = [f"SYM{i}-USDT-SWAP" for i in range(6)]
+
+    async def collect():
+        return [item async for item in service.analyze_many_async(symbols, ["1m"], concurrency=2)]
+
+    results = asyncio.run(collect())
+    service.close()
+
+    assert sorted(symbol for symbol, _ in results) == sorted(symbols)
+    for symbol, result in results:
+        assert result["symbol"] == symbol
+        assert "indicators" in result["klines"]["1m"]
+
+
+
+def test_analyze_many_batches_numpy_indicators(monkeypatch):
+    """测试 numpy 后端的批量分析按批一次计算每个周期的指标，结果与逐个计算相同"""
+    from exdatahub.services.analysis import AnalysisService
+
+    client = FakeOKXClient(latency=0)
+    client.fetch_klines = lambda symbol, interval, limit=100, after=None, before=None: client._respond(
+        "klines", make_klines(seed=int(symbol[3])))
+    service = make_service(client)
+    service.indicator_backend = "numpy"
+    symbols = [f"SYM{i}-USDT-SWAP" for i in range(5)]
+
+    batches = []
+    calculate_many = AnalysisService.calculate_indicators_many
+    monkeypatch.setattr(AnalysisService, "calculate_indicators_many",
+                        staticmethod(lambda klines: batches.append(list(klines)) or calculate_many(klines)))
+
+    async def collect():
+        return dict([item async for item in service.analyze_many_async(symbols, ["1m", "5m"], concurrency=3)])
+
+    results = asyncio.run(collect())
+    service.close()
+
+    # 两批（3 + 2 个交易对），每批每个周期一次
+    assert [len(batch) for batch in batches] == [3, 3, 2, 2]
+    for i, symbol in enumerate(symbols):
+        expected = AnalysisService.calculate_indicators(make_klines(seed=i)[::-1], backend="numpy")
+        assert results[symbol]["klines"]["5m"]["indicators"] == expected
+        assert "current" in results[symbol]["derivatives"]["funding_rate"]
+
+
+def test_refresh_parts():
+    """测试按部分刷新：只请求指定的部分，价格先于持仓量刷新，未传入结果时从空结果开始"""
+    client = FakeOKXClient(latency=0)
+    service = make_service(client)
+
+    result = service.refresh_parts("BTC-USDT-SWAP", ["oi", "1m", "price"])
+    service.refresh_parts("BTC-USDT-SWAP", ["funding"], result)
+    service.close()
+
+    assert client.calls == ["klines", "mark", "index", "oi", "funding"]
+    assert set(result["klines"]) == {"1m"}
+    assert set(result["derivatives"]) == {"price", "oi", "funding_rate"}
+    assert service.refresh_parts("ETH-USDT-SWAP") == {"symbol": "ETH-USDT-SWAP", "timestamp": None,
+                                                       "klines": {}, "derivatives": {}}
+
+
+class FakeFeed:
+    """模拟 OKXWebSocketFeed：所有频道都有实时数据，连接代数固定"""
+
+    def __init__(self, generation=1):
+        self.generation = generation
+        self.items = {
+            "funding-rate": {"fundingRate": "0.0003", "nextFundingRate": "", "nextFundingTime": "1700000000000"},
+            "open-interest": {"oi": "2000", "oiCcy": "20", "ts": "1700000000000"},
+            "mark-price": {"markPx": "101", "ts": "1700000000000"},
+            "index-tickers": {"idxPx": "100"},
+        }
+
+    def get(self, channel, inst_id, max_age=None):
+        return self.items.get(channel)
+
+    def live_generation(self, channel, inst_id):
+        return self.generation if channel.startswith("candle") else None
+
+    def book(self, inst_id, channel="books"):
+        return L2Book.from_okx({"asks": [["100.1", "2", "0", "1"], ["101", "5", "0", "1"]],
+                                "bids": [["99.9", "3", "0", "1"], ["99", "7", "0", "1"]],
+                                "ts": "1700000000000"}, inst_id)
+
+    def stop(self):
+        pass
+
+
+def test_live_feed_replaces_rest_polling():
+    """测试 WebSocket 快照可用时，衍生品数据与已同步的 K 线不再走 REST"""
+    client = FakeOKXClient(latency=0)
+    service = make_service(client)
+    service.feed = FakeFeed()
+
+    first = service.analyze_market("BTC-USDT-SWAP", frames=["1m", "5m"])
+    assert first["derivatives"]["funding_rate"]["current"] == "0.0003"
+    assert first["derivatives"]["oi"]["value"] == "2000"
+    assert first["orderbook"]["spread_bps"] == pytest.approx(20)
+    # 中间价 ±0.5% 范围内只有买一 / 卖一
+    assert (first["orderbook"]["bid_depth"], first["orderbook"]["ask_depth"]) == (3.0, 2.0)
+    assert client.calls.count("klines") == 2  # 首次仍需 REST 补齐历史
+    assert not {"funding", "oi", "mark", "index"} & set(client.calls)
+
+    client.calls.clear()
+    second = service.analyze_market("BTC-USDT-SWAP", frames=["1m", "5m"])
+    assert "klines" not in client.calls
+    assert second["klines"]["1m"]["indicators"] == first["klines"]["1m"]["indicators"]
+
+    # 重连后（代数变化）重新用 REST 补齐一次
+    service.feed.generation = 2
+    asyncio.run(service.analyze_market_async("BTC-USDT-SWAP", frames=["1m", "5m"]))
+    assert client.calls.count("klines") == 2
+    assert not {"funding", "oi", "mark", "index"} & set(client.calls)
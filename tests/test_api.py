@@ -0,0 +1,131 @@
+"""
+本地 HTTP 接口测试（快照 / K 线 / 指标 / 衍生品接口、ETag 与 304）
+"""
+import json
+
+import pytest
+import requests
+
+from exdatahub.services.api import SnapshotAPI, etag_matches
+
+SNAPSHOT = {
+    "symbol": "BTC-USDT-SWAP",
+    "timestamp": "1700000000000",
+    "updated_at": 1700000001000,
+    "klines": {
+        "1m": {"data": [["1700000000000", "1", "2", "0.5", "1.5", "10"]],
+               "indicators": {"trend": {"ema_9": 1.2}}, "summary": {"trend_label": "上涨"}},
+        "1H": {"error": "timeout"},
+    },
+    "derivatives": {"funding_rate": {"current": "0.0001"}},
+}
+
+
+class StubWatch:
+    def __init__(self):
+        self.symbols = ["BTC-USDT-SWAP", "ETH-USDT-SWAP"]
+        self.data = {"BTC-USDT-SWAP": SNAPSHOT}
+
+    def snapshot(self, symbol):
+        return self.data.get(symbol)
+
+
+@pytest.fixture
+def api():
+    server = SnapshotAPI(StubWatch(), port=0).start()
+    yield server
+    server.stop()
+
+
+def test_views(api):
+    """测试各接口返回快照中对应的部分"""
+    snapshot = requests.get(f"{api.url}/snapshot/BTC-USDT-SWAP").json()
+    klines = requests.get(f"{api.url}/klines/BTC-USDT-SWAP").json()
+    indicators = requests.get(f"{api.url}/indicators/BTC-USDT-SWAP", params={"frame": "1m"}).json()
+    derivatives = requests.get(f"{api.url}/derivatives/BTC-USDT-SWAP").json()
+
+    assert snapshot == SNAPSHOT
+    assert klines["klines"] == {"1m": SNAPSHOT["klines"]["1m"]["data"], "1H": {"error": "timeout"}}
+    assert indicators["indicators"] == {"1m": {"indicators": {"trend": {"ema_9": 1.2}},
+                                               "summary": {"trend_label": "上涨"}}}
+    assert indicators["updated_at"] == 1700000001000
+    assert derivatives["derivatives"] == SNAPSHOT["derivatives"]
+
+
+def test_etag_not_modified(api):
+    """测试 If-None-Match 命中时返回 304 且无正文，快照更新后返回新内容"""
+    first = requests.get(f"{api.url}/snapshot/BTC-USDT-SWAP")
+    etag = first.headers["ETag"]
+
+    cached = requests.get(f"{api.url}/snapshot/BTC-USDT-SWAP", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    api.watch.data["BTC-USDT-SWAP"] = dict(SNAPSHOT, updated_at=1700000002000)
+    fresh = requests.get(f"{api.url}/snapshot/BTC-USDT-SWAP", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert fresh.json()["updated_at"] == 1700000002000
+
+
+def test_price_publish_keeps_klines_etag(api):
+    """测试只刷新价格的发布（updated_at 与衍生品变化）不改变 /klines 与 /indicators 的 ETag"""
+    klines = requests.get(f"{api.url}/klines/BTC-USDT-SWAP")
+    indicators = requests.get(f"{api.url}/indicators/BTC-USDT-SWAP")
+    derivatives = requests.get(f"{api.url}/derivatives/BTC-USDT-SWAP")
+
+    api.watch.data["BTC-USDT-SWAP"] = dict(SNAPSHOT, updated_at=1700000006000,
+                                           derivatives={"funding_rate": {"current": "0.0002"}})
+    for response, path in ((klines, "klines"), (indicators, "indicators")):
+        cached = requests.get(f"{api.url}/{path}/BTC-USDT-SWAP", headers={"If-None-Match": response.headers["ETag"]})
+        assert cached.status_code == 304, path
+    fresh = requests.get(f"{api.url}/derivatives/BTC-USDT-SWAP",
+                         headers={"If-None-Match": derivatives.headers["ETag"]})
+    assert fresh.status_code == 200
+    assert fresh.json()["updated_at"] == 1700000006000
+
+
+def test_encoded_body_is_reused(api):
+    """测试同一快照只编码一次"""
+    body, etag = api.render("BTC-USDT-SWAP", "snapshot", None)
+
+    assert api.render("BTC-USDT-SWAP", "snapshot", None)[0] is body
+    assert json.loads(body) == SNAPSHOT
+
+
+def test_errors(api):
+    """测试未监控的交易对 404，尚未完成首次分析 503"""
+    assert requests.get(f"{api.url}/snapshot/DOGE-USDT").status_code == 404
+    assert requests.get(f"{api.url}/unknown/BTC-USDT-SWAP").status_code == 404
+    pending = requests.get(f"{api.url}/snapshot/ETH-USDT-SWAP")
+    assert pending.status_code == 503
+    assert pending.headers["Retry-After"] == "1"
+    assert requests.get(f"{api.url}/health").json() == {"status": "ok", "symbols": 2, "ready": 1}
+    assert requests.get(f"{api.url}/symbols").json() == ["BTC-USDT-SWAP", "ETH-USDT-SWAP"]
+
+
+def test_keep_alive_session(api):
+    """测试同一连接上连续请求（HTTP/1.1 keep-alive）"""
+    with requests.Session() as session:
+        responses = [session.get(f"{api.url}/derivatives/BTC-USDT-SWAP") for _ in range(5)]
+
+    assert all(r.status_code == 200 for r in responses)
+
+
+def test_etag_matching():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches(None, '"b"')
+    assert not etag_matches('"a"', '"b"')
+
+
+def test_cli_commands_are_registered():
+    """测试 serve / watch 与 analyze 子命令都已注册"""
+    from click.testing import CliRunner
+    from exdatahub.cli.main import cli
+
+    for command in ("analyze", "watch", "serve"):
+        result = CliRunner().invoke(cli, [command, "--help"])
+        assert result.exit_code == 0, command
@@ -0,0 +1,113 @@
+"""
+历史 K 线回补测试（窗口切分、并行翻页、去重、断点续传）
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from exdatahub.core.exceptions import APIError
+from exdatahub.services.backfill import BackfillService, split_windows
+from exdatahub.services.export import DAY_MS, ExportService
+from exdatahub.utils.time_utils import parse_time_ms
+
+START = parse_time_ms("2024-01-01")
+MINUTE = 60_000
+
+
+class HistoryClient:
+    """模拟 history-candles：after 取更早的数据，before 取更新的数据，最新在前"""
+
+    def __init__(self, start, count, step=MINUTE, fail_after=None, delay=0.0):
+        self.ts = [start + i * step for i in range(count)]
+        self.fail_after = fail_after
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def fetch_history_klines(self, symbol, interval, limit=100, after=None, before=None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            calls = self.calls
+        try:
+            time.sleep(self.delay)
+            if self.fail_after is not None and calls > self.fail_after:
+                raise APIError("OKX API Error: Systems are busy", code="50013")
+            rows = [ts for ts in reversed(self.ts)
+                    if (after is None or ts < int(after)) and (before is None or ts > int(before))]
+            data = [[str(ts), "1", "2", "0.5", "1.5", "10", "0", "0", "1"] for ts in rows[:limit]]
+            return {"code": "0", "msg": "", "data": data}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_parse_time_ms():
+    assert parse_time_ms("2024-01-01") == 1704067200000
+    assert parse_time_ms("2024-01-01T08:00+08:00") == 1704067200000
+    assert parse_time_ms("1704067200000") == 1704067200000
+
+
+def test_windows_are_day_aligned_and_cover_range():
+    """测试窗口边界对齐 UTC 日期且连续覆盖整个时间段"""
+    start, end = START + 5 * MINUTE, START + 10 * DAY_MS + 7 * MINUTE
+    windows = split_windows(start, end, workers=2)
+
+    assert windows[0]["start"] == start and windows[-1]["end"] == end
+    assert all(a["end"] == b["start"] for a, b in zip(windows, windows[1:]))
+    assert all(w["start"] % DAY_MS == 0 for w in windows[1:])
+    assert split_windows(end, start, workers=2) == []
+
+
+def test_parallel_backfill_writes_every_bar_once(tmp_path):
+    """测试多个窗口并行翻页，结果完整、有序、无重复"""
+    client = HistoryClient(START, 3 * 1440, delay=0.002)
+    exporter = ExportService(str(tmp_path), fmt="csv")
+
+    rows = BackfillService(client, exporter, workers=4).run("BTC-USDT-SWAP", "1m", START, START + 3 * DAY_MS)
+
+    columns = exporter.read("klines", "BTC-USDT-SWAP", bar="1m")
+    assert rows == 3 * 1440
+    assert columns["ts"].tolist() == client.ts
+    assert client.max_active > 1
+    assert len(list((tmp_path / "klines").rglob("part.csv"))) == 3
+
+
+def test_resume_from_checkpoint(tmp_path):
+    """测试中途失败后重新执行从断点继续，不重复拉取已完成部分"""
+    exporter = ExportService(str(tmp_path), fmt="csv")
+    failing = HistoryClient(START, 2 * 1440, fail_after=20)
+
+    with pytest.raises(APIError):
+        BackfillService(failing, exporter, workers=2, flush_rows=200).run("X", "1m", START, START + 2 * DAY_MS)
+    partial = len(exporter.read("klines", "X", bar="1m")["ts"])
+    assert 0 < partial < 2 * 1440
+
+    healthy = HistoryClient(START, 2 * 1440)
+    rows = BackfillService(healthy, exporter, workers=2).run("X", "1m", START, START + 2 * DAY_MS)
+
+    columns = exporter.read("klines", "X", bar="1m")
+    assert columns["ts"].tolist() == healthy.ts
+    assert np.all(np.diff(columns["ts"]) == MINUTE)
+    assert rows < 2 * 1440
+    assert healthy.calls < 2 * 1440 // 100 + 8
+
+    # 已全部完成：再次执行不发请求
+    again = HistoryClient(START, 2 * 1440)
+    assert BackfillService(again, exporter).run("X", "1m", START, START + 2 * DAY_MS) == 0
+    assert again.calls == 0
+
+
+def test_history_before_listing_stops(tmp_path):
+    """测试时间段早于上市时间时，空页即结束"""
+    client = HistoryClient(START + DAY_MS, 60)
+    exporter = ExportService(str(tmp_path), fmt="csv")
+
+    rows = BackfillService(client, exporter, workers=1).run("X", "1m", START, START + 2 * DAY_MS)
+
+    assert rows == 60
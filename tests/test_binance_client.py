@@ -0,0 +1,229 @@
+"""
+BinanceFuturesClient 单元测试（使用本地 HTTP 服务模拟 Binance U 本位合约接口，不访问外网）
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from exdatahub.core.cache import ResponseCache
+from exdatahub.core.exceptions import APIError
+from exdatahub.core.http import close_transports
+from exdatahub.core.models import FundingRate, KlineSeries, OrderBook
+from exdatahub.exchanges import client_classes
+from exdatahub.exchanges.binance_client import BinanceFuturesClient
+from exdatahub.services.aggregator import AggregatorService
+
+
+def current_minute():
+    """当前分钟的开盘时间（ms），模拟服务按请求时刻生成 K 线"""
+    return int(time.time() * 1000) // 60000 * 60000
+
+
+def kline_rows(count=250):
+    """Binance 格式的 1m K 线（最早在前），最后一根未收盘"""
+    end = current_minute()
+    rows = []
+    for i in range(count):
+        ts = end - (count - 1 - i) * 60000
+        price = 100 + (i % 7)
+        rows.append([ts, str(price), str(price + 1), str(price - 1), str(price + 0.5), "10", ts + 59999,
+                     "1000", 5, "4", "400", "0"])
+    return rows
+
+
+PREMIUM = {"symbol": "BTCUSDT", "markPrice": "100.5", "indexPrice": "100.0", "lastFundingRate": "0.0001",
+           "nextFundingTime": 1700006400000, "time": 1700000000000}
+
+
+def respond(path, query):
+    if path == "/fapi/v1/klines":
+        rows = kline_rows()
+        if "endTime" in query:
+            rows = [r for r in rows if r[0] <= int(query["endTime"])]
+        if "startTime" in query:
+            rows = [r for r in rows if r[0] >= int(query["startTime"])]
+        return 200, rows[-int(query.get("limit", 500)):]
+    if path == "/fapi/v1/premiumIndex":
+        return 200, PREMIUM
+    if path == "/fapi/v1/ticker/24hr":
+        return 200, {"symbol": "BTCUSDT", "lastPrice": "100.5", "lastQty": "1", "openPrice": "99",
+                     "highPrice": "101", "lowPrice": "98", "volume": "10", "quoteVolume": "1000",
+                     "closeTime": 1700000000000}
+    if path == "/fapi/v1/depth":
+        levels = int(query["limit"])
+        return 200, {"lastUpdateId": 1, "E": 1700000000001, "T": 1700000000000,
+                     "bids": [[str(100 - i), "1"] for i in range(levels)],
+                     "asks": [[str(101 + i), "2"] for i in range(levels)]}
+    if path == "/fapi/v1/openInterest":
+        return 200, {"symbol": "BTCUSDT", "openInterest": "1000", "time": 1700000000000}
+    if path == "/fapi/v1/fundingRate":
+        return 200, [{"symbol": "BTCUSDT", "fundingRate": f"0.000{i}", "fundingTime": 1700000000000 + i}
+                     for i in range(int(query.get("limit", 100)))]
+    if path == "/futures/data/openInterestHist":
+        return 200, [{"symbol": "BTCUSDT", "sumOpenInterest": str(900 + i), "sumOpenInterestValue": "1",
+                      "timestamp": 1700000000000 + i} for i in range(int(query["limit"]))]
+    return 400, {"code": -1121, "msg": "Invalid symbol."}
+
+
+class _BinanceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        _BinanceHandler.requests.append((url.path, query))
+        status, payload = respond(url.path, query)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BinanceHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _BinanceHandler.requests = []
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield type("LocalBinanceClient", (BinanceFuturesClient,), {"BASE_URL": base_url})()
+    server.shutdown()
+    close_transports()
+
+
+def test_klines_are_okx_rows(client):
+    """测试 K 线转换为 OKX 格式（最新在前、带 confirm），交易对与周期被转换"""
+    now = current_minute()
+    data = client.fetch_klines("BTC-USDT-SWAP", "1H", limit=5)
+
+    path, query = _BinanceHandler.requests[-1]
+    assert (path, query["symbol"], query["interval"], query["limit"]) == ("/fapi/v1/klines", "BTCUSDT", "1h", "5")
+    rows = data["data"]
+    assert data["code"] == "0" and len(rows) == 5
+    assert int(rows[0][0]) > int(rows[-1][0])
+    assert rows[0][8] == "0" and rows[1][8] == "1"
+    assert rows[1][5:8] == ["10", "10", "1000"]
+    series = KlineSeries.from_okx(data)
+    assert series.ts[-1] == now and not series.confirmed[-1]
+
+
+def test_kline_pagination_follows_okx(client):
+    """测试 after / before 的语义与 OKX 一致"""
+    now = current_minute()
+    older = client.fetch_klines("BTCUSDT", "1m", limit=3, after=str(now - 10 * 60000))
+    newer = client.fetch_klines("BTCUSDT", "1m", limit=100, before=str(now - 3 * 60000))
+    window = client.fetch_history_klines("BTCUSDT", "1m", limit=100, after=str(now),
+                                         before=str(now - 4 * 60000))
+
+    assert [int(r[0]) for r in older["data"]] == [now - i * 60000 for i in (11, 12, 13)]
+    assert [int(r[0]) for r in newer["data"]] == [now - i * 60000 for i in (0, 1, 2)]
+    assert [int(r[0]) for r in window["data"]] == [now - i * 60000 for i in (1, 2, 3)]
+
+
+def test_only_closed_kline_pages_are_cached(client):
+    """测试含未收盘 K 线的页不缓存，已收盘的历史页缓存到周期收盘"""
+    client.cache = ResponseCache()
+    older = str(current_minute() - 10 * 60000)
+    for _ in range(2):
+        client.fetch_klines("BTCUSDT", "1m", limit=5)
+        client.fetch_klines("BTCUSDT", "1m", limit=5, after=older)
+
+    assert len(_BinanceHandler.requests) == 3
+    assert client.cache.stats["hits"] == 1
+
+
+def test_derivatives_are_okx_shaped(client):
+    """测试资金费率、标记价、指数价、持仓量及历史转换为 OKX 字段"""
+    funding = client.fetch_funding_rate("BTC-USDT-SWAP")
+    mark = client.fetch_mark_price("BTCUSDT")["data"][0]
+    index = client.fetch_index_tickers("BTCUSDT")["data"][0]
+    oi = client.fetch_open_interest("BTCUSDT")["data"][0]
+    history = client.fetch_funding_rate_history("BTCUSDT", limit=3, after="1700000000000")
+    oi_history = client.fetch_oi_history("BTCUSDT", period="1H", limit=3)
+
+    assert FundingRate.from_okx(funding).rate == 0.0001
+    assert funding["data"][0]["nextFundingTime"] == "1700006400000"
+    assert (mark["markPx"], index["idxPx"], oi["oi"]) == ("100.5", "100.0", "1000")
+    assert [h["fundingTime"] for h in history["data"]] == ["1700000000002", "1700000000001", "1700000000000"]
+    assert _BinanceHandler.requests[-2][1]["endTime"] == "1699999999999"
+    assert oi_history["data"][0] == {"ts": "1700000000002", "oi": "902", "oiCcy": "902", "oiUsd": "1"}
+    assert _BinanceHandler.requests[-1][1]["period"] == "1h"
+
+
+def test_premium_index_is_shared(client):
+    """测试资金费率、标记价、指数价共用一次 premiumIndex 请求，并发调用只发出一个请求"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    client.premium_max_age = 0.1
+    fetchers = [client.fetch_funding_rate, client.fetch_mark_price, client.fetch_index_tickers] * 4
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+        list(executor.map(lambda fetch: fetch("BTCUSDT"), fetchers))
+    assert [p for p, _ in _BinanceHandler.requests] == ["/fapi/v1/premiumIndex"]
+
+    time.sleep(0.11)
+    client.fetch_mark_price("BTC-USDT-SWAP")
+    assert len(_BinanceHandler.requests) == 2
+
+
+def test_ticker_and_orderbook(client):
+    """测试行情与盘口（深度向上取整到 Binance 支持的档位后截断）"""
+    ticker = client.fetch_ticker("BTCUSDT")["data"][0]
+    book = OrderBook.from_okx(client.fetch_orderbook("BTCUSDT", limit=7))
+
+    assert (ticker["last"], ticker["volCcy24h"]) == ("100.5", "1000")
+    assert _BinanceHandler.requests[-1][1]["limit"] == "10"
+    assert len(book.bid_prices) == 7
+    assert (book.best_bid(), book.best_ask(), book.ts) == (100.0, 101.0, 1700000000000)
+
+
+def test_error_keeps_binance_code(client):
+    """测试 4xx 响应保留 Binance 错误码且不重试"""
+    with pytest.raises(APIError) as excinfo:
+        client._request("GET", "/fapi/v1/unknown")
+
+    assert excinfo.value.code == "-1121"
+    assert "Invalid symbol" in str(excinfo.value)
+    assert len(_BinanceHandler.requests) == 1
+
+
+def test_weight_based_rate_limit(client):
+    """测试按权重计费：K 线权重随 limit 增加，持仓量历史只受独立配额限制"""
+    limiter = client.transport.rate_limiter
+
+    assert limiter.cost("/fapi/v1/klines", {"limit": "99"}) == 1
+    assert limiter.cost("/fapi/v1/klines", {"limit": "300"}) == 2
+    assert limiter.cost("/fapi/v1/klines", {"limit": "1500"}) == 10
+    assert limiter.cost("/fapi/v1/depth", {"limit": "1000"}) == 20
+    assert limiter.cost("/futures/data/openInterestHist", {}) == 0
+    assert limiter.bucket_for("/fapi/v1/klines") is None
+    assert limiter.bucket_for("/fapi/v1/fundingRate") is not None
+
+
+def test_analyze_market_with_binance(client):
+    """测试 AggregatorService 使用 Binance 客户端时 analyze_market 输出结构不变"""
+    service = AggregatorService("binance")
+    service.client = client
+    now = current_minute()
+    result = service.analyze_market("BTCUSDT", ["1m"])
+
+    assert "indicators" in result["klines"]["1m"]
+    assert result["timestamp"] == str(now)
+    assert result["derivatives"]["funding_rate"]["current"] == "0.0001"
+    assert result["derivatives"]["oi"]["value"] == "1000"
+    assert result["derivatives"]["price"]["basis"] == 0.5
+
+
+def test_unknown_exchange():
+    assert client_classes("Binance")[0] is BinanceFuturesClient
+    with pytest.raises(ValueError):
+        AggregatorService("kraken")
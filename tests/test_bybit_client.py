@@ -0,0 +1,219 @@
+"""
+BybitClient 单元测试（使用本地 HTTP 服务模拟 Bybit v5 接口，不访问外网）
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from exdatahub.core.cache import ResponseCache
+from exdatahub.core.exceptions import APIError, RateLimitError
+from exdatahub.core.http import RetryPolicy, close_transports
+from exdatahub.core.models import FundingRate, KlineSeries, OpenInterest, OrderBook, Ticker
+from exdatahub.exchanges.bybit_client import BybitClient
+from exdatahub.services.aggregator import AggregatorService
+
+
+def current_minute():
+    """当前分钟的开盘时间（ms），模拟服务按请求时刻生成 K 线"""
+    return int(time.time() * 1000) // 60000 * 60000
+
+
+SYMBOLS = [f"C{i}USDT" for i in range(20)]
+
+
+def ticker(symbol, i):
+    return {"symbol": symbol, "lastPrice": str(100 + i), "indexPrice": "100.0", "markPrice": "100.5",
+            "prevPrice24h": "99", "highPrice24h": "101", "lowPrice24h": "98", "openInterest": "1000",
+            "openInterestValue": "100500", "turnover24h": "5000", "volume24h": "50", "fundingRate": "0.0001",
+            "nextFundingTime": "1700006400000", "ask1Size": "2", "bid1Price": "100", "ask1Price": "101",
+            "bid1Size": "1"}
+
+
+def kline_list(query):
+    """Bybit 格式的 1m K 线（最新在前），最新一根未收盘"""
+    now = current_minute()
+    rows = [[str(now - i * 60000), "100", "101", "99", "100.5", "10", "1005"] for i in range(300)]
+    if "end" in query:
+        rows = [r for r in rows if int(r[0]) <= int(query["end"])]
+    if "start" in query:
+        rows = [r for r in rows if int(r[0]) >= int(query["start"])]
+    return rows[:int(query.get("limit", 200))]
+
+
+def respond(path, query):
+    if path == "/v5/market/tickers":
+        return {"category": "linear", "list": [ticker(s, i) for i, s in enumerate(SYMBOLS)]}
+    if path == "/v5/market/kline":
+        return {"category": "linear", "symbol": query["symbol"], "list": kline_list(query)}
+    if path == "/v5/market/orderbook":
+        levels = int(query["limit"])
+        return {"s": query["symbol"], "b": [[str(100 - i), "1"] for i in range(levels)],
+                "a": [[str(101 + i), "2"] for i in range(levels)], "ts": 1700000000000, "u": 1}
+    if path == "/v5/market/funding/history":
+        return {"category": "linear", "list": [
+            {"symbol": query["symbol"], "fundingRate": "0.0001", "fundingRateTimestamp": str(1700000000000 - i)}
+            for i in range(int(query["limit"]))]}
+    if path == "/v5/market/open-interest":
+        return {"category": "linear", "symbol": query["symbol"], "list": [
+            {"openInterest": str(1000 - i), "timestamp": str(1700000000000 - i)} for i in range(int(query["limit"]))]}
+    return None
+
+
+class _BybitHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    script = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        _BybitHandler.requests.append((url.path, query))
+        if _BybitHandler.script:
+            payload = _BybitHandler.script.pop(0)
+        else:
+            result = respond(url.path, query)
+            payload = ({"retCode": 0, "retMsg": "OK", "result": result, "time": 1700000000000}
+                       if result is not None else {"retCode": 10001, "retMsg": "params error", "result": {}})
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+    @classmethod
+    def hits(cls, path):
+        return sum(1 for p, _ in cls.requests if p == path)
+
+
+@pytest.fixture
+def client_cls():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BybitHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _BybitHandler.requests = []
+    _BybitHandler.script = []
+    yield type("LocalBybitClient", (BybitClient,), {"BASE_URL": f"http://127.0.0.1:{server.server_address[1]}"})
+    server.shutdown()
+    close_transports()
+
+
+def test_snapshot_serves_every_symbol(client_cls):
+    """测试行情、资金费率、标记价、指数价、持仓量都来自同一次 category 级 tickers 请求"""
+    client = client_cls(tickers_max_age=60)
+
+    for symbol in SYMBOLS:
+        Ticker.from_okx(client.fetch_ticker(symbol))
+        FundingRate.from_okx(client.fetch_funding_rate(symbol))
+        client.fetch_mark_price(symbol)
+        client.fetch_index_tickers(symbol)
+        client.fetch_open_interest(symbol)
+
+    assert _BybitHandler.requests == [("/v5/market/tickers", {"category": "linear"})]
+    ticker = Ticker.from_okx(client.fetch_ticker("C3-USDT-SWAP"))
+    assert (ticker.inst_id, ticker.last, ticker.bid, ticker.ask) == ("C3USDT", 103.0, 100.0, 101.0)
+    assert OpenInterest.from_okx(client.fetch_open_interest("C0USDT")).oi == 1000.0
+    assert client.fetch_mark_price("C0USDT")["data"][0]["markPx"] == "100.5"
+    assert client.fetch_index_tickers("C0USDT")["data"][0]["idxPx"] == "100.0"
+    assert len(client.fetch_tickers()["data"]) == len(SYMBOLS)
+    with pytest.raises(APIError):
+        client.fetch_ticker("NOPEUSDT")
+
+
+def test_snapshot_expires(client_cls):
+    """测试快照过期后重新请求，并发调用只发出一个请求"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    client = client_cls(tickers_max_age=0.05)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(client.fetch_funding_rate, SYMBOLS))
+    assert _BybitHandler.hits("/v5/market/tickers") == 1
+
+    time.sleep(0.06)
+    client.fetch_funding_rate("C0USDT")
+    assert _BybitHandler.hits("/v5/market/tickers") == 2
+
+
+def test_klines_are_okx_rows(client_cls):
+    """测试 K 线转换为 OKX 格式，after / before 语义与 OKX 一致"""
+    client = client_cls()
+    now = current_minute()
+    data = client.fetch_klines("BTC-USDT-SWAP", "1m", limit=3)
+    older = client.fetch_klines("BTCUSDT", "1m", limit=2, after=str(now - 5 * 60000))
+    newer = client.fetch_history_klines("BTCUSDT", "1m", limit=100, after=str(now),
+                                        before=str(now - 3 * 60000))
+
+    assert _BybitHandler.requests[0][1] == {"category": "linear", "symbol": "BTCUSDT", "interval": "1",
+                                            "limit": "3"}
+    assert [row[8] for row in data["data"]] == ["0", "1", "1"]
+    assert data["data"][1][5:8] == ["10", "10", "1005"]
+    assert KlineSeries.from_okx(data).ts[-1] == now
+    assert [int(r[0]) for r in older["data"]] == [now - 6 * 60000, now - 7 * 60000]
+    assert [int(r[0]) for r in newer["data"]] == [now - 60000, now - 2 * 60000]
+
+
+def test_only_closed_kline_pages_are_cached(client_cls):
+    """测试含未收盘 K 线的页不缓存，已收盘的历史页缓存到周期收盘"""
+    client = client_cls(cache=ResponseCache())
+    older = str(current_minute() - 10 * 60000)
+    for _ in range(2):
+        client.fetch_klines("BTCUSDT", "1m", limit=5)
+        client.fetch_klines("BTCUSDT", "1m", limit=5, after=older)
+
+    assert _BybitHandler.hits("/v5/market/kline") == 3
+    assert client.cache.stats["hits"] == 1
+
+
+def test_orderbook_and_history(client_cls):
+    client = client_cls()
+    book = OrderBook.from_okx(client.fetch_orderbook("BTCUSDT", limit=5))
+    funding = client.fetch_funding_rate_history("BTCUSDT", limit=3, after="1700000000000")
+    oi = client.fetch_oi_history("BTCUSDT", period="1H", limit=2)
+
+    assert (book.best_bid(), book.best_ask(), len(book.ask_prices)) == (100.0, 101.0, 5)
+    assert funding["data"][0]["fundingTime"] == "1700000000000"
+    assert _BybitHandler.requests[1][1]["endTime"] == "1699999999999"
+    assert oi["data"][1] == {"ts": "1699999999999", "oi": "999", "oiCcy": "999", "oiUsd": ""}
+    assert _BybitHandler.requests[2][1]["intervalTime"] == "1h"
+
+
+def test_error_codes(client_cls):
+    """测试 retCode 映射：限频错误可重试，参数错误直接失败"""
+    client = client_cls(retry=RetryPolicy(max_attempts=2, backoff_base=0.01))
+    _BybitHandler.script = [{"retCode": 10006, "retMsg": "Too many visits", "result": {}},
+                            {"retCode": 10006, "retMsg": "Too many visits", "result": {}}]
+    with pytest.raises(RateLimitError):
+        client.fetch_orderbook("BTCUSDT")
+    assert len(_BybitHandler.requests) == 2
+
+    with pytest.raises(APIError) as excinfo:
+        client._request("GET", "/v5/market/unknown")
+    assert excinfo.value.code == "10001"
+
+
+def test_batch_analysis_uses_one_tickers_request(client_cls):
+    """测试批量分析时衍生品数据只请求一次 tickers，K 线按交易对请求"""
+    service = AggregatorService("bybit")
+    service.client = client_cls(tickers_max_age=60)
+
+    async def collect():
+        return {symbol: result async for symbol, result in service.analyze_many_async(SYMBOLS, ["1m"])}
+
+    results = asyncio.run(collect())
+    service.close()
+
+    assert _BybitHandler.hits("/v5/market/tickers") == 1
+    assert _BybitHandler.hits("/v5/market/kline") == len(SYMBOLS)
+    derivatives = results["C5USDT"]["derivatives"]
+    assert derivatives["funding_rate"]["current"] == "0.0001"
+    assert derivatives["oi"]["value"] == "1000"
+    assert derivatives["price"]["basis"] == 0.5
+    assert "indicators" in results["C5USDT"]["klines"]["1m"]
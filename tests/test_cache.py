@@ -0,0 +1,99 @@
+"""
+响应缓存测试
+"""
+import time
+
+from exdatahub.core.cache import ResponseCache, TTLCache
+from exdatahub.exchanges.okx_client import OKXClient, okx_cache_ttl
+from exdatahub.services.kline_store import KlineStore
+from exdatahub.utils.time_utils import next_bar_close
+
+
+def test_ttl_expiry_and_lru_eviction():
+    """测试条目过期与 LRU 淘汰"""
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=0.05)
+    cache.set("b", 2, ttl=10)
+    cache.get("b")
+    cache.set("c", 3, ttl=10)  # 淘汰最久未使用的 a
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    time.sleep(0.06)
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+
+
+def test_response_cache_counts_hits(tmp_path):
+    """测试命中/未命中计数与磁盘缓存跨实例复用"""
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"code": "0", "data": [["1"]]}
+
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    for _ in range(3):
+        cache.get_or_fetch(("k",), 60, fetch)
+    assert len(calls) == 1
+    assert cache.stats["hits"] == 2 and cache.stats["misses"] == 1
+
+    restarted = ResponseCache(disk_dir=str(tmp_path))
+    assert restarted.get_or_fetch(("k",), 60, fetch) == {"code": "0", "data": [["1"]]}
+    assert len(calls) == 1
+
+
+def test_okx_ttl_policy():
+    """测试 TTL 由接口与周期决定"""
+    now = time.time()
+    ttl = okx_cache_ttl("/api/v5/market/candles", {"bar": "1D"})
+    assert abs(ttl - max(1.0, next_bar_close("1D", now) - now)) < 1
+
+    assert okx_cache_ttl("/api/v5/market/candles", {"bar": "1m"}) <= 60
+    assert okx_cache_ttl("/api/v5/market/ticker", {"instId": "BTC-USDT"}) is None
+    assert okx_cache_ttl("/api/v5/public/funding-rate", {"instId": "BTC-USDT-SWAP"}) is None
+
+    open_page = {"data": [["1700000060000", "1", "1", "1", "1", "1", "1", "1", "0"]]}
+    closed_page = {"data": [["1700000000000", "1", "1", "1", "1", "1", "1", "1", "1"]]}
+    assert okx_cache_ttl("/api/v5/market/candles", {"bar": "1D"}, open_page) is None
+    assert okx_cache_ttl("/api/v5/market/history-candles", {"bar": "1D"}, closed_page) > 0
+    assert okx_cache_ttl("/api/v5/market/candles", {"bar": "1D"}, {"data": []}) is None
+
+
+class ScriptedOKXClient(OKXClient):
+    """按顺序返回预设响应的 OKXClient（不访问网络）"""
+
+    def __init__(self, pages, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = list(pages)
+        self.sent = 0
+
+    def _send(self, method, path, params=None):
+        self.sent += 1
+        return self.pages.pop(0)
+
+
+def test_open_candle_is_not_frozen():
+    """测试同一根 K 线内再次刷新能拿到更新后的未收盘 K 线，只含已收盘 K 线的页仍然缓存"""
+    day = 86400000
+    closed = [[str(1700000000000 + i * day), "100", "101", "99", "100", "1", "1", "1", "1"] for i in range(3)][::-1]
+
+    def page(close):
+        ts = str(1700000000000 + 3 * day)
+        return {"code": "0", "msg": "", "data": [[ts, "100", "101", "99", close, "1", "1", "1", "0"]]}
+
+    full = {"code": "0", "msg": "", "data": page("100")["data"] + closed}
+    client = ScriptedOKXClient([full, page("100.5"), page("101"), {"code": "0", "msg": "", "data": closed}],
+                               cache=ResponseCache())
+    store = KlineStore()
+
+    store.refresh(client, "BTC-USDT-SWAP", "1D", limit=4)
+    store.refresh(client, "BTC-USDT-SWAP", "1D", limit=4)
+    rows = store.refresh(client, "BTC-USDT-SWAP", "1D", limit=4)
+    assert rows[-1][4] == "101"
+    assert client.sent == 3
+
+    for _ in range(2):
+        client.fetch_history_klines("BTC-USDT-SWAP", "1D", after="1700300000000")
+    assert client.sent == 4
@@ -0,0 +1,110 @@
+"""
+CandleStore 测试（内存映射列式存储：追加、零拷贝窗口、并发读取）
+"""
+import threading
+
+import numpy as np
+
+from exdatahub.core.candle_store import CandleStore
+from exdatahub.core.models import KlineSeries
+from exdatahub.services.analysis import AnalysisService
+
+START = 1700000000000
+MINUTE = 60_000
+
+
+def make_rows(start, count, close=100.0, confirmed=True):
+    """OKX 顺序（最新在前）的 K 线行"""
+    rows = [[str(start + i * MINUTE), "100", "101", "99", str(close + i), "10", "1000", "100000",
+             "1" if confirmed else "0"] for i in range(count)]
+    return rows[::-1]
+
+
+def test_append_and_view(tmp_path):
+    """测试追加后按时间窗口读取，结果为内存映射的零拷贝视图"""
+    store = CandleStore(str(tmp_path))
+
+    assert store.append("BTC-USDT-SWAP", "1m", make_rows(START, 100)) == 100
+
+    window = store.view("BTC-USDT-SWAP", "1m", start=START + 10 * MINUTE, end=START + 20 * MINUTE)
+    assert window.ts.tolist() == [START + i * MINUTE for i in range(10, 20)]
+    assert window.close.tolist() == [100.0 + i for i in range(10, 20)]
+    assert isinstance(window.close.base, np.memmap) or isinstance(window.close, np.memmap)
+    assert not window.close.flags.writeable
+    assert store.tail("BTC-USDT-SWAP", "1m", 3).ts[0] == START + 97 * MINUTE
+    assert store.last_ts("BTC-USDT-SWAP", "1m") == START + 99 * MINUTE
+    assert store.symbols() == [("BTC-USDT-SWAP", "1m")]
+
+
+def test_append_is_ordered_and_deduped(tmp_path):
+    """测试只追加比最后一根更新的已收盘 K 线；重复的最后一根覆盖写入"""
+    store = CandleStore(str(tmp_path))
+    store.append("X", "1m", make_rows(START, 10))
+
+    # 与已有数据重叠 + 1 根未收盘
+    rows = make_rows(START + 5 * MINUTE, 10, close=500.0) + make_rows(START + 20 * MINUTE, 1, confirmed=False)
+    assert store.append("X", "1m", rows) == 5
+
+    series = store.view("X", "1m")
+    assert series.ts.tolist() == [START + i * MINUTE for i in range(15)]
+    assert series.close[9] == 504.0  # 最后一根被覆盖
+    assert series.close[8] == 108.0  # 更早的不变
+    assert store.append("X", "1m", make_rows(START, 3)) == 0
+
+
+def test_truncated_partial_row_is_ignored(tmp_path):
+    """测试中断的追加（只写了部分列）对读取不可见，下次追加时被清理"""
+    store = CandleStore(str(tmp_path))
+    store.append("X", "1m", make_rows(START, 5))
+    with open(store.path("X", "1m") / "open.f8", "ab") as f:
+        f.write(np.float64(1.0).tobytes())
+
+    assert store.length("X", "1m") == 5
+    store.append("X", "1m", make_rows(START + 5 * MINUTE, 1))
+    assert store.view("X", "1m").open.tolist() == [100.0] * 6
+
+
+def test_concurrent_readers_see_complete_rows(tmp_path):
+    """测试写入同时读取：读到的每一行都完整且有序"""
+    store = CandleStore(str(tmp_path))
+    reader = CandleStore(str(tmp_path))
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            series = reader.view("X", "1m")
+            if len(series) and not (np.all(np.diff(series.ts) == MINUTE) and np.all(series.vol == 10.0)):
+                errors.append(len(series))
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    for i in range(200):
+        store.append("X", "1m", make_rows(START + i * MINUTE, 1))
+    stop.set()
+    thread.join()
+
+    assert errors == []
+    assert reader.length("X", "1m") == 200
+
+
+def test_view_feeds_analysis(tmp_path):
+    """测试存储窗口可直接用于指标计算（pandas 与 numpy 后端）"""
+    store = CandleStore(str(tmp_path))
+    store.append("X", "1m", make_rows(START, 300))
+    rows = list(reversed(make_rows(START, 300)))[-250:]
+
+    window = store.tail("X", "1m", 250)
+
+    assert (AnalysisService.calculate_indicators(window, backend="numpy")
+            == AnalysisService.calculate_indicators(rows, backend="numpy"))
+    assert (AnalysisService.calculate_indicators(window, backend="pandas")["trend"]
+            == AnalysisService.calculate_indicators(rows, backend="pandas")["trend"])
+
+
+def test_empty_series(tmp_path):
+    store = CandleStore(str(tmp_path))
+
+    assert len(store.view("X", "1m")) == 0
+    assert store.last_ts("X", "1m") is None
+    assert store.append("X", "1m", KlineSeries.from_okx([])) == 0
@@ -0,0 +1,53 @@
+"""
+交易对 / 周期转换测试
+"""
+import pytest
+
+from exdatahub.utils.converters import (
+    SPOT, SWAP, Instrument, from_exchange_interval, index_symbol, normalize_interval, parse_symbol,
+    to_exchange_interval, to_exchange_symbol,
+)
+
+
+def test_parse_symbol():
+    assert parse_symbol("BTC-USDT-SWAP") == Instrument("BTC", "USDT", SWAP)
+    assert parse_symbol("btcusdt") == Instrument("BTC", "USDT", SWAP)
+    assert parse_symbol("ETHFDUSD") == Instrument("ETH", "FDUSD", SWAP)
+    assert parse_symbol("BTC/USDT:USDT") == Instrument("BTC", "USDT", SWAP)
+    assert parse_symbol("BTC/USDT") == Instrument("BTC", "USDT", SPOT)
+    assert parse_symbol("eth-usdt").key == "ETH-USDT"
+    for bad in ("BTC", "USDT", "BTC-USDT-240329-SWAP", "-USDT-SWAP"):
+        with pytest.raises(ValueError):
+            parse_symbol(bad)
+
+
+def test_symbol_round_trip():
+    """测试各交易所写法互转"""
+    for symbol in ("BTC-USDT-SWAP", "BTCUSDT", "BTC/USDT:USDT"):
+        assert to_exchange_symbol("okx", symbol) == "BTC-USDT-SWAP"
+        assert to_exchange_symbol("binance", symbol) == "BTCUSDT"
+        assert to_exchange_symbol("bybit", symbol) == "BTCUSDT"
+    assert to_exchange_symbol("binance", "eth-usdt") == "ETHUSDT"
+    assert index_symbol("okx", "BTC-USDT-SWAP") == "BTC-USDT"
+    assert index_symbol("okx", "BTC-USD-240329") == "BTC-USD"
+    assert index_symbol("okx", "ETHUSDT") == "ETH-USDT"
+    assert index_symbol("bybit", "BTC-USDT-SWAP") == "BTCUSDT"
+    with pytest.raises(ValueError):
+        to_exchange_symbol("kraken", "BTCUSDT")
+
+
+def test_interval_mapping():
+    bars = ("1m", "15m", "1H", "4h", "1D", "1Dutc", "1W", "1M")
+    assert [to_exchange_interval("binance", b) for b in bars] == ["1m", "15m", "1h", "4h", "1d", "1d", "1w", "1M"]
+    assert [to_exchange_interval("bybit", b) for b in bars] == ["1", "15", "60", "240", "D", "D", "W", "M"]
+    assert [to_exchange_interval("okx", b) for b in bars] == ["1m", "15m", "1H", "4H", "1D", "1Dutc", "1W", "1M"]
+    assert [normalize_interval(b) for b in ("1h", "60", "D", "1d", "1m", "1M", "4Hutc")] == \
+        ["1H", "1H", "1D", "1D", "1m", "1M", "4Hutc"]
+    assert from_exchange_interval("bybit", "240") == "4H"
+    assert from_exchange_interval("binance", "8h") == "8H"
+    with pytest.raises(ValueError):
+        to_exchange_interval("bybit", "7m")
+    with pytest.raises(ValueError):
+        to_exchange_interval("okx", "8H")
+    with pytest.raises(ValueError):
+        from_exchange_interval("bybit", "1h")
@@ -0,0 +1,170 @@
+"""
+WatchService 测试（按周期调度刷新、快照发布）
+"""
+import threading
+import time
+
+import pytest
+
+from exdatahub.services.daemon import WatchService
+from exdatahub.utils.time_utils import next_bar_close
+
+
+class FakeAggregator:
+    """记录各 refresh_* 调用的假聚合器"""
+
+    def __init__(self, exchange_name="okx"):
+        self.exchange_name = exchange_name
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _record(self, *call):
+        with self.lock:
+            self.calls.append(call)
+
+    def resolve_frames(self, frames=None):
+        return frames or ["1m", "1H"]
+
+    def refresh_parts(self, symbol, parts=(), result=None, rescan=True):
+        if result is None:
+            result = {"symbol": symbol, "timestamp": None, "klines": {}, "derivatives": {}}
+        for part in parts:
+            if part == "oi":
+                self.refresh_oi(result)
+            elif part == "funding":
+                self.refresh_funding(result)
+            elif part == "price":
+                self.refresh_price(result)
+            else:
+                self.refresh_frame(result, part)
+        return result
+
+    def refresh_scanner(self):
+        self._record("scan")
+        return True
+
+    def analyze_market(self, symbol, frames=None, rescan=True):
+        self._record("analyze", symbol)
+        result = self.refresh_parts(symbol)
+        for frame in frames:
+            result["klines"][frame] = {"n": 0}
+        return result
+
+    def refresh_frame(self, result, frame):
+        self._record("frame", result["symbol"], frame)
+        result["klines"][frame] = {"n": result["klines"][frame]["n"] + 1}
+
+    def refresh_oi(self, result):
+        self._record("oi", result["symbol"])
+
+    def refresh_funding(self, result):
+        self._record("funding", result["symbol"])
+        result["derivatives"]["funding_rate"] = {"n": len(self.count("funding"))}
+
+    def refresh_price(self, result):
+        self._record("price", result["symbol"])
+
+    def count(self, kind, *args):
+        with self.lock:
+            return [c for c in self.calls if c[0] == kind and c[1:1 + len(args)] == args]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_next_run_follows_bar_cadence():
+    """测试 K 线任务在周期收盘后执行，其余任务按固定间隔"""
+    watch = WatchService(FakeAggregator(), ["X"], price_interval=5, funding_interval=60, settle_delay=2)
+    now = 1700000030.0  # 2023-11-14 22:13:50 UTC
+
+    assert watch.next_run(("X", "frame", "1m"), now) == 1700000040.0 + 2
+    assert watch.next_run(("X", "frame", "1H"), now) == next_bar_close("1H", now) + 2
+    assert watch.next_run(("X", "frame", "1D"), now) == next_bar_close("1D", now) + 2
+    assert watch.next_run(("X", "oi", None), now) == next_bar_close("5m", now) + 2
+    assert watch.next_run(("X", "funding", None), now) == now + 60
+    assert watch.next_run(("X", "price", None), now) == now + 5
+
+
+def test_next_run_uses_exchange_bar_alignment():
+    """测试 OKX 日线按香港时间收盘，Binance 日线按 UTC 收盘"""
+    now = 1700000030.0  # 2023-11-14 22:13:50 UTC
+    okx = WatchService(FakeAggregator("okx"), ["X"], settle_delay=0)
+    binance = WatchService(FakeAggregator("binance"), ["X"], settle_delay=0)
+
+    assert okx.next_run(("X", "frame", "1D"), now) == 1700064000.0   # 2023-11-15 16:00 UTC（香港 00:00）
+    assert binance.next_run(("X", "frame", "1D"), now) == 1700006400.0   # 2023-11-15 00:00 UTC
+    assert binance.next_run(("X", "frame", "1H"), now) == okx.next_run(("X", "frame", "1H"), now)
+    assert binance.next_run(("X", "oi", None), now) == next_bar_close("5m", now)
+
+
+def test_empty_symbols_rejected():
+    with pytest.raises(ValueError):
+        WatchService(FakeAggregator(), [])
+
+
+def test_initial_snapshot_then_scheduled_refresh():
+    """测试启动时完整分析一次，之后只刷新到期的部分并发布新快照"""
+    aggregator = FakeAggregator()
+    published = []
+    watch = WatchService(aggregator, ["BTC-USDT-SWAP", "ETH-USDT-SWAP"], price_interval=0.05,
+                         funding_interval=0.1, on_snapshot=lambda s, snap: published.append((s, snap)))
+    watch.start()
+    try:
+        assert wait_for(lambda: len(aggregator.count("funding", "ETH-USDT-SWAP")) >= 2)
+    finally:
+        watch.stop(5)
+
+    assert len(aggregator.count("analyze")) == 2
+    # 全市场扫描表每轮刷新一次（启动时一次），不随交易对数量成倍增加
+    rounds = len(aggregator.count("price", "BTC-USDT-SWAP")) + len(aggregator.count("funding", "BTC-USDT-SWAP"))
+    assert len(aggregator.count("scan")) <= rounds + 1
+    # 1m / 1H / 5m 都还没到收盘时间
+    assert aggregator.count("frame") == [] and aggregator.count("oi") == []
+    assert len(aggregator.count("price", "BTC-USDT-SWAP")) > len(aggregator.count("funding", "BTC-USDT-SWAP"))
+    snapshot = watch.snapshot("BTC-USDT-SWAP")
+    assert snapshot["derivatives"]["funding_rate"]["n"] >= 1
+    assert "updated_at" in snapshot
+    assert {s for s, _ in published} == {"BTC-USDT-SWAP", "ETH-USDT-SWAP"}
+
+
+def test_frame_refreshes_after_bar_close():
+    """测试到达周期收盘时间后刷新该周期，已发布的快照不受后续刷新影响"""
+    aggregator = FakeAggregator()
+    # 把时钟拨到 1m 收盘前 0.1 秒
+    offset = next_bar_close("1m") - time.time() - 0.1
+    watch = WatchService(aggregator, ["X"], frames=["1m", "1D"], price_interval=60, funding_interval=60,
+                         settle_delay=0, clock=lambda: time.time() + offset)
+    watch.start()
+    try:
+        assert wait_for(lambda: watch.snapshot("X") is not None)
+        first = watch.snapshot("X")
+        assert wait_for(lambda: aggregator.count("frame", "X", "1m"))
+        assert wait_for(lambda: watch.snapshot("X") is not first)
+    finally:
+        watch.stop(5)
+
+    assert first["klines"]["1m"] == {"n": 0}
+    assert watch.snapshot("X")["klines"]["1m"] == {"n": 1}
+    assert aggregator.count("frame", "X", "1D") == []
+
+
+def test_failed_refresh_keeps_running():
+    """测试单个刷新任务异常不影响调度"""
+    aggregator = FakeAggregator()
+
+    def broken(result):
+        aggregator._record("price", result["symbol"])
+        raise RuntimeError("boom")
+
+    aggregator.refresh_price = broken
+    watch = WatchService(aggregator, ["X"], price_interval=0.02, funding_interval=60).start()
+    try:
+        assert wait_for(lambda: len(aggregator.count("price")) >= 3)
+    finally:
+        watch.stop(5)
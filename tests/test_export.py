@@ -0,0 +1,138 @@
+"""
+历史数据导出测试（Parquet / Feather / CSV 分区写入、追加去重、分页拉取）
+"""
+import importlib.util
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from exdatahub.cli.main import cli
+from exdatahub.core.models import KlineSeries
+from exdatahub.services.export import ExportService, oi_columns
+
+DAY_MS = 86_400_000
+START = 1700000000000  # 2023-11-14 22:13:20 UTC
+HOUR = 3_600_000
+
+FORMATS = ["csv"] + (["parquet", "feather"] if importlib.util.find_spec("pyarrow") else [])
+
+
+def make_rows(start, count, step=HOUR, close=100.0):
+    """OKX 顺序（最新在前）的 K 线行"""
+    rows = [[str(start + i * step), "100", "101", "99", str(close + i), "10", "1000", "100000", "1"]
+            for i in range(count)]
+    return rows[::-1]
+
+
+class FakeClient:
+    """按 after 分页返回 K 线 / 资金费率历史的假客户端"""
+
+    def __init__(self, klines, funding=()):
+        self.klines = sorted(klines, key=lambda row: -int(row[0]))
+        self.funding = sorted(funding, key=lambda item: -int(item["fundingTime"]))
+        self.calls = []
+
+    def fetch_klines(self, symbol, interval, limit=100, after=None, before=None):
+        self.calls.append(("klines", limit, after))
+        rows = [row for row in self.klines if after is None or int(row[0]) < int(after)]
+        return {"code": "0", "msg": "", "data": rows[:limit]}
+
+    def fetch_funding_rate_history(self, symbol, limit=24, after=None):
+        self.calls.append(("funding", limit, after))
+        items = [item for item in self.funding if after is None or int(item["fundingTime"]) < int(after)]
+        return {"code": "0", "msg": "", "data": items[:limit]}
+
+    def fetch_oi_history(self, symbol, period="5m", limit=24):
+        return {"code": "0", "msg": "", "data": [[str(START), "1000", "10", "980000"],
+                                                 [str(START - 300000), "990", "9.9", "970000"]]}
+
+
+@pytest.fixture(params=FORMATS)
+def exporter(request, tmp_path):
+    return ExportService(str(tmp_path), fmt=request.param)
+
+
+def test_klines_partitioned_by_date(exporter, tmp_path):
+    """测试 K 线按 UTC 日期分区，读取结果按时间正序"""
+    series = KlineSeries.from_okx(make_rows(START, 5), inst_id="BTC-USDT-SWAP", bar="1H")
+
+    paths = exporter.write_klines(series)
+
+    assert [p.split("date=")[1].split("/")[0] for p in paths] == ["2023-11-14", "2023-11-15"]
+    assert "klines/exchange=okx/symbol=BTC-USDT-SWAP/bar=1H/" in paths[0].replace("\\", "/")
+    columns = exporter.read("klines", "BTC-USDT-SWAP", bar="1H")
+    assert columns["ts"].tolist() == series.ts.tolist()
+    assert columns["close"].tolist() == series.close.tolist()
+    assert columns["confirmed"].dtype == bool
+
+
+def test_append_merges_and_dedupes(exporter):
+    """测试追加时与已有分区合并，重叠的 ts 以新数据为准"""
+    exporter.write_klines(KlineSeries.from_okx(make_rows(START, 3), inst_id="X", bar="1H"))
+    exporter.write_klines(KlineSeries.from_okx(make_rows(START + 2 * HOUR, 3, close=500.0), inst_id="X", bar="1H"))
+
+    columns = exporter.read("klines", "X", bar="1H")
+    assert columns["ts"].tolist() == [START + i * HOUR for i in range(5)]
+    assert columns["close"].tolist() == [100.0, 101.0, 500.0, 501.0, 502.0]
+
+
+def test_overwrite_replaces_partition(exporter):
+    exporter.write_klines(KlineSeries.from_okx(make_rows(START, 2), inst_id="X", bar="1H"))
+    exporter.write_klines(KlineSeries.from_okx(make_rows(START + HOUR, 1), inst_id="X", bar="1H"), append=False)
+
+    assert exporter.read("klines", "X", bar="1H")["ts"].tolist() == [START + HOUR]
+
+
+def test_dump_pages_klines_and_funding(tmp_path):
+    """测试分页拉取完整序列（after 翻页）并写入"""
+    client = FakeClient(make_rows(START, 700, step=60000),
+                        [{"fundingTime": str(START - i * 8 * HOUR), "fundingRate": "0.0001", "realizedRate": ""}
+                         for i in range(150)])
+    exporter = ExportService(str(tmp_path), fmt="csv")
+
+    assert exporter.dump_klines(client, "BTC-USDT-SWAP", "1m", limit=650) == 650
+    assert exporter.dump_funding_history(client, "BTC-USDT-SWAP", limit=1000) == 150
+
+    assert [c[1] for c in client.calls if c[0] == "klines"] == [300, 300, 50]
+    klines = exporter.read("klines", "BTC-USDT-SWAP", bar="1m")
+    assert len(klines["ts"]) == 650
+    assert np.all(np.diff(klines["ts"]) == 60000)
+    funding = exporter.read("funding", "BTC-USDT-SWAP")
+    assert len(funding["ts"]) == 150
+    assert np.isnan(funding["realized_rate"]).all()
+
+
+def test_oi_history_formats():
+    """测试持仓量历史的数组行与字典行都能解析"""
+    rows = oi_columns({"code": "0", "data": [["1700000000000", "1000", "10", "980000"]]})
+    dicts = oi_columns([{"ts": "1700000000000", "oi": "1000", "oiCcy": "10"}])
+
+    assert rows["oi_usd"].tolist() == [980000.0]
+    assert dicts["oi"].tolist() == [1000.0]
+    assert np.isnan(dicts["oi_usd"][0])
+
+
+@pytest.mark.skipif("parquet" not in FORMATS, reason="pyarrow not installed")
+def test_load_into_pandas(tmp_path):
+    """测试 Parquet 分区读取为 DataFrame"""
+    exporter = ExportService(str(tmp_path), fmt="parquet")
+    exporter.dump_oi_history(FakeClient([]), "BTC-USDT-SWAP", period="5m")
+
+    df = exporter.load("open_interest", "BTC-USDT-SWAP", bar="5m")
+
+    assert df["oi"].tolist() == [990.0, 1000.0]
+    assert str(df.index.tz) == "UTC"
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        ExportService(str(tmp_path), fmt="xlsx")
+
+
+def test_dump_command_is_registered():
+    """测试 dump 子命令已注册到 CLI"""
+    result = CliRunner().invoke(cli, ["dump", "--help"])
+
+    assert result.exit_code == 0
+    assert "--format" in result.output and "--append" in result.output
@@ -0,0 +1,105 @@
+"""
+指标引擎 / NumPy 后端与 pandas_ta 计算结果一致性测试
+"""
+import math
+import random
+
+import numpy as np
+import pytest
+
+from exdatahub.services.analysis import AnalysisService
+from exdatahub.services.indicators import IndicatorEngine
+from exdatahub.services.vector_indicators import calculate_indicators_batch
+
+
+def make_rows(count, seed=0):
+    """生成按时间正序的 OKX 格式 K 线"""
+    rng = random.Random(seed)
+    rows = []
+    price = 30000.0
+    for i in range(count):
+        open_ = price
+        price += rng.uniform(-50, 50)
+        high = max(open_, price) + rng.random() * 20
+        low = min(open_, price) - rng.random() * 20
+        rows.append([str(1700000000000 + i * 60000), str(open_), str(high), str(low), str(price),
+                     str(rng.uniform(1, 100)), "0", "0", "1"])
+    return rows
+
+
+def assert_same(expected, actual):
+    assert expected.keys() == actual.keys()
+    for group in expected:
+        for key, value in expected[group].items():
+            other = actual[group][key]
+            if value is None:
+                assert other is None, (group, key)
+            else:
+                assert other is not None and math.isclose(value, other, rel_tol=1e-9, abs_tol=1e-9), \
+                    (group, key, value, other)
+
+
+@pytest.mark.parametrize("count", [1, 14, 15, 20, 33, 34, 50, 100, 200, 300])
+def test_engine_matches_pandas(count):
+    """测试同一段 K 线序列的结果与 pandas_ta 一致（含长度不足时返回 None）"""
+    rows = make_rows(count, seed=count)
+    engine = IndicatorEngine()
+    engine.update_many(rows)
+
+    assert_same(AnalysisService.calculate_indicators(rows), engine.values())
+
+
+def test_engine_handles_new_and_revised_bars():
+    """测试增量追加新 K 线与修订未收盘 K 线"""
+    rows = make_rows(260, seed=7)
+    engine = IndicatorEngine()
+    engine.update_many(rows[:250])
+
+    for i in range(250, 260):
+        open_bar = list(rows[i])
+        open_bar[4] = str(float(open_bar[4]) + 5)
+        open_bar[8] = "0"
+        engine.update(open_bar)
+        assert_same(AnalysisService.calculate_indicators(rows[:i] + [open_bar]), engine.values())
+
+        engine.update(rows[i])
+        assert_same(AnalysisService.calculate_indicators(rows[:i + 1]), engine.values())
+
+
+@pytest.mark.parametrize("count", [1, 14, 15, 20, 33, 34, 50, 100, 200, 300])
+def test_numpy_backend_matches_pandas(count):
+    """测试 NumPy 后端与 pandas_ta 结果一致"""
+    rows = make_rows(count, seed=count + 1)
+
+    assert_same(AnalysisService.calculate_indicators(rows),
+                AnalysisService.calculate_indicators(rows, backend="numpy"))
+
+
+def test_numpy_backend_handles_flat_prices():
+    """测试价格不变时（RSI 0/0）与 pandas_ta 一样返回 None"""
+    rows = [[str(i), "1", "1", "1", "1", "5", "0", "0", "1"] for i in range(40)]
+
+    assert_same(AnalysisService.calculate_indicators(rows),
+                AnalysisService.calculate_indicators(rows, backend="numpy"))
+
+
+def test_batch_matches_single_symbol():
+    """测试批量计算（按长度分组的矩阵）与逐个交易对计算结果一致"""
+    klines = {f"SYM{i}-USDT-SWAP": make_rows(count, seed=i) for i, count in enumerate([300, 300, 120, 0, 300, 20])}
+
+    results = AnalysisService.calculate_indicators_many(klines)
+
+    assert list(results) == list(klines)
+    for symbol, rows in klines.items():
+        assert_same(AnalysisService.calculate_indicators(rows, backend="numpy"), results[symbol])
+    assert results["SYM3-USDT-SWAP"] == {}
+
+
+def test_batch_rejects_misaligned_matrices():
+    """测试输入矩阵形状不一致时报错"""
+    close = np.ones((3, 50))
+
+    with pytest.raises(ValueError):
+        calculate_indicators_batch(close, close, np.ones((3, 49)), close)
+    with pytest.raises(ValueError):
+        calculate_indicators_batch(close, close, close, close, symbols=["A", "B"])
@@ -0,0 +1,170 @@
+"""
+InstrumentRegistry 测试（使用模拟客户端，不访问外网）
+"""
+import threading
+import time
+
+import pytest
+
+from exdatahub.config.config_loader import ConfigLoader
+from exdatahub.services.aggregator import AggregatorService
+from exdatahub.services.instruments import InstrumentRegistry
+
+INSTRUMENTS = {
+    "SPOT": [{"instType": "SPOT", "instId": "BTC-USDT", "baseCcy": "BTC", "quoteCcy": "USDT", "uly": "",
+              "settleCcy": "", "ctVal": "", "state": "live"}],
+    "SWAP": [
+        {"instType": "SWAP", "instId": "BTC-USDT-SWAP", "uly": "BTC-USDT", "instFamily": "BTC-USDT",
+         "settleCcy": "USDT", "ctVal": "0.01", "ctMult": "1", "ctValCcy": "BTC", "ctType": "linear",
+         "state": "live", "extra": "dropped"},
+        {"instType": "SWAP", "instId": "BTC-USD-SWAP", "uly": "BTC-USD", "instFamily": "BTC-USD",
+         "settleCcy": "BTC", "ctVal": "100", "ctMult": "1", "ctValCcy": "USD", "ctType": "inverse",
+         "state": "live"},
+    ],
+    "FUTURES": [{"instType": "FUTURES", "instId": "BTC-USDT-250328", "uly": "BTC-USDT", "instFamily": "BTC-USDT",
+                 "settleCcy": "USDT", "ctVal": "0.01", "ctMult": "1", "ctValCcy": "BTC", "ctType": "linear",
+                 "state": "live"}],
+}
+
+
+class FakeClient:
+    """模拟 OKXClient：instruments 接口按 instType 返回固定数据，其余接口返回 OKX 格式的行情"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def fetch_instruments(self, inst_type="SWAP"):
+        self.calls.append(inst_type)
+        if self.fail:
+            raise RuntimeError("unreachable")
+        return {"code": "0", "msg": "", "data": INSTRUMENTS[inst_type]}
+
+    def _respond(self, name, data):
+        self.calls.append(name)
+        return {"code": "0", "msg": "", "data": data}
+
+    def fetch_klines(self, symbol, interval, limit=100, after=None, before=None):
+        rows = [[str(1700000000000 + i * 60000), "100", "101", "99", "100", "10", "1", "1000", "1"] for i in range(60)]
+        return self._respond("klines", rows[::-1])
+
+    def fetch_funding_rate(self, symbol):
+        return self._respond("funding", [{"fundingRate": "0.0001", "nextFundingTime": "1700006400000"}])
+
+    def fetch_open_interest(self, symbol):
+        return self._respond("oi", [{"oi": "1000", "oiCcy": "10", "ts": "1700000000000"}])
+
+    def fetch_mark_price(self, symbol):
+        return self._respond("mark", [{"markPx": "60000", "ts": "1700000000000"}])
+
+    def fetch_index_tickers(self, symbol):
+        return self._respond(f"index:{symbol}", [{"idxPx": "59990"}])
+
+
+def test_lookups():
+    registry = InstrumentRegistry(FakeClient())
+    assert registry.refresh() == 4
+
+    assert len(registry) == 4 and "BTC-USDT-SWAP" in registry and "ETH-USDT-SWAP" not in registry
+    assert "extra" not in registry.get("BTC-USDT-SWAP")
+    assert [i["instId"] for i in registry.by_underlying("BTC-USDT")] == ["BTC-USDT-SWAP", "BTC-USDT-250328"]
+    assert [i["instId"] for i in registry.by_settle("USDT", inst_type="SWAP")] == ["BTC-USDT-SWAP"]
+    assert registry.inst_ids("SPOT") == ["BTC-USDT"]
+
+    assert registry.index_symbol("BTC-USDT-250328") == "BTC-USDT"
+    assert registry.index_symbol("BTC-USDT") == "BTC-USDT"
+    assert registry.index_symbol("ETH-USDT-SWAP") == "ETH-USDT"
+
+    assert registry.contract_size("BTC-USDT-SWAP") == 0.01
+    assert registry.contract_size("BTC-USDT") is None
+    assert registry.oi_usd("BTC-USDT-SWAP", 1000, 60000) == pytest.approx(600000)
+    assert registry.oi_usd("BTC-USDT-SWAP", 1000, None) is None
+    assert registry.oi_usd("BTC-USD-SWAP", 1000, None) == 100000
+
+
+def test_persistence_and_warm_load(tmp_path):
+    """测试刷新后写入磁盘，新实例启动时从磁盘加载而不请求交易所"""
+    path = tmp_path / "instruments.json"
+    InstrumentRegistry(FakeClient(), path=str(path)).refresh()
+    assert path.exists()
+
+    client = FakeClient()
+    registry = InstrumentRegistry(client, path=str(path)).ensure()
+    assert client.calls == []
+    assert registry.get("BTC-USD-SWAP")["ctType"] == "inverse"
+
+    offline = InstrumentRegistry(path=str(tmp_path / "missing.json")).ensure()
+    assert len(offline) == 0
+
+
+def test_stale_data_refreshes_in_background(tmp_path):
+    path = tmp_path / "instruments.json"
+    InstrumentRegistry(FakeClient(), path=str(path)).refresh()
+
+    client = FakeClient()
+    registry = InstrumentRegistry(client, path=str(path), refresh_interval=0)
+    registry.ensure()
+    # 后台刷新期间旧数据仍然可用
+    assert len(registry) == 4
+    registry._refresh_thread.join(5)
+    assert sorted(client.calls) == ["FUTURES", "SPOT", "SWAP"]
+
+
+def test_failed_refresh_backs_off():
+    client = FakeClient(fail=True)
+    registry = InstrumentRegistry(client)
+    registry.ensure()
+    registry.ensure()
+
+    assert len(registry) == 0
+    assert len(client.calls) == 3
+
+
+def write_config(tmp_path, path):
+    config = tmp_path / "config.yaml"
+    config.write_text(f"instruments:\n  path: {path}\ncache:\n  enabled: false\n", encoding="utf-8")
+    return ConfigLoader(str(config))
+
+
+def test_aggregator_uses_registry(tmp_path):
+    """测试分析时用注册表校验交易对、映射指数、换算持仓美元价值"""
+    path = tmp_path / "instruments.json"
+    InstrumentRegistry(FakeClient(), path=str(path)).refresh()
+    service = AggregatorService("okx", config=write_config(tmp_path, path))
+    client = service.client = FakeClient()
+    assert len(service.instruments) == 4
+
+    result = service.analyze_market("BTC-USDT-250328", ["1m"])
+    with pytest.raises(ValueError, match="Unknown OKX instrument"):
+        service.analyze_market("NOPE-USDT-SWAP", ["1m"])
+    service.close()
+
+    assert "index:BTC-USDT" in client.calls
+    oi = result["derivatives"]["oi"]
+    assert oi["value_usd"] == oi["value_ccy"] == "10"
+    assert oi["notional_usd"] == pytest.approx(1000 * 0.01 * 60000)
+    assert client.calls.count("klines") == 1
+    assert time.time() * 1000 - service.instruments.updated_at < 60000
+
+
+def test_first_load_does_not_block_analysis(tmp_path):
+    """测试没有磁盘文件时注册表在后台拉取，首次分析不等待"""
+    service = AggregatorService("okx", config=write_config(tmp_path, tmp_path / "instruments.json"))
+    client = service.client = FakeClient()
+    release = threading.Event()
+    fetch_instruments = client.fetch_instruments
+
+    def slow_fetch_instruments(inst_type):
+        release.wait(5)
+        return fetch_instruments(inst_type)
+
+    client.fetch_instruments = slow_fetch_instruments
+    service.instruments.client = client
+    result = service.analyze_market("BTC-USDT-SWAP", ["1m"])
+    assert "notional_usd" in result["derivatives"]["oi"]
+    assert len(service.instruments) == 0
+
+    release.set()
+    service.instruments._refresh_thread.join(5)
+    service.close()
+    assert len(service.instruments) == 4
@@ -0,0 +1,55 @@
+"""
+增量 K 线存储测试
+"""
+from exdatahub.services.kline_store import KlineStore
+
+
+def candle(ts, close, confirm="1"):
+    return [str(ts), "1", "2", "0.5", str(close), "10", "0", "0", confirm]
+
+
+class FakeCandlesClient:
+    """模拟 OKX candles 接口（最新在前，支持 before 分页）"""
+
+    def __init__(self, rows):
+        self.rows = rows  # 正序
+        self.requests = []
+
+    def fetch_klines(self, symbol, interval, limit=100, after=None, before=None):
+        self.requests.append({"limit": limit, "before": before})
+        rows = self.rows
+        if before is not None:
+            rows = [row for row in rows if int(row[0]) > int(before)]
+        return {"code": "0", "data": list(reversed(rows[-limit:]))}
+
+
+def test_refresh_fetches_only_new_bars():
+    """测试首次完整拉取，之后只拉取新 K 线并替换未收盘 K 线"""
+    client = FakeCandlesClient([candle(i, i) for i in range(9)] + [candle(9, 9.5, "0")])
+    store = KlineStore()
+
+    rows = store.refresh(client, "BTC-USDT-SWAP", "1m", limit=10)
+    assert [int(r[0]) for r in rows] == list(range(10))
+    assert store.last_confirmed_ts("BTC-USDT-SWAP", "1m") == 8
+
+    # 未收盘 K 线收盘，并出现新的未收盘 K 线
+    client.rows = client.rows[:9] + [candle(9, 9.8), candle(10, 10.1, "0")]
+    rows = store.refresh(client, "BTC-USDT-SWAP", "1m", limit=10)
+
+    assert client.requests[-1]["before"] == "8"
+    assert [int(r[0]) for r in rows] == list(range(1, 11))
+    assert rows[-2][4] == "9.8" and rows[-2][8] == "1"
+    assert store.last_confirmed_ts("BTC-USDT-SWAP", "1m") == 9
+
+
+def test_gap_falls_back_to_full_fetch():
+    """测试增量结果填满一页时（可能有缺口）退回完整拉取"""
+    client = FakeCandlesClient([candle(i, i) for i in range(5)])
+    store = KlineStore()
+    store.refresh(client, "ETH-USDT-SWAP", "1m", limit=5)
+
+    client.rows = [candle(i, i) for i in range(20)]
+    rows = store.refresh(client, "ETH-USDT-SWAP", "1m", limit=5)
+
+    assert client.requests[-1]["before"] is None
+    assert [int(r[0]) for r in rows] == list(range(15, 20))
@@ -0,0 +1,165 @@
+"""
+MarketService 测试（使用模拟客户端，不访问外网）
+"""
+import time
+
+import pytest
+
+from exdatahub.core.models import KlineSeries
+from exdatahub.services.aggregator import AggregatorService
+from exdatahub.services.market import MarketService, align_series, venue_spread
+
+LATENCY = 0.1
+HOUR = 3600000
+
+
+class FakeClient:
+    """模拟交易所客户端：返回 OKX 格式数据，记录收到的交易对与周期"""
+
+    def __init__(self, last, mark, index, funding, first_ts=1700000000000, latency=LATENCY):
+        self.values = dict(last=last, mark=mark, index=index, funding=funding)
+        self.first_ts = first_ts
+        self.latency = latency
+        self.calls = []
+
+    def _respond(self, name, symbol, data):
+        self.calls.append((name, symbol))
+        time.sleep(self.latency)
+        return {"code": "0", "msg": "", "data": data}
+
+    def fetch_ticker(self, symbol):
+        return self._respond("ticker", symbol, [{"instId": symbol, "last": str(self.values["last"])}])
+
+    def fetch_funding_rate(self, symbol):
+        return self._respond("funding", symbol, [{"instId": symbol, "fundingRate": str(self.values["funding"]),
+                                                  "nextFundingTime": "1700006400000"}])
+
+    def fetch_mark_price(self, symbol):
+        return self._respond("mark", symbol, [{"markPx": str(self.values["mark"]), "ts": "1700000000000"}])
+
+    def fetch_index_tickers(self, symbol):
+        return self._respond("index", symbol, [{"idxPx": str(self.values["index"])}])
+
+    def fetch_open_interest(self, symbol):
+        return self._respond("oi", symbol, [{"oi": "1000", "oiCcy": "10", "ts": "1700000000000"}])
+
+    def fetch_klines(self, symbol, interval, limit=100, after=None, before=None):
+        rows = [[str(self.first_ts + i * HOUR), "1", "2", "0.5", "1.5", "10", "10", "15", "1"] for i in range(limit)]
+        return self._respond("klines", (symbol, interval), rows[::-1])
+
+
+def make_market(**clients):
+    aggregators = {}
+    for exchange, client in clients.items():
+        aggregators[exchange] = AggregatorService(exchange)
+        aggregators[exchange].client = client
+    return MarketService(list(clients), aggregators=aggregators)
+
+
+def default_clients():
+    return dict(
+        okx=FakeClient(last=100.0, mark=100.2, index=100.0, funding=0.0003),
+        binance=FakeClient(last=100.4, mark=100.5, index=100.1, funding=0.0001),
+        bybit=FakeClient(last=99.9, mark=100.0, index=100.0, funding=-0.0001),
+    )
+
+
+def test_snapshot_aligns_venues_concurrently():
+    """测试各交易所并发拉取（耗时约为一次往返），交易对转换为各交易所写法"""
+    clients = default_clients()
+    market = make_market(**clients)
+
+    start = time.perf_counter()
+    snap = market.snapshot("BTCUSDT")
+    elapsed = time.perf_counter() - start
+    market.close()
+
+    assert elapsed < LATENCY * 3
+    assert snap["symbol"] == "BTC-USDT-SWAP"
+    assert ("index", "BTC-USDT") in clients["okx"].calls
+    assert ("ticker", "BTC-USDT-SWAP") in clients["okx"].calls
+    assert {symbol for _, symbol in clients["binance"].calls} == {"BTCUSDT"}
+    okx = snap["venues"]["okx"]
+    assert (okx["last"], okx["mark"], okx["oi_ccy"], okx["next_funding_time"]) == (100.0, 100.2, 10.0, 1700006400000)
+    assert okx["basis"] == pytest.approx(0.2)
+    assert okx["basis_pct"] == pytest.approx(0.2)
+    assert "errors" not in okx
+
+
+def test_snapshot_spreads():
+    market = make_market(**default_clients())
+    spreads = market.snapshot("BTC-USDT-SWAP")["spreads"]
+    market.close()
+
+    funding = spreads["funding_rate"]
+    assert (funding["high"], funding["low"]) == ("okx", "bybit")
+    assert funding["spread"] == pytest.approx(0.0004)
+    assert (spreads["basis_pct"]["high"], spreads["basis_pct"]["low"]) == ("binance", "bybit")
+    assert spreads["mark"]["spread"] == pytest.approx(0.5)
+    assert spreads["mark"]["spread_bps"] == pytest.approx(0.5 / 100.25 * 10000)
+
+
+def test_snapshot_errors_are_isolated():
+    """测试单个请求或单个交易所失败不影响其余数据"""
+    clients = default_clients()
+    for client in clients.values():
+        client.latency = 0
+
+    def broken(symbol):
+        raise RuntimeError("boom")
+
+    clients["binance"].fetch_funding_rate = broken
+    market = make_market(**clients)
+    snap = market.snapshot("BTCUSDT")
+    market.close()
+
+    binance = snap["venues"]["binance"]
+    assert binance["funding_rate"] is None
+    assert binance["errors"] == {"funding_rate": "boom"}
+    assert binance["mark"] == 100.5
+    assert (snap["spreads"]["funding_rate"]["high"], snap["spreads"]["funding_rate"]["low"]) == ("okx", "bybit")
+
+    market = make_market(okx=FakeClient(1, 1, 1, 0.0001, latency=0))
+    snap = market.snapshot("BTCUSDT")
+    market.close()
+    assert snap["spreads"] == {"funding_rate": None, "basis_pct": None, "mark": None}
+
+
+def test_klines_are_aligned():
+    """测试 K 线按开盘时间对齐；OKX 日线改用 UTC 对齐写法"""
+    clients = default_clients()
+    clients["binance"].first_ts += 2 * HOUR
+    for client in clients.values():
+        client.latency = 0
+    market = make_market(**clients)
+
+    series = market.klines("BTC-USDT-SWAP", "1h", limit=5)
+    market.klines("BTCUSDT", "1D", limit=1)
+    market.close()
+
+    assert set(series) == {"okx", "binance", "bybit"}
+    expected = [1700000000000 + i * HOUR for i in range(2, 5)]
+    for s in series.values():
+        assert s.ts.tolist() == expected
+        assert s.bar == "1H"
+    assert clients["okx"].calls[0][1] == ("BTC-USDT-SWAP", "1H")
+    assert clients["okx"].calls[1][1] == ("BTC-USDT-SWAP", "1Dutc")
+    assert clients["bybit"].calls[1][1] == ("BTCUSDT", "1D")
+
+
+def test_helpers():
+    assert venue_spread({"a": {"x": 1}, "b": {"x": None}}, "x") is None
+    assert align_series({}) == {}
+    single = KlineSeries([1, 2], [1, 1], [1, 1], [1, 1], [1, 1], [1, 1])
+    assert align_series({"okx": single})["okx"].ts.tolist() == [1, 2]
+
+
+def test_compare_command_is_registered():
+    """测试 compare 子命令已注册到 CLI"""
+    from click.testing import CliRunner
+    from exdatahub.cli.main import cli
+
+    result = CliRunner().invoke(cli, ["compare", "--help"])
+
+    assert result.exit_code == 0
+    assert "--exchanges" in result.output
@@ -0,0 +1,88 @@
+"""
+core.models 测试：OKX 数据解析为类型化模型
+"""
+import sys
+from dataclasses import FrozenInstanceError
+
+import numpy as np
+import pytest
+
+from exdatahub.core.exceptions import APIError
+from exdatahub.core.models import (FundingRate, Kline, KlineSeries, MarkPrice, OpenInterest, OrderBook,
+                                   Ticker)
+from exdatahub.services.analysis import AnalysisService
+
+ROWS = [  # OKX REST 顺序：最新在前
+    ["1700000120000", "102", "104", "101", "103", "12", "1200", "123600", "0"],
+    ["1700000060000", "101", "103", "100", "102", "11", "1100", "112200", "1"],
+    ["1700000000000", "100", "102", "99", "101", "10", "1000", "101000", "1"],
+]
+
+
+def test_kline_series_is_chronological_and_columnar():
+    """测试 K 线解析为按时间正序的列式数组"""
+    series = KlineSeries.from_okx({"code": "0", "msg": "", "data": ROWS}, inst_id="BTC-USDT", bar="1m")
+
+    assert len(series) == 3
+    assert series.ts.dtype == np.int64
+    assert series.ts.tolist() == [1700000000000, 1700000060000, 1700000120000]
+    assert series.close.tolist() == [101.0, 102.0, 103.0]
+    assert series.confirmed.tolist() == [True, True, False]
+    assert series.close.flags["C_CONTIGUOUS"]
+    assert series.last() == Kline(1700000120000, 102.0, 104.0, 101.0, 103.0, 12.0, 1200.0, 123600.0, False)
+    assert series.tail(2).ts.tolist() == [1700000060000, 1700000120000]
+
+
+def test_kline_series_is_smaller_than_rows():
+    """测试列式存储明显小于字符串列表"""
+    rows = [[str(1700000000000 + i * 60000), "100.1", "101.2", "99.3", "100.4", "10.5", "1050", "105000", "1"]
+            for i in range(300)]
+    rows_size = sys.getsizeof(rows) + sum(sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row) for row in rows)
+
+    assert KlineSeries.from_okx(rows).nbytes * 3 < rows_size
+
+
+def test_kline_series_feeds_numpy_backend():
+    """测试 KlineSeries 可直接用于 NumPy 指标后端"""
+    rows = list(reversed(ROWS)) * 20
+    rows = [[str(1700000000000 + i * 60000)] + row[1:] for i, row in enumerate(rows)]
+
+    assert (AnalysisService.calculate_indicators(KlineSeries.from_okx(rows), backend="numpy")
+            == AnalysisService.calculate_indicators(rows, backend="numpy"))
+
+
+def test_scalar_models():
+    """测试标量模型解析（空字符串字段解析为 None）"""
+    ticker = Ticker.from_okx({"code": "0", "data": [{"instId": "BTC-USDT", "last": "98000.5", "bidPx": "98000.4",
+                                                     "askPx": "98000.6", "ts": "1700000000000"}]})
+    funding = FundingRate.from_okx({"instId": "BTC-USDT-SWAP", "fundingRate": "0.0001", "nextFundingRate": "",
+                                    "nextFundingTime": "1700003600000"})
+
+    assert (ticker.last, ticker.bid, ticker.ask, ticker.vol_24h) == (98000.5, 98000.4, 98000.6, None)
+    assert funding.rate == 0.0001 and funding.next_rate is None
+    assert funding.next_funding_time == 1700003600000
+    assert MarkPrice.from_okx([{"instId": "X", "markPx": "1.5", "ts": "1"}]).price == 1.5
+    assert OpenInterest.from_okx({"oi": "1000", "oiCcy": "10", "ts": "1"}).oi_ccy == 10.0
+    assert not hasattr(ticker, "__dict__")  # __slots__
+    with pytest.raises(FrozenInstanceError):
+        ticker.last = 1.0
+
+
+def test_error_response_raises():
+    """测试带错误码的响应抛出 APIError"""
+    with pytest.raises(APIError):
+        Ticker.from_okx({"code": "51001", "msg": "Instrument ID does not exist", "data": []})
+
+
+def test_order_book_snapshot():
+    """测试深度快照解析"""
+    book = OrderBook.from_okx({"code": "0", "data": [{
+        "asks": [["100.1", "2", "0", "1"], ["100.2", "4", "0", "2"]],
+        "bids": [["99.9", "3", "0", "1"]],
+        "ts": "1700000000000",
+    }]}, inst_id="BTC-USDT")
+
+    assert book.inst_id == "BTC-USDT"
+    assert book.best_bid() == 99.9
+    assert book.ask_sizes.tolist() == [2.0, 4.0]
+    assert book.spread() == pytest.approx(0.2)
@@ -0,0 +1,210 @@
+"""
+OKXClient 单元测试（使用本地 HTTP 服务模拟 OKX，不访问外网）
+"""
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from exdatahub.core.cache import ResponseCache
+from exdatahub.core.exceptions import APIError
+from exdatahub.core.http import HTTPTransport, RetryPolicy, close_transports
+from exdatahub.exchanges.okx_client import OKXClient
+from exdatahub.utils.metrics import metrics
+
+
+class _OKXHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = []
+
+    def do_GET(self):
+        _OKXHandler.client_ports.append(self.client_address[1])
+        data = [{"instId": "BTC-USDT", "last": "1"}]
+        if self.path.startswith("/api/v5/market/candles"):
+            data = [["1700000000000", "1", "1", "1", "1", "1", "1", "1", "1"]]
+        body = json.dumps({"code": "0", "msg": "", "data": data}).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def okx_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OKXHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _OKXHandler.client_ports = []
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    close_transports()
+
+
+def _client_for(base_url):
+    return type("LocalOKXClient", (OKXClient,), {"BASE_URL": base_url})
+
+
+def test_connections_are_reused(okx_server):
+    """测试同一主机的多次请求复用同一个 keep-alive 连接"""
+    client_cls = _client_for(okx_server)
+    first = client_cls()
+    second = client_cls()
+
+    assert first.transport is second.transport
+
+    for _ in range(5):
+        data = first.fetch_ticker("BTC-USDT")
+        assert data["data"][0]["last"] == "1"
+    second.fetch_ticker("BTC-USDT")
+
+    assert len(_OKXHandler.client_ports) == 6
+    assert len(set(_OKXHandler.client_ports)) == 1
+
+
+def test_later_clients_share_host_settings(okx_server, caplog):
+    """测试同一主机的限流器只在创建连接时构建一次，后续客户端的不同设置被忽略并记录警告"""
+    client_cls = _client_for(okx_server)
+    first = client_cls()
+    same = client_cls()
+    assert first.transport.rate_limiter is same.transport.rate_limiter
+    assert "already exists" not in caplog.text
+
+    other = client_cls(rate_limit=False, pool_size=5)
+    assert other.transport is first.transport
+    assert other.transport.rate_limiter is not None
+    assert "ignoring pool_size=5, max_in_flight=None, rate_limit=False" in caplog.text
+
+
+def test_in_flight_requests_are_capped(okx_server):
+    """测试 max_in_flight 限制全局并发请求数"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    transport = HTTPTransport(okx_server, pool_size=4, max_in_flight=2)
+    active = []
+    peak = []
+    original = transport.session.request
+
+    def tracking_request(*args, **kwargs):
+        active.append(1)
+        peak.append(len(active))
+        try:
+            return original(*args, **kwargs)
+        finally:
+            active.pop()
+
+    transport.session.request = tracking_request
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: transport.request("GET", "/api/v5/market/ticker"), range(16)))
+    transport.close()
+
+    assert max(peak) <= 2
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """按顺序返回预设响应：[(status, headers, body_dict), ...]"""
+    protocol_version = "HTTP/1.1"
+    script = []
+    hits = 0
+
+    def _reply(self):
+        _ScriptedHandler.hits += 1
+        status, headers, payload = _ScriptedHandler.script.pop(0)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scripted_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _ScriptedHandler.hits = 0
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    close_transports()
+
+
+FAST_RETRY = RetryPolicy(max_attempts=3, backoff_base=0.01, backoff_max=0.05)
+OK = (200, {}, {"code": "0", "msg": "", "data": []})
+
+
+def test_transient_errors_are_retried(scripted_server):
+    """测试 5xx 与 OKX 繁忙错误码会重试并记录指标"""
+    metrics.reset()
+    _ScriptedHandler.script = [
+        (503, {}, {}),
+        (200, {}, {"code": "50013", "msg": "System is busy", "data": []}),
+        OK,
+    ]
+    client = _client_for(scripted_server)(retry=FAST_RETRY)
+
+    assert client.fetch_ticker("BTC-USDT")["code"] == "0"
+    assert _ScriptedHandler.hits == 3
+    assert metrics.get("http.retries") == 2
+    assert metrics.get("http.retries", host=client.transport.host,
+                       path="/api/v5/market/ticker", reason="50013") == 1
+
+
+def test_retry_after_is_honoured(scripted_server):
+    """测试 429 的 Retry-After 作为最小等待时间"""
+    _ScriptedHandler.script = [(429, {"Retry-After": "0.3"}, {}), OK]
+    transport = HTTPTransport(scripted_server, retry=FAST_RETRY)
+
+    start = time.monotonic()
+    transport.request("GET", "/api/v5/market/ticker")
+    transport.close()
+
+    assert time.monotonic() - start >= 0.3
+    assert _ScriptedHandler.hits == 2
+
+
+def test_non_retryable_errors_fail_fast(scripted_server):
+    """测试非幂等请求与不可重试错误码不重试"""
+    _ScriptedHandler.script = [(503, {}, {}), (200, {}, {"code": "51001", "msg": "Bad instId"})]
+    transport = HTTPTransport(scripted_server, retry=FAST_RETRY)
+
+    with pytest.raises(APIError):
+        transport.request("POST", "/api/v5/trade/order")
+    with pytest.raises(APIError) as excinfo:
+        transport.request("GET", "/api/v5/market/ticker", validate=OKXClient._check_response)
+    transport.close()
+
+    assert excinfo.value.code == "51001"
+    assert _ScriptedHandler.hits == 2
+
+
+def test_cached_endpoints_skip_network(okx_server):
+    """测试已收盘 K 线页命中缓存后不再访问网络，实时接口不缓存"""
+    cache = ResponseCache()
+    client = _client_for(okx_server)(cache=cache)
+
+    client.fetch_klines("BTC-USDT", "1D", limit=10)
+    client.fetch_klines("BTC-USDT", "1D", limit=10)
+    client.fetch_ticker("BTC-USDT")
+    client.fetch_ticker("BTC-USDT")
+
+    assert len(_OKXHandler.client_ports) == 3
+    assert cache.stats["hits"] == 1
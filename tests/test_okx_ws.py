@@ -0,0 +1,219 @@
+"""
+OKXWebSocketFeed 测试（使用本地 WebSocket 服务模拟 OKX，不访问外网）
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from websockets.asyncio.server import serve
+
+from exdatahub.core.http import RetryPolicy
+from exdatahub.core.orderbook import okx_checksum
+from exdatahub.exchanges.okx_ws import OKXWebSocketFeed, market_channels
+
+FAST_RECONNECT = RetryPolicy(backoff_base=0.05, backoff_max=0.1, jitter=0)
+
+PUSH_DATA = {
+    "mark-price": {"instId": "BTC-USDT-SWAP", "markPx": "100.5", "ts": "1700000000000"},
+    "funding-rate": {"instId": "BTC-USDT-SWAP", "fundingRate": "0.0001", "nextFundingTime": "1700000000000"},
+    "candle1m": ["1700000000000", "1", "2", "0.5", "1.5", "10", "0", "0", "0"],
+}
+
+BOOK_SNAPSHOT = {
+    "bids": [["99.9", "3", "0", "1"], ["99.8", "5", "0", "2"]],
+    "asks": [["100.1", "2", "0", "1"]],
+    "ts": "1700000000000",
+    "seqId": 1,
+    "prevSeqId": -1,
+    "checksum": okx_checksum([("99.9", "3"), ("99.8", "5")], [("100.1", "2")]),
+}
+
+
+class MockOKXServer:
+    """
+    模拟 OKX WebSocket：订阅后回 ack 并推送一条数据，响应文本 ping
+
+    Args:
+        drop_after_subscribe: 前 N 次订阅后主动断开连接
+        answer_ping: 是否回复 pong
+        book_updates: books 频道快照之后推送的增量（只在第一次订阅时推送）
+    """
+
+    def __init__(self, drop_after_subscribe=0, answer_ping=True, book_updates=()):
+        self.drop_after_subscribe = drop_after_subscribe
+        self.answer_ping = answer_ping
+        self.book_updates = list(book_updates)
+        self.connections = 0
+        self.subscribes = []
+        self.unsubscribes = []
+        self.pings = 0
+        self.url = None
+        self._loop = None
+        self._stop = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True)
+
+    async def _handler(self, ws):
+        self.connections += 1
+        async for message in ws:
+            if message == "ping":
+                self.pings += 1
+                if self.answer_ping:
+                    await ws.send("pong")
+                continue
+            request = json.loads(message)
+            if request["op"] == "unsubscribe":
+                self.unsubscribes.append(request["args"])
+                continue
+            self.subscribes.append(request["args"])
+            for arg in request["args"]:
+                await ws.send(json.dumps({"event": "subscribe", "arg": arg, "connId": "1"}))
+                if arg["channel"] == "books":
+                    await ws.send(json.dumps({"arg": arg, "action": "snapshot", "data": [BOOK_SNAPSHOT]}))
+                    updates, self.book_updates = self.book_updates, []
+                    for update in updates:
+                        await ws.send(json.dumps({"arg": arg, "action": "update", "data": [update]}))
+                data = PUSH_DATA.get(arg["channel"])
+                if data is not None:
+                    await ws.send(json.dumps({"arg": arg, "data": [data]}))
+            if self.drop_after_subscribe > 0:
+                self.drop_after_subscribe -= 1
+                await ws.close()
+                return
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        async with serve(self._handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            self.url = f"ws://127.0.0.1:{port}"
+            self._ready.set()
+            await self._stop.wait()
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(5)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def make_feed():
+    servers, feeds = [], []
+
+    def factory(server=None, **kwargs):
+        server = (server or MockOKXServer()).start()
+        kwargs.setdefault("reconnect", FAST_RECONNECT)
+        feed = OKXWebSocketFeed(public_url=server.url, business_url=server.url, **kwargs)
+        servers.append(server)
+        feeds.append(feed)
+        return server, feed
+
+    yield factory
+    for feed in feeds:
+        feed.stop()
+    for server in servers:
+        server.stop()
+
+
+def test_snapshot_and_candle_callback(make_feed):
+    """测试订阅后推送数据进入快照，K 线推送触发回调"""
+    candles = []
+    server, feed = make_feed(on_candle=lambda inst, bar, rows: candles.append((inst, bar, rows)))
+    feed.start()
+    feed.subscribe(market_channels("BTC-USDT-SWAP", ["1m"], "BTC-USDT"))
+
+    assert wait_for(lambda: feed.get("mark-price", "BTC-USDT-SWAP") is not None)
+    assert wait_for(lambda: candles)
+    assert feed.get("mark-price", "BTC-USDT-SWAP")["markPx"] == "100.5"
+    assert set(feed.snapshot("BTC-USDT-SWAP")) >= {"mark-price", "funding-rate", "candle1m"}
+    assert candles[0] == ("BTC-USDT-SWAP", "1m", [PUSH_DATA["candle1m"]])
+    assert feed.get("tickers", "BTC-USDT-SWAP") is None  # 未推送过的频道
+
+
+def test_subscriptions_before_start_are_sent_on_connect(make_feed):
+    """测试启动前登记的订阅在连接建立后发送"""
+    server, feed = make_feed()
+    feed.subscribe([{"channel": "mark-price", "instId": "BTC-USDT-SWAP"}])
+    feed.start()
+
+    assert wait_for(lambda: feed.get("mark-price", "BTC-USDT-SWAP") is not None)
+    assert server.subscribes == [[{"channel": "mark-price", "instId": "BTC-USDT-SWAP"}]]
+
+
+def test_reconnects_and_resubscribes(make_feed):
+    """测试连接断开后自动重连并重新订阅全部频道"""
+    server, feed = make_feed(MockOKXServer(drop_after_subscribe=1))
+    feed.start()
+    feed.subscribe([{"channel": "mark-price", "instId": "BTC-USDT-SWAP"},
+                    {"channel": "funding-rate", "instId": "BTC-USDT-SWAP"}])
+
+    assert wait_for(lambda: server.connections == 2 and feed.get("mark-price", "BTC-USDT-SWAP") is not None)
+    assert len(server.subscribes) == 2
+    assert server.subscribes[0] == server.subscribes[1]
+    assert feed.live_generation("mark-price", "BTC-USDT-SWAP") == 2
+
+
+def test_heartbeat_keeps_idle_connection(make_feed):
+    """测试空闲时发送 ping，收到 pong 后保持连接"""
+    server, feed = make_feed(ping_interval=0.1)
+    feed.start()
+    feed.subscribe([{"channel": "mark-price", "instId": "BTC-USDT-SWAP"}])
+
+    assert wait_for(lambda: server.pings >= 3)
+    assert server.connections == 1
+    assert feed.get("mark-price", "BTC-USDT-SWAP") is not None
+
+
+def test_missing_pong_reconnects_and_invalidates_snapshot(make_feed):
+    """测试收不到 pong 时重连，断线前的数据不再视为实时"""
+    server, feed = make_feed(MockOKXServer(answer_ping=False), ping_interval=0.1)
+    feed.start()
+    feed.subscribe([{"channel": "mark-price", "instId": "BTC-USDT-SWAP"}])
+    assert wait_for(lambda: feed.live_generation("mark-price", "BTC-USDT-SWAP") == 1)
+
+    assert wait_for(lambda: server.connections >= 2)
+    assert wait_for(lambda: feed.live_generation("mark-price", "BTC-USDT-SWAP") == 2)
+
+
+def test_order_book_updates_are_applied(make_feed):
+    """测试 books 频道的快照与增量在本地订单簿中合并"""
+    update = {"bids": [["99.9", "0", "0", "0"]], "asks": [["100.0", "1", "0", "1"]],
+              "ts": "1700000000100", "seqId": 2, "prevSeqId": 1,
+              "checksum": okx_checksum([("99.8", "5")], [("100.0", "1"), ("100.1", "2")])}
+    server, feed = make_feed(MockOKXServer(book_updates=[update]))
+    feed.start()
+    feed.subscribe([{"channel": "books", "instId": "BTC-USDT-SWAP"}])
+
+    assert wait_for(lambda: feed.book("BTC-USDT-SWAP") is not None and feed.book("BTC-USDT-SWAP").seq_id == 2)
+    book = feed.book("BTC-USDT-SWAP")
+    assert book.best_bid() == (99.8, 5.0)
+    assert book.best_ask() == (100.0, 1.0)
+    assert server.unsubscribes == []
+
+
+def test_order_book_checksum_mismatch_resubscribes(make_feed):
+    """测试校验和不一致时丢弃本地订单簿并重新订阅获取新快照"""
+    bad_update = {"bids": [["99.9", "1", "0", "1"]], "asks": [], "seqId": 2, "prevSeqId": 1, "checksum": 1}
+    server, feed = make_feed(MockOKXServer(book_updates=[bad_update]))
+    feed.start()
+    feed.subscribe([{"channel": "books", "instId": "BTC-USDT-SWAP"}])
+
+    assert wait_for(lambda: len(server.subscribes) == 2)
+    assert server.unsubscribes == [[{"channel": "books", "instId": "BTC-USDT-SWAP"}]]
+    assert wait_for(lambda: feed.book("BTC-USDT-SWAP") is not None)
+    assert feed.book("BTC-USDT-SWAP").best_bid() == (99.9, 3.0)
@@ -0,0 +1,124 @@
+"""
+L2Book 测试：增量更新、OKX 校验和、盘口查询
+"""
+import random
+import zlib
+
+import pytest
+
+from exdatahub.core.exceptions import OrderBookError
+from exdatahub.core.orderbook import L2Book, okx_checksum
+
+
+def signed_crc(text):
+    crc = zlib.crc32(text.encode())
+    return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+
+def level(price, size):
+    return [price, size, "0", "1"]
+
+
+def make_snapshot():
+    return {
+        "bids": [level("3366.1", "7"), level("3366", "6")],
+        "asks": [level("3366.8", "9"), level("3368", "8"), level("3372", "8")],
+        "ts": "1700000000000",
+        "seqId": 100,
+        "prevSeqId": -1,
+    }
+
+
+def test_checksum_interleaves_bids_and_asks():
+    """测试校验和按 bid:ask 交替拼接，较短一侧用完后只拼另一侧"""
+    bids = [("3366.1", "7"), ("3366", "6")]
+    asks = [("3366.8", "9"), ("3368", "8"), ("3372", "8")]
+
+    assert okx_checksum(bids, asks) == signed_crc("3366.1:7:3366.8:9:3366:6:3368:8:3372:8")
+    assert okx_checksum(bids, []) == signed_crc("3366.1:7:3366:6")
+
+
+def test_snapshot_and_updates():
+    """测试快照后增量更新：新增、修改、删除价位"""
+    snapshot = make_snapshot()
+    book = L2Book("BTC-USDT")
+    book.apply(snapshot, "snapshot")
+
+    assert book.best_bid() == (3366.1, 7.0)
+    assert book.best_ask() == (3366.8, 9.0)
+
+    update = {
+        "bids": [level("3366.5", "2"), level("3366.1", "0")],
+        "asks": [level("3368", "1.5")],
+        "seqId": 101,
+        "prevSeqId": 100,
+    }
+    update["checksum"] = okx_checksum([("3366.5", "2"), ("3366", "6")],
+                                      [("3366.8", "9"), ("3368", "1.5"), ("3372", "8")])
+    book.apply(update, "update")
+
+    assert book.levels() == {"bids": [(3366.5, 2.0), (3366.0, 6.0)],
+                             "asks": [(3366.8, 9.0), (3368.0, 1.5), (3372.0, 8.0)]}
+    assert book.spread() == pytest.approx(0.3)
+    assert book.seq_id == 101
+
+
+def test_depth_and_vwap():
+    """测试到指定价格的累计深度与按数量计算的成交均价"""
+    book = L2Book.from_okx({"code": "0", "data": [make_snapshot()]})
+
+    assert book.depth_to_price("asks", 3368) == 17.0
+    assert book.depth_to_price("asks", 3366.0) == 0.0
+    assert book.depth_to_price("bids", 3366) == 13.0
+    assert book.vwap("asks", 10) == pytest.approx((9 * 3366.8 + 1 * 3368) / 10)
+    assert book.vwap("bids", 7) == pytest.approx(3366.1)
+    assert book.vwap("bids", 14) is None  # 深度不足
+    with pytest.raises(ValueError):
+        book.vwap("buy", 1)
+
+
+def test_checksum_mismatch_raises():
+    """测试校验和不一致时抛出 OrderBookError"""
+    book = L2Book("BTC-USDT")
+    book.apply(make_snapshot(), "snapshot")
+
+    with pytest.raises(OrderBookError):
+        book.apply({"bids": [level("3366.1", "1")], "asks": [], "seqId": 101, "prevSeqId": 100,
+                    "checksum": 12345}, "update")
+
+
+def test_sequence_gap_raises():
+    """测试 prevSeqId 与本地 seqId 不连续时抛出 OrderBookError"""
+    book = L2Book("BTC-USDT")
+    book.apply(make_snapshot(), "snapshot")
+
+    with pytest.raises(OrderBookError):
+        book.apply({"bids": [], "asks": [], "seqId": 105, "prevSeqId": 103}, "update")
+
+
+def test_random_updates_match_reference():
+    """测试随机增量更新后与字典实现的参考盘口一致（含校验和）"""
+    rng = random.Random(7)
+    reference = {"bids": {}, "asks": {}}
+    book = L2Book("BTC-USDT")
+    book.apply({"bids": [], "asks": []}, "snapshot")
+
+    for _ in range(500):
+        update = {"bids": [], "asks": []}
+        for _ in range(rng.randint(1, 5)):
+            side = rng.choice(["bids", "asks"])
+            ticks = rng.randint(0, 60)
+            price = f"{(100 - ticks * 0.1) if side == 'bids' else (100.1 + ticks * 0.1):.1f}"
+            size = "0" if rng.random() < 0.3 else f"{rng.uniform(0.1, 10):.3f}"
+            update[side].append(level(price, size))
+            if size == "0":
+                reference[side].pop(price, None)
+            else:
+                reference[side][price] = size
+        bids = sorted(reference["bids"].items(), key=lambda item: -float(item[0]))
+        asks = sorted(reference["asks"].items(), key=lambda item: float(item[0]))
+        update["checksum"] = okx_checksum(bids[:25], asks[:25])
+        book.apply(update, "update")
+
+        assert book.levels() == {"bids": [(float(p), float(s)) for p, s in bids],
+                                 "asks": [(float(p), float(s)) for p, s in asks]}
@@ -0,0 +1,66 @@
+"""
+令牌桶限频测试
+"""
+import threading
+import time
+
+from exdatahub.core.rate_limit import RateLimiter, TokenBucket, WeightedRateLimiter
+from exdatahub.exchanges.okx_client import OKX_RATE_LIMITS
+
+
+def test_bucket_allows_burst_then_queues():
+    """测试突发容量内不等待，超出后按速率排队"""
+    bucket = TokenBucket(5, 0.5)  # 10 次/秒
+
+    waits = [bucket.reserve() for _ in range(7)]
+
+    assert waits[:5] == [0.0] * 5
+    assert 0.05 < waits[5] <= 0.11
+    assert 0.15 < waits[6] <= 0.21
+
+
+def test_limiter_is_shared_across_threads():
+    """测试多线程共享同一限频器，总吞吐不超过限额"""
+    limiter = RateLimiter({"/api/v5/market/candles": (4, 0.2)})
+
+    def worker():
+        for _ in range(3):
+            limiter.acquire("/api/v5/market/candles")
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    # 12 次请求，突发 4 次，剩余 8 次以 20 次/秒排队 => 约 0.4 秒
+    assert elapsed >= 0.35
+
+
+def test_unknown_path_is_unlimited():
+    """测试未配置的接口不限频"""
+    limiter = RateLimiter({"/a": (1, 10)})
+
+    assert limiter.acquire("/b") == 0.0
+    assert limiter.acquire("/b") == 0.0
+
+
+def test_okx_limits_cover_client_endpoints():
+    """测试 OKX 限频表覆盖客户端使用的所有接口"""
+    for path in ("/api/v5/market/candles", "/api/v5/public/funding-rate",
+                 "/api/v5/public/mark-price", "/api/v5/market/index-tickers"):
+        assert path in OKX_RATE_LIMITS
+
+
+def test_weighted_limiter_shares_one_budget():
+    """测试按权重限频：所有接口共用一个权重预算，权重可由参数决定"""
+    limiter = WeightedRateLimiter(10, 1, weights={"/heavy": lambda p: int(p["limit"]) // 10, "/light": 1})
+
+    assert limiter.cost("/heavy", {"limit": "50"}) == 5
+    assert limiter.cost("/other") == 1
+    assert limiter.acquire("/heavy", 5) == 0.0
+    assert limiter.acquire("/light", 5) == 0.0
+    # 预算已用完，下一次请求需等待
+    assert limiter.weight_bucket.reserve(1) > 0
@@ -0,0 +1,194 @@
+"""
+DerivativesScanner 测试（使用模拟客户端，不访问外网）
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from exdatahub.services.aggregator import AggregatorService
+from exdatahub.services.scanner import DerivativesScanner
+
+SYMBOLS = [f"C{i}-USDT-SWAP" for i in range(20)] + ["BTC-USD-SWAP"]
+
+
+def make_klines(count=60):
+    return [[str(1700000000000 + i * 60000), "100", "101", "99", "100", "10", "1", "1000", "1"]
+            for i in range(count)][::-1]
+
+
+class FakeOKXClient:
+    """模拟 OKXClient：全市场接口返回 SYMBOLS 的数据，记录每个接口的调用次数"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _respond(self, name, data):
+        with self._lock:
+            self.calls.append(name)
+        time.sleep(self.latency)
+        return {"code": "0", "msg": "", "data": data}
+
+    def count(self, name):
+        return self.calls.count(name)
+
+    # 全市场接口
+    def fetch_tickers(self, inst_type="SWAP"):
+        return self._respond("tickers", [{"instId": s, "last": str(100 + i), "volCcy24h": str(i)}
+                                         for i, s in enumerate(SYMBOLS)])
+
+    def fetch_mark_prices(self, inst_type="SWAP"):
+        return self._respond("mark_prices", [{"instId": s, "markPx": "100.5", "ts": "1700000000000"}
+                                             for s in SYMBOLS])
+
+    def fetch_open_interests(self, inst_type="SWAP"):
+        return self._respond("open_interests", [{"instId": s, "oi": "1000", "oiCcy": "10", "oiUsd": str(i),
+                                                 "ts": "1700000000000"} for i, s in enumerate(SYMBOLS)])
+
+    def fetch_funding_rates(self):
+        return self._respond("funding_rates", [{"instId": s, "fundingRate": str(i / 10000),
+                                                "nextFundingTime": "1700006400000"} for i, s in enumerate(SYMBOLS)])
+
+    def fetch_index_tickers_by_quote(self, quote_ccy="USDT"):
+        bases = ["BTC"] if quote_ccy == "USD" else [f"C{i}" for i in range(20)]
+        return self._respond(f"index_{quote_ccy}", [{"instId": f"{b}-{quote_ccy}", "idxPx": "100"} for b in bases])
+
+    # 逐个交易对接口
+    def fetch_klines(self, symbol, interval, limit=100, after=None, before=None):
+        return self._respond("klines", make_klines())
+
+    def fetch_funding_rate(self, symbol):
+        return self._respond("funding", [{"instId": symbol, "fundingRate": "0.0009", "nextFundingTime": "1"}])
+
+    def fetch_open_interest(self, symbol):
+        return self._respond("oi", [{"instId": symbol, "oi": "5", "oiCcy": "5", "ts": "1"}])
+
+    def fetch_mark_price(self, symbol):
+        return self._respond("mark", [{"instId": symbol, "markPx": "50", "ts": "1"}])
+
+    def fetch_index_tickers(self, symbol):
+        return self._respond("index", [{"instId": symbol, "idxPx": "49"}])
+
+
+def test_scan_builds_tables():
+    client = FakeOKXClient()
+    scanner = DerivativesScanner(client)
+
+    counts = scanner.scan()
+
+    assert counts == {"tickers": 21, "mark-price": 21, "open-interest": 21, "funding-rate": 21,
+                      "index-tickers": 21}
+    assert len(client.calls) == 6
+    assert {"index_USDT", "index_USD"} <= set(client.calls)
+    assert scanner.get("funding-rate", "C3-USDT-SWAP")["fundingRate"] == "0.0003"
+    assert scanner.get("index-tickers", "BTC-USD")["idxPx"] == "100"
+    assert scanner.get("mark-price", "NOPE-USDT-SWAP") is None
+    assert scanner.inst_ids == sorted(SYMBOLS)
+
+    record = next(r for r in scanner.records() if r["inst_id"] == "C5-USDT-SWAP")
+    assert (record["last"], record["mark"], record["index"], record["oi_usd"]) == (105.0, 100.5, 100.0, 5.0)
+    assert abs(record["basis_pct"] - 0.5) < 1e-9
+    assert record["funding_rate"] == 0.0005
+
+
+def test_refresh_single_flight():
+    """测试有效期内不重复扫描，并发刷新只扫描一次"""
+    client = FakeOKXClient(latency=0.02)
+    scanner = DerivativesScanner(client, max_age=0.2)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        done = list(executor.map(lambda _: scanner.refresh(), range(8)))
+    assert done.count(True) == 1
+    assert client.count("tickers") == 1
+
+    time.sleep(0.25)
+    assert scanner.refresh() is True
+    assert client.count("tickers") == 2
+
+
+def test_failed_source_only_empties_its_table():
+    client = FakeOKXClient()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    client.fetch_funding_rates = broken
+    scanner = DerivativesScanner(client)
+    counts = scanner.scan()
+
+    assert "funding-rate" not in counts
+    assert counts["mark-price"] == 21
+    assert scanner.records()[0]["funding_rate"] is None
+
+
+def test_batch_analysis_reads_scanner_tables():
+    """测试批量分析时衍生品数据来自全市场扫描，表中没有的合约退回逐个请求"""
+    client = FakeOKXClient()
+    service = AggregatorService("okx")
+    service.client = client
+    symbols = SYMBOLS[:20] + ["NEW-USDT-SWAP"]
+
+    async def collect():
+        return {symbol: result async for symbol, result in service.analyze_many_async(symbols, ["1m"])}
+
+    results = asyncio.run(collect())
+    service.close()
+
+    assert service.scanner is not None
+    assert client.count("tickers") == 1 and client.count("funding_rates") == 1
+    assert client.count("klines") == len(symbols)
+    # 只有表中没有的 NEW-USDT-SWAP 逐个请求
+    assert (client.count("funding"), client.count("oi"), client.count("mark"), client.count("index")) == (1, 1, 1, 1)
+    derivatives = results["C7-USDT-SWAP"]["derivatives"]
+    assert derivatives["funding_rate"]["current"] == "0.0007"
+    assert derivatives["price"]["basis"] == 0.5
+    assert results["NEW-USDT-SWAP"]["derivatives"]["funding_rate"]["current"] == "0.0009"
+
+
+def test_batch_refreshes_scanner_once():
+    """测试批量分析只在开始时刷新一次扫描表，即使分析耗时超过 max_age"""
+    client = FakeOKXClient(latency=0.01)
+    service = AggregatorService("okx")
+    service.client = client
+    service.enable_scanner(len(SYMBOLS))
+    service.scanner.max_age = 0
+
+    async def collect():
+        return [symbol async for symbol, _ in service.analyze_many_async(SYMBOLS, ["1m"], concurrency=4)]
+
+    assert len(asyncio.run(collect())) == len(SYMBOLS)
+    service.close()
+    assert client.count("tickers") == 1 and client.count("funding") == 0
+    # 单独刷新某个交易对时仍会按 max_age 刷新；rescan=False 时只读表
+    service.refresh_parts("C1-USDT-SWAP", ["funding"], rescan=False)
+    assert client.count("tickers") == 1
+    service.refresh_parts("C1-USDT-SWAP", ["funding"])
+    assert client.count("tickers") == 2
+
+
+def test_scanner_only_for_large_okx_batches():
+    service = AggregatorService("okx")
+    service.client = FakeOKXClient()
+    assert service.enable_scanner(2) is False
+    service.refresh_parts("C1-USDT-SWAP", ["funding"])
+    assert service.client.calls == ["funding"]
+    assert service.enable_scanner(5) is True
+    assert service.enable_scanner(1) is True
+    service.close()
+
+    binance = AggregatorService("binance")
+    assert binance.enable_scanner(50) is False
+    binance.close()
+
+
+def test_scan_command_is_registered():
+    """测试 scan 子命令已注册到 CLI"""
+    from click.testing import CliRunner
+    from exdatahub.cli.main import cli
+
+    result = CliRunner().invoke(cli, ["scan", "--help"])
+
+    assert result.exit_code == 0
+    assert "--sort" in result.output
@@ -0,0 +1,100 @@
+"""
+JSON 序列化层测试（对每个已安装的后端运行）
+"""
+import json
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from exdatahub.cli.main import cli
+from exdatahub.core.models import Ticker
+from exdatahub.utils.output import OutputHandler
+from exdatahub.utils.serialization import BACKENDS, create_serializer, decode, get_serializer
+
+PAYLOAD = {
+    "symbol": "BTC-USDT-SWAP",
+    "klines": {"1m": {"data": [["1700000000000", "98000.1", "98010", "97990", "98005.5", "12.5"]],
+                      "indicators": {"trend": {"ema_9": 98001.123456789, "ma_200": None}}}},
+    "summary": {"trend_label": "上涨"},
+}
+
+
+def available_backends():
+    backends = []
+    for name in BACKENDS:
+        try:
+            create_serializer(name)
+            backends.append(name)
+        except ImportError:
+            pass
+    return backends
+
+
+@pytest.fixture(params=available_backends())
+def serializer(request):
+    return create_serializer(request.param)
+
+
+def test_round_trip_matches_stdlib(serializer):
+    """测试各后端编码结果与标准库解析一致"""
+    for compact in (False, True):
+        encoded = serializer.dumps_bytes(PAYLOAD, compact=compact)
+        assert json.loads(encoded) == PAYLOAD
+        assert serializer.loads(encoded) == PAYLOAD
+        assert ("上涨" in encoded.decode("utf-8"))  # 不转义非 ASCII
+
+
+def test_compact_and_indent(serializer):
+    """测试紧凑输出无缩进，默认输出缩进 2 格"""
+    assert b"\n" not in serializer.dumps_bytes(PAYLOAD, compact=True)
+    assert serializer.dumps(PAYLOAD).startswith('{\n  "symbol"')
+
+
+def test_numpy_values(serializer):
+    """测试 numpy 标量与数组可直接编码"""
+    encoded = serializer.dumps_bytes({"x": np.float64(1.5), "y": np.arange(3)}, compact=True)
+    assert json.loads(encoded) == {"x": 1.5, "y": [0, 1, 2]}
+
+
+def test_invalid_json_raises_value_error(serializer):
+    """测试格式错误统一抛出 ValueError"""
+    with pytest.raises(ValueError):
+        serializer.loads(b'{"code": "0", ')
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_serializer("yaml")
+
+
+def test_decode_into_model():
+    """测试直接解码为类型化模型"""
+    body = b'{"code":"0","msg":"","data":[{"instId":"BTC-USDT","last":"98000.5","ts":"1700000000000"}]}'
+
+    ticker = decode(body, Ticker)
+
+    assert ticker.inst_id == "BTC-USDT" and ticker.last == 98000.5
+
+
+def test_output_file_compact(tmp_path):
+    """测试紧凑模式写入文件"""
+    path = OutputHandler.save_to_file(PAYLOAD, str(tmp_path), "out.json", compact=True)
+
+    with open(path, "rb") as f:
+        content = f.read()
+    assert b"\n" not in content
+    assert json.loads(content) == PAYLOAD
+
+
+def test_fetch_command_is_registered():
+    """测试 fetch 子命令已注册到 CLI"""
+    result = CliRunner().invoke(cli, ["fetch", "--help"])
+
+    assert result.exit_code == 0
+    assert "--compact" in result.output
+
+
+def test_default_backend_prefers_fast_libraries():
+    names = available_backends()
+    assert get_serializer().name == names[0]
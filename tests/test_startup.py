@@ -0,0 +1,47 @@
+"""
+CLI 启动开销测试：轻量命令不加载重量级依赖
+
+每项检查都在新的解释器进程中进行，与 start.sh 的实际调用一致。
+导入耗时与机器负载有关，不在这里断言；预算检查见 benchmarks/bench_startup.py --check。
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CLI = "import exdatahub.cli.main"
+FETCH = "import exdatahub.cli.main, exdatahub.exchanges.okx_client"
+ANALYZE = "import exdatahub.cli.main, exdatahub.services.aggregator"
+
+
+def run_probe(statement):
+    """在新进程中执行导入语句，返回已加载模块集合"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    code = f"{statement}\nimport sys\nprint(','.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          check=True, env=env, cwd=ROOT)
+    return set(proc.stdout.strip().split(","))
+
+
+def test_cli_help_loads_nothing_heavy():
+    """测试 CLI 入口只加载 click 与序列化层"""
+    modules = run_probe(CLI)
+
+    assert not modules & {"requests", "numpy", "pandas", "pandas_ta", "asyncio", "yaml", "dotenv"}
+
+
+def test_fetch_skips_indicator_stack():
+    """测试 fetch 路径不加载 numpy / pandas / pandas_ta / asyncio / yaml / websockets"""
+    modules = run_probe(FETCH)
+
+    assert "requests" in modules
+    assert not modules & {"numpy", "pandas", "pandas_ta", "asyncio", "yaml", "websockets"}
+
+
+def test_analyze_loads_indicator_library_on_demand():
+    """测试导入 AggregatorService 时不加载 pandas / pandas_ta（计算指标时才加载）"""
+    modules = run_probe(ANALYZE)
+
+    assert not modules & {"pandas", "pandas_ta", "yaml", "websockets"}